@@ -1,10 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import select, func
+from sqlalchemy import select, func, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
 from datetime import datetime
 from app.db.database import get_db
-from app.models import Symbol, Round, Bet, BotScore, BotSymbolStats
+from app.models import Round, Bet, BotScore, BotSymbolStats
 from app.models.danmaku import Danmaku
 from app.schemas.common import APIResponse
 from app.schemas.bet import (
@@ -12,13 +12,42 @@ from app.schemas.bet import (
     CurrentRoundBet, CurrentRoundBetsResponse
 )
 from app.schemas.bot import BotScoreOut, BotSymbolStatsOut
+from app.schemas.danmaku import DanmakuOut
+from app.services.active_rounds import active_rounds
 from app.services.auth import get_current_bot, BotIdentity
+from app.services.rank_index import rank_index
 from app.services.scoring import scoring_service
+from app.services.symbol_config import symbol_configs
+from app.services.ws_hub import ws_hub
 from app.core.config import settings
 
 router = APIRouter()
 
 
+def current_round_bet(bet: Bet, bot_score: Optional[BotScore]) -> CurrentRoundBet:
+    """Arena view of a bet: the bet plus its bot's score, win rate and streak"""
+    win_rate = 0.0
+    score = 0
+    if bot_score:
+        total_rounds = (bot_score.total_wins or 0) + (bot_score.total_losses or 0) + (bot_score.total_draws or 0)
+        win_rate = round((bot_score.total_wins or 0) / total_rounds, 2) if total_rounds > 0 else 0.0
+        score = bot_score.total_score
+    return CurrentRoundBet(
+        id=bet.id,
+        bot_id=bet.bot_id,
+        bot_name=bet.bot_name,
+        avatar_url=bet.avatar_url,
+        direction=bet.direction,
+        reason=bet.reason,
+        confidence=bet.confidence,
+        created_at=bet.created_at,
+        score=score,
+        win_rate=win_rate,
+        # Materialized at settlement (bot_scores.current_streak)
+        streak=(bot_score.current_streak or 0) if bot_score else 0
+    )
+
+
 @router.post("", response_model=APIResponse)
 async def place_bet(
     bet_data: BetCreate,
@@ -27,8 +56,7 @@ async def place_bet(
 ):
     """Place a bet on a symbol"""
     # Check symbol exists and is enabled
-    sym_result = await db.execute(select(Symbol).where(Symbol.symbol == bet_data.symbol))
-    sym = sym_result.scalar_one_or_none()
+    sym = await symbol_configs.get(bet_data.symbol)
 
     if not sym:
         raise HTTPException(status_code=404, detail="Symbol not found")
@@ -41,20 +69,14 @@ async def place_bet(
         )
 
     # Get active round
-    round_result = await db.execute(
-        select(Round)
-        .where(Round.symbol == bet_data.symbol, Round.status == "active")
-        .order_by(Round.start_time.desc())
-        .limit(1)
+    round = await active_rounds.get(bet_data.symbol)
+    no_active_round = APIResponse(
+        success=False,
+        error="NO_ACTIVE_ROUND",
+        hint=f"No active round for {bet_data.symbol}. A new round will start soon."
     )
-    round = round_result.scalar_one_or_none()
-
     if not round:
-        return APIResponse(
-            success=False,
-            error="NO_ACTIVE_ROUND",
-            hint=f"No active round for {bet_data.symbol}. A new round will start soon."
-        )
+        return no_active_round
 
     # Check if within betting window (first 7 minutes of round)
     now = datetime.utcnow()
@@ -120,11 +142,39 @@ async def place_bet(
     )
     db.add(danmaku)
 
-    # Update round bet count
-    round.bet_count += 1
+    # Update round bet count, only while the round is still active: the
+    # registry can trail a settle by a moment, the database has the last word
+    bumped = await db.execute(
+        update(Round)
+        .where(Round.id == round.id, Round.status == "active")
+        .values(bet_count=Round.bet_count + 1)
+    )
+    if bumped.rowcount != 1:
+        await db.rollback()
+        active_rounds.discard(round.symbol, round.id)
+        return no_active_round
+    bet_count = await db.scalar(select(Round.bet_count).where(Round.id == round.id))
 
     await db.commit()
     await db.refresh(bet)
+    active_rounds.set_bet_count(round.symbol, round.id, bet_count)
+
+    # Push to WebSocket subscribers instead of making them poll /round/current
+    await ws_hub.publish_event("bets", round.symbol, "bets_update", {
+        "round_id": round.id,
+        "bet_count": bet_count,
+        "bet": current_round_bet(bet, bot_score).model_dump(mode="json"),
+    })
+    await ws_hub.publish_event("danmaku", round.symbol, "danmaku", DanmakuOut(
+        id=danmaku.id,
+        round_id=danmaku.round_id,
+        symbol=danmaku.symbol,
+        user_id=danmaku.user_id,
+        nickname=danmaku.nickname,
+        content=danmaku.content,
+        color=danmaku.color,
+        created_at=now,
+    ).model_dump(mode="json"))
 
     return APIResponse(
         success=True,
@@ -181,8 +231,7 @@ async def get_my_bets(
         round = round_result.scalar_one_or_none()
 
         # Get symbol info
-        sym_result = await db.execute(select(Symbol).where(Symbol.symbol == b.symbol))
-        sym = sym_result.scalar_one_or_none()
+        sym = await symbol_configs.get(b.symbol)
 
         items.append(BetOut(
             id=b.id,
@@ -244,11 +293,7 @@ async def get_my_score(
     win_rate = bot_score.total_wins / total_rounds if total_rounds > 0 else 0
 
     # Get global rank
-    rank_result = await db.execute(
-        select(func.count(BotScore.bot_id))
-        .where(BotScore.total_score > bot_score.total_score)
-    )
-    global_rank = rank_result.scalar() + 1
+    global_rank = await rank_index.global_rank(bot_score.bot_id, int(bot_score.total_score))
 
     # Get recent results
     recent_result = await db.execute(
@@ -286,8 +331,7 @@ async def get_my_symbol_stats(
 ):
     """Get my stats for a specific symbol"""
     # Get symbol info
-    sym_result = await db.execute(select(Symbol).where(Symbol.symbol == symbol))
-    sym = sym_result.scalar_one_or_none()
+    sym = await symbol_configs.get(symbol)
 
     if not sym:
         raise HTTPException(status_code=404, detail="Symbol not found")
@@ -320,11 +364,7 @@ async def get_my_symbol_stats(
     win_rate = stats.wins / total_rounds if total_rounds > 0 else 0
 
     # Get rank in this symbol
-    rank_result = await db.execute(
-        select(func.count(BotSymbolStats.bot_id))
-        .where(BotSymbolStats.symbol == symbol, BotSymbolStats.score > stats.score)
-    )
-    rank = rank_result.scalar() + 1
+    rank = await rank_index.symbol_rank(symbol, stats.bot_id, stats.score)
 
     return APIResponse(
         success=True,
@@ -351,13 +391,7 @@ async def get_current_round_bets(
 ):
     """Get all bets for the current active round (public endpoint for Arena display)"""
     # Get active round
-    round_result = await db.execute(
-        select(Round)
-        .where(Round.symbol == symbol, Round.status == "active")
-        .order_by(Round.start_time.desc())
-        .limit(1)
-    )
-    current_round = round_result.scalar_one_or_none()
+    current_round = await active_rounds.get(symbol)
 
     if not current_round:
         return APIResponse(
@@ -389,73 +423,12 @@ async def get_current_round_bets(
     scores = {s.bot_id: s for s in (
         scores_result.scalars().all() if scores_result else [])}
 
-    # Get recent bets for streak calculation (last 10 settled bets per bot)
-    streaks: dict[str, int] = {}
-    if bot_ids:
-        rn = func.row_number().over(
-            partition_by=Bet.bot_id, order_by=Bet.created_at.desc()
-        ).label("rn")
-        subq = (
-            select(Bet.bot_id, Bet.result, rn)
-            .where(Bet.bot_id.in_(bot_ids), Bet.result != "pending")
-            .subquery()
-        )
-        streak_rows = await db.execute(
-            select(subq.c.bot_id, subq.c.result)
-            .where(subq.c.rn <= 10)
-            .order_by(subq.c.bot_id, subq.c.rn)
-        )
-        
-        # Group results by bot_id and calculate streak
-        bot_results: dict[str, list[str]] = {}
-        for bot_id, result in streak_rows.all():
-            if bot_id not in bot_results:
-                bot_results[bot_id] = []
-            bot_results[bot_id].append(result)
-        
-        for bot_id, results in bot_results.items():
-            streak = 0
-            for res in results:
-                if res == "win":
-                    if streak < 0:
-                        break  # 遇到不同结果，停止计算
-                    streak += 1
-                elif res == "lose":
-                    if streak > 0:
-                        break  # 遇到不同结果，停止计算
-                    streak -= 1
-                else:
-                    break
-            streaks[bot_id] = streak
-
     # Split by direction
     long_bets = []
     short_bets = []
 
     for bet in all_bets:
-        bot_score = scores.get(bet.bot_id)
-        
-        # Calculate win rate
-        win_rate = 0.0
-        score = 0
-        if bot_score:
-            total_rounds = bot_score.total_wins + bot_score.total_losses + bot_score.total_draws
-            win_rate = round(bot_score.total_wins / total_rounds, 2) if total_rounds > 0 else 0.0
-            score = bot_score.total_score
-        
-        bet_info = CurrentRoundBet(
-            id=bet.id,
-            bot_id=bet.bot_id,
-            bot_name=bet.bot_name,
-            avatar_url=bet.avatar_url,
-            direction=bet.direction,
-            reason=bet.reason,
-            confidence=bet.confidence,
-            created_at=bet.created_at,
-            score=score,
-            win_rate=win_rate,
-            streak=streaks.get(bet.bot_id, 0)
-        )
+        bet_info = current_round_bet(bet, scores.get(bet.bot_id))
 
         if bet.direction == "long":
             long_bets.append(bet_info)
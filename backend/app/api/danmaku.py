@@ -6,7 +6,6 @@ from datetime import datetime, timedelta
 import hashlib
 
 from app.db.database import get_db
-from app.models import Round
 from app.models.danmaku import Danmaku
 from app.schemas.common import APIResponse
 from app.schemas.danmaku import (
@@ -15,6 +14,8 @@ from app.schemas.danmaku import (
     DanmakuListData,
     DanmakuPollData,
 )
+from app.services.active_rounds import active_rounds
+from app.services.ws_hub import ws_hub
 
 router = APIRouter()
 
@@ -47,13 +48,7 @@ async def send_danmaku(
     - 内容限制 1-100 字符
     """
     # 获取当前活跃的 round
-    round_result = await db.execute(
-        select(Round)
-        .where(Round.symbol == data.symbol, Round.status == "active")
-        .order_by(Round.start_time.desc())
-        .limit(1)
-    )
-    current_round = round_result.scalar_one_or_none()
+    current_round = await active_rounds.get(data.symbol)
 
     if not current_round:
         return APIResponse(
@@ -95,18 +90,21 @@ async def send_danmaku(
     await db.commit()
     await db.refresh(danmaku)
 
+    danmaku_out = DanmakuOut(
+        id=danmaku.id,
+        round_id=danmaku.round_id,
+        symbol=danmaku.symbol,
+        user_id=danmaku.user_id,
+        nickname=danmaku.nickname,
+        content=danmaku.content,
+        color=danmaku.color,
+        created_at=danmaku.created_at,
+    )
+    await ws_hub.publish_event("danmaku", data.symbol, "danmaku", danmaku_out.model_dump(mode="json"))
+
     return APIResponse(
         success=True,
-        data=DanmakuOut(
-            id=danmaku.id,
-            round_id=danmaku.round_id,
-            symbol=danmaku.symbol,
-            user_id=danmaku.user_id,
-            nickname=danmaku.nickname,
-            content=danmaku.content,
-            color=danmaku.color,
-            created_at=danmaku.created_at,
-        )
+        data=danmaku_out
     )
 
 
@@ -123,13 +121,7 @@ async def get_danmaku(
     - 按时间正序返回（最早的在前）
     """
     # 获取当前活跃的 round
-    round_result = await db.execute(
-        select(Round)
-        .where(Round.symbol == symbol, Round.status == "active")
-        .order_by(Round.start_time.desc())
-        .limit(1)
-    )
-    current_round = round_result.scalar_one_or_none()
+    current_round = await active_rounds.get(symbol)
 
     if not current_round:
         return APIResponse(
@@ -198,13 +190,7 @@ async def poll_danmaku(
     - 用于前端轮询实现实时弹幕效果
     """
     # 获取当前活跃的 round
-    round_result = await db.execute(
-        select(Round)
-        .where(Round.symbol == symbol, Round.status == "active")
-        .order_by(Round.start_time.desc())
-        .limit(1)
-    )
-    current_round = round_result.scalar_one_or_none()
+    current_round = await active_rounds.get(symbol)
 
     if not current_round:
         return APIResponse(
@@ -1,23 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import select
-from sqlalchemy.ext.asyncio import AsyncSession
-from app.db.database import get_db
-from app.models import Symbol
+from fastapi import APIRouter, HTTPException
 from app.schemas.common import APIResponse
 from app.services.market import market_service
+from app.services.symbol_config import symbol_configs
 
 router = APIRouter()
 
 
 @router.get("/{symbol}", response_model=APIResponse)
-async def get_market_data(
-    symbol: str,
-    db: AsyncSession = Depends(get_db)
-):
+async def get_market_data(symbol: str):
     """Get real-time market data for a symbol"""
     # Get symbol config
-    result = await db.execute(select(Symbol).where(Symbol.symbol == symbol))
-    sym = result.scalar_one_or_none()
+    sym = await symbol_configs.get(symbol)
 
     if not sym:
         raise HTTPException(status_code=404, detail="Symbol not found")
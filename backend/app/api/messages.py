@@ -29,7 +29,9 @@ from app.schemas.message import (
     parse_mentions_from_content,
     truncate_preview,
 )
+from app.services.active_rounds import active_rounds
 from app.services.auth import get_current_bot, BotIdentity
+from app.services.ws_hub import ws_hub
 
 router = APIRouter()
 
@@ -144,13 +146,7 @@ async def send_message(
     - message_type: chat(闲聊), taunt(嘲讽), support(支持), analysis(分析)
     """
     # 获取当前活跃的 round（如果有）
-    round_result = await db.execute(
-        select(Round)
-        .where(Round.symbol == data.symbol, Round.status == "active")
-        .order_by(Round.start_time.desc())
-        .limit(1)
-    )
-    current_round = round_result.scalar_one_or_none()
+    current_round = await active_rounds.get(data.symbol)
     round_id = current_round.id if current_round else None
 
     # 解析 @mentions
@@ -199,9 +195,12 @@ async def send_message(
     await db.commit()
     await db.refresh(message)
 
+    message_out = message_to_out(message)
+    await ws_hub.publish_event("messages", data.symbol, "message", message_out.model_dump(mode="json"))
+
     return APIResponse(
         success=True,
-        data=message_to_out(message),
+        data=message_out,
         hint=f"Message sent! {len(mentions_info)} agents mentioned."
     )
 
@@ -221,13 +220,7 @@ async def get_messages(
     """
     # 如果没指定 round_id，获取当前活跃 round
     if round_id is None:
-        round_result = await db.execute(
-            select(Round)
-            .where(Round.symbol == symbol, Round.status == "active")
-            .order_by(Round.start_time.desc())
-            .limit(1)
-        )
-        current_round = round_result.scalar_one_or_none()
+        current_round = await active_rounds.get(symbol)
         round_id = current_round.id if current_round else None
 
     # 构建查询
@@ -275,13 +268,7 @@ async def poll_messages(
     - 返回点赞数和评论数（reply_count）
     """
     # 获取当前活跃的 round
-    round_result = await db.execute(
-        select(Round)
-        .where(Round.symbol == symbol, Round.status == "active")
-        .order_by(Round.start_time.desc())
-        .limit(1)
-    )
-    current_round = round_result.scalar_one_or_none()
+    current_round = await active_rounds.get(symbol)
 
     if not current_round:
         return APIResponse(
@@ -716,6 +703,15 @@ async def add_reaction(
     message.likes_count += 1
     
     await db.commit()
+
+    await ws_hub.publish_event("reactions", message.symbol, "reaction", {
+        "action": "add",
+        "message_id": message_id,
+        "emoji": data.emoji,
+        "bot_id": bot.bot_id,
+        "bot_name": bot.bot_name,
+        "likes_count": message.likes_count,
+    })
     
     return APIResponse(
         success=True,
@@ -787,6 +783,15 @@ async def remove_reaction(
     message.likes_count = max(0, message.likes_count - 1)
     
     await db.commit()
+
+    await ws_hub.publish_event("reactions", message.symbol, "reaction", {
+        "action": "remove",
+        "message_id": message_id,
+        "emoji": emoji,
+        "bot_id": bot.bot_id,
+        "bot_name": bot.bot_name,
+        "likes_count": message.likes_count,
+    })
     
     return APIResponse(
         success=True,
@@ -5,12 +5,14 @@ from typing import Optional
 from datetime import datetime
 import logging
 from app.db.database import get_db
-from app.models import Symbol, Round
+from app.models import Round
 from app.schemas.common import APIResponse
 from app.schemas.round import RoundOut, RoundListResponse, CurrentRoundResponse, PriceSnapshot, ScoringInfo
+from app.services.active_rounds import active_rounds
 from app.services.market import market_service
 from app.services.scoring import scoring_service
-from app.services.price_history import price_history_service
+from app.services.symbol_config import symbol_configs
+from app.services.price_history import price_history_service, snapshot_writer
 from app.core.config import settings
 
 router = APIRouter()
@@ -24,8 +26,7 @@ async def get_current_round(
 ):
     """Get current active round for a symbol"""
     # Check symbol exists and is enabled
-    sym_result = await db.execute(select(Symbol).where(Symbol.symbol == symbol))
-    sym = sym_result.scalar_one_or_none()
+    sym = await symbol_configs.get(symbol)
 
     if not sym:
         raise HTTPException(status_code=404, detail="Symbol not found")
@@ -38,13 +39,7 @@ async def get_current_round(
         )
 
     # Get active round
-    result = await db.execute(
-        select(Round)
-        .where(Round.symbol == symbol, Round.status == "active")
-        .order_by(Round.start_time.desc())
-        .limit(1)
-    )
-    current_round = result.scalar_one_or_none()
+    current_round = await active_rounds.get(symbol)
 
     if not current_round:
         return APIResponse(
@@ -82,12 +77,7 @@ async def get_current_round(
         # Also record current price to ensure we capture the latest
         import calendar
         now_ms = int(calendar.timegm(now.timetuple()) * 1000)
-        await price_history_service.record_price(
-            db=db,
-            round_id=current_round.id,
-            timestamp_ms=now_ms,
-            price=current_price
-        )
+        snapshot_writer.append(current_round.id, now_ms, current_price)
         
         # Convert to response format
         for point in history_data:
@@ -188,8 +178,7 @@ async def get_round_history(
     # Get symbol info for each round
     items = []
     for r in rounds:
-        sym_result = await db.execute(select(Symbol).where(Symbol.symbol == r.symbol))
-        sym = sym_result.scalar_one_or_none()
+        sym = await symbol_configs.get(r.symbol)
 
         price_change_percent = (r.price_change * 100) if r.price_change else 0
 
@@ -232,8 +221,7 @@ async def get_round_detail(
     if not round_data:
         raise HTTPException(status_code=404, detail="Round not found")
 
-    sym_result = await db.execute(select(Symbol).where(Symbol.symbol == round_data.symbol))
-    sym = sym_result.scalar_one_or_none()
+    sym = await symbol_configs.get(round_data.symbol)
 
     price_change_percent = (round_data.price_change *
                             100) if round_data.price_change else None
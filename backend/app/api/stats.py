@@ -6,9 +6,22 @@ from typing import Optional
 import logging
 
 from app.db.database import get_db
-from app.models import Symbol, Round, Bet, BotScore
+from app.models import Round, Bet, BotScore
 from app.schemas.common import APIResponse
 from app.services.keywords import get_keyword_extractor
+from app.services.http_client import http_transport
+from app.services.market import market_service
+from app.services.price_feed import price_feed
+from app.services.price_history import snapshot_writer
+from app.services.price_buffer import price_buffers
+from app.services.backfill import fills_backfill
+from app.services.round_scheduler import round_scheduler
+from app.services.leader import scheduler_lease
+from app.services.round_snapshot import round_snapshots
+from app.services.active_rounds import active_rounds
+from app.services.symbol_config import symbol_configs
+from app.services.leaderboard import leaderboards
+from app.services.rank_index import rank_index
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -55,8 +68,7 @@ async def get_stats(
         draw_rounds = draw_result.scalar() or 0
 
         # Get symbol info
-        sym_result = await db.execute(select(Symbol).where(Symbol.symbol == symbol))
-        sym = sym_result.scalar_one_or_none()
+        sym = await symbol_configs.get(symbol)
 
         return APIResponse(
             success=True,
@@ -85,10 +97,7 @@ async def get_stats(
         total_bots = bots_result.scalar() or 0
 
         # Active symbols
-        active_result = await db.execute(
-            select(func.count(Symbol.symbol)).where(Symbol.enabled == True)
-        )
-        active_symbols = active_result.scalar() or 0
+        active_symbols = len(await symbol_configs.enabled())
 
         return APIResponse(
             success=True,
@@ -101,6 +110,29 @@ async def get_stats(
         )
 
 
+@router.get("/runtime", response_model=APIResponse)
+async def get_runtime_stats():
+    """Get in-process runtime statistics (HTTP pool, price feed, price cache, snapshot writer, price buffers, backfill, round timers, leader lease, round snapshots)"""
+    return APIResponse(
+        success=True,
+        data={
+            "http_pool": http_transport.get_stats(),
+            "price_feed": price_feed.get_stats(),
+            "price_cache": market_service.price_cache.get_stats(),
+            "snapshot_writer": snapshot_writer.get_stats(),
+            "price_buffers": price_buffers.get_stats(),
+            "backfill": fills_backfill.get_stats(),
+            "round_scheduler": round_scheduler.get_stats(),
+            "leader": scheduler_lease.get_stats(),
+            "round_snapshots": round_snapshots.get_stats(),
+            "active_rounds": active_rounds.get_stats(),
+            "symbol_configs": symbol_configs.get_stats(),
+            "leaderboards": leaderboards.get_stats(),
+            "rank_index": rank_index.get_stats(),
+        }
+    )
+
+
 class KeywordsRequest(BaseModel):
     """Request body for keyword extraction"""
 
@@ -1,11 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import select, func
-from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import APIRouter, Header, HTTPException
+from collections import Counter
 from typing import Optional
-from app.db.database import get_db
-from app.models import Symbol, Round
+import secrets
+from app.core.config import settings
 from app.schemas.common import APIResponse
 from app.schemas.symbol import SymbolOut, SymbolListResponse, CategoryCount
+from app.services.active_rounds import active_rounds
+from app.services.symbol_config import symbol_configs, SYMBOLS_TOPIC
+from app.services.ws_hub import ws_hub
 
 router = APIRouter()
 
@@ -21,30 +23,20 @@ CATEGORY_NAMES = {
 @router.get("", response_model=APIResponse)
 async def get_symbols(
     category: Optional[str] = None,
-    enabled: Optional[bool] = None,
-    db: AsyncSession = Depends(get_db)
+    enabled: Optional[bool] = None
 ):
     """Get all available symbols"""
-    query = select(Symbol)
-
-    if category:
-        query = query.where(Symbol.category == category)
-    if enabled is not None:
-        query = query.where(Symbol.enabled == enabled)
-
-    result = await db.execute(query.order_by(Symbol.enabled.desc(), Symbol.symbol))
-    symbols = result.scalars().all()
+    all_symbols = await symbol_configs.all()
+    symbols = [
+        sym for sym in all_symbols
+        if (not category or sym.category == category)
+        and (enabled is None or sym.enabled == enabled)
+    ]
 
-    # Check active rounds for each symbol
+    # Check active rounds for each symbol (in memory, no query per symbol)
     items = []
     for sym in symbols:
-        # Check if there's an active round
-        round_result = await db.execute(
-            select(Round)
-            .where(Round.symbol == sym.symbol, Round.status == "active")
-            .limit(1)
-        )
-        has_active = round_result.scalar_one_or_none() is not None
+        has_active = await active_rounds.has_active(sym.symbol)
 
         items.append(SymbolOut(
             symbol=sym.symbol,
@@ -58,17 +50,14 @@ async def get_symbols(
         ))
 
     # Get category counts
-    category_result = await db.execute(
-        select(Symbol.category, func.count(Symbol.symbol))
-        .group_by(Symbol.category)
-    )
+    category_counts = Counter(sym.category for sym in all_symbols)
     categories = [
         CategoryCount(
-            id=row[0],
-            name=CATEGORY_NAMES.get(row[0], row[0].title()),
-            count=row[1]
+            id=cat,
+            name=CATEGORY_NAMES.get(cat, cat.title()),
+            count=count
         )
-        for row in category_result.all()
+        for cat, count in category_counts.items()
     ]
 
     return APIResponse(
@@ -77,14 +66,33 @@ async def get_symbols(
     )
 
 
-@router.get("/{symbol}", response_model=APIResponse)
-async def get_symbol(
-    symbol: str,
-    db: AsyncSession = Depends(get_db)
+@router.post("/reload", response_model=APIResponse)
+async def reload_symbols(
+    x_admin_token: Optional[str] = Header(None, alias="X-Admin-Token")
 ):
+    """
+    Reload symbol configs after editing the symbols table (admin).
+
+    Reloads this worker now and notifies the others (and clients subscribed
+    to the "symbols" topic) with a `symbols_updated` event; without this,
+    edits are picked up by the SYMBOL_CONFIG_POLL_INTERVAL poll.
+    """
+    if not settings.ADMIN_TOKEN or not x_admin_token or \
+            not secrets.compare_digest(x_admin_token, settings.ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Admin token required")
+
+    await symbol_configs.reload()
+    await ws_hub.publish_event(SYMBOLS_TOPIC, None, "symbols_updated", {
+        "version": symbol_configs.version,
+        "symbols": len(await symbol_configs.all()),
+    })
+    return APIResponse(success=True, data=symbol_configs.get_stats())
+
+
+@router.get("/{symbol}", response_model=APIResponse)
+async def get_symbol(symbol: str):
     """Get symbol details"""
-    result = await db.execute(select(Symbol).where(Symbol.symbol == symbol))
-    sym = result.scalar_one_or_none()
+    sym = await symbol_configs.get(symbol)
 
     if not sym:
         raise HTTPException(status_code=404, detail="Symbol not found")
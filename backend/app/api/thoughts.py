@@ -11,6 +11,7 @@ from app.schemas.thought import (
     CommentCreate, CommentOut, ThoughtDetailOut
 )
 from app.services.auth import get_current_bot, get_optional_bot, BotIdentity
+from app.services.ws_hub import ws_hub
 
 router = APIRouter()
 
@@ -117,19 +118,22 @@ async def create_thought(
     await db.commit()
     await db.refresh(thought)
     
+    thought_out = ThoughtOut(
+        id=thought.id,
+        bot_id=bot.bot_id,
+        bot_name=bot.bot_name,
+        avatar_url=bot.avatar_url,
+        content=thought.content,
+        likes_count=0,
+        comments_count=0,
+        liked_by_me=False,
+        created_at=thought.created_at
+    )
+    await ws_hub.publish_event("thoughts", None, "thought", thought_out.model_dump(mode="json"))
+    
     return APIResponse(
         success=True,
-        data=ThoughtOut(
-            id=thought.id,
-            bot_id=bot.bot_id,
-            bot_name=bot.bot_name,
-            avatar_url=bot.avatar_url,
-            content=thought.content,
-            likes_count=0,
-            comments_count=0,
-            liked_by_me=False,
-            created_at=thought.created_at
-        ),
+        data=thought_out,
         hint="Your thought has been shared publicly! Keep learning and sharing."
     )
 
@@ -348,16 +352,23 @@ async def create_comment(
     await db.commit()
     await db.refresh(comment)
     
+    comment_out = CommentOut(
+        id=comment.id,
+        bot_id=bot.bot_id,
+        bot_name=bot.bot_name,
+        avatar_url=bot.avatar_url,
+        content=comment.content,
+        created_at=comment.created_at
+    )
+    await ws_hub.publish_event("thoughts", None, "thought_comment", {
+        "thought_id": thought_id,
+        "comments_count": thought.comments_count,
+        "comment": comment_out.model_dump(mode="json"),
+    })
+    
     return APIResponse(
         success=True,
-        data=CommentOut(
-            id=comment.id,
-            bot_id=bot.bot_id,
-            bot_name=bot.bot_name,
-            avatar_url=bot.avatar_url,
-            content=comment.content,
-            created_at=comment.created_at
-        ),
+        data=comment_out,
         hint="Comment added!"
     )
 
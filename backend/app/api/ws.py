@@ -2,24 +2,26 @@
 WebSocket API endpoints for real-time arena data streaming.
 
 Protocol:
-- Connect: GET /ws/arena?symbol=BTCUSDT
-- Server sends: round_start, price_tick, round_end, bets_update
-- Client sends: {"action": "switch", "symbol": "..."} or {"action": "ping"}
+- Connect: GET /ws/arena?symbol=BTCUSDT[&topics=arena,bets,danmaku]
+- Server sends: round_start, price_tick, round_end, bets_update, message,
+  reaction, danmaku, thought, thought_comment
+- Client sends: {"action": "switch", "symbol": "..."},
+  {"action": "subscribe"/"unsubscribe", "symbol": "...", "topics": [...]},
+  {"action": "resume", "symbol": "...", "epoch": "...", "seq": N}
+  or {"action": "ping"}
+- Arena events carry `seq`/`epoch`; reconnecting with ?epoch=...&seq=N
+  (or sending `resume`) replays only the missed events when still buffered
+- ?encoding=compact: binary price_tick and columnar price_history (see ws_codec)
+- ?tick_interval=N (or "tick_interval" in subscribe): at most one price_tick
+  per N seconds per arena, lifecycle events still immediate
 """
 
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Query, Depends
-from sqlalchemy import select
-from sqlalchemy.ext.asyncio import AsyncSession
-from datetime import datetime
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Query
 import logging
 import json
 
-from app.db.database import AsyncSessionLocal
-from app.models import Symbol, Round
-from app.services.ws_hub import ws_hub
-from app.services.market import market_service
-from app.services.price_history import price_history_service
-from app.services.scoring import scoring_service
+from app.services.ws_hub import ws_hub, channel_name, TOPICS
+from app.services.round_snapshot import round_snapshots
 from app.core.config import settings
 
 router = APIRouter()
@@ -28,142 +30,141 @@ logger = logging.getLogger(__name__)
 
 async def get_current_round_data(symbol: str) -> dict | None:
     """
-    Fetch current round data for WebSocket initial push.
+    Current round data for WebSocket initial push (from the snapshot cache).
     
     Returns full round data or None if no active round.
     """
-    async with AsyncSessionLocal() as db:
-        # Get symbol config
-        sym_result = await db.execute(select(Symbol).where(Symbol.symbol == symbol))
-        sym = sym_result.scalar_one_or_none()
-        
-        if not sym or not sym.enabled:
-            return None
-        
-        # Get active round
-        result = await db.execute(
-            select(Round)
-            .where(Round.symbol == symbol, Round.status == "active")
-            .order_by(Round.start_time.desc())
-            .limit(1)
-        )
-        current_round = result.scalar_one_or_none()
-        
-        if not current_round:
-            return None
-        
-        # Get current price
-        try:
-            current_price = await market_service.get_price_by_source(
-                sym.symbol, sym.api_source, sym.product_type
-            )
-        except Exception:
-            current_price = current_round.open_price
-        
-        # Calculate timing
-        now = datetime.utcnow()
-        remaining = max(0, int((current_round.end_time - now).total_seconds()))
-        price_change = ((current_price - current_round.open_price) / 
-                        current_round.open_price) * 100 if current_round.open_price else 0
-        
-        # Get price history
-        price_history = []
-        try:
-            history_data = await price_history_service.ensure_round_history(
-                db=db,
-                round=current_round,
-                symbol_product_type=sym.product_type,
-                min_coverage=0.5
-            )
-            price_history = [
-                {"timestamp": p["timestamp"], "price": float(p["price"])}
-                for p in history_data
-            ]
-        except Exception as e:
-            logger.warning(f"Failed to get price history: {e}")
-        
-        # Betting window
-        betting_open = remaining >= settings.BETTING_CUTOFF_REMAINING
-        
-        # Scoring info
-        scoring = None
-        if betting_open:
-            betting_window = settings.BETTING_WINDOW
-            time_progress = scoring_service.calculate_time_progress(
-                now, current_round.start_time, betting_window
-            )
-            decay = scoring_service.calculate_decay(time_progress)
-            win_score, lose_score = scoring_service.estimate_scores(time_progress, win_streak=0)
-            
-            scoring = {
-                "time_progress": round(time_progress, 3),
-                "time_progress_percent": int(time_progress * 100),
-                "estimated_win_score": win_score,
-                "estimated_lose_score": lose_score,
-                "early_bonus_remaining": round(decay, 3)
-            }
-        
-        return {
-            "id": current_round.id,
-            "symbol": current_round.symbol,
-            "display_name": sym.display_name,
-            "category": sym.category,
-            "emoji": sym.emoji,
-            "start_time": current_round.start_time.isoformat() + "Z",
-            "end_time": current_round.end_time.isoformat() + "Z",
-            "open_price": float(current_round.open_price),
-            "current_price": float(current_price),
-            "price_change_percent": round(price_change, 4),
-            "status": current_round.status,
-            "remaining_seconds": remaining,
-            "betting_open": betting_open,
-            "bet_count": current_round.bet_count,
-            "price_history": price_history,
-            "scoring": scoring
-        }
+    return await round_snapshots.get_data(symbol)
+
+
+def parse_topics(raw) -> list[str] | None:
+    """Topic list from a query string ("a,b") or JSON list; None if any is unknown."""
+    if raw is None:
+        return ["arena"]
+    if isinstance(raw, str):
+        raw = [t.strip() for t in raw.split(",") if t.strip()]
+    if not isinstance(raw, list) or not raw or any(t not in TOPICS for t in raw):
+        return None
+    return list(dict.fromkeys(raw))
+
+
+def parse_tick_interval(raw) -> int | None:
+    """Tick cadence in whole seconds (1..WS_MAX_TICK_INTERVAL); None if invalid."""
+    if isinstance(raw, bool) or not isinstance(raw, int):
+        return None
+    if not 1 <= raw <= settings.WS_MAX_TICK_INTERVAL:
+        return None
+    return raw
+
+
+async def send_round_snapshot(websocket: WebSocket, symbol: str) -> None:
+    """Queue the current round of a symbol (or no_round) for one connection."""
+    # Pre-encoded and shared by every connect in the same second
+    frame = await round_snapshots.get_frame(symbol)
+    if frame is not None:
+        await ws_hub.send_frame(websocket, frame, channel=symbol)
+    else:
+        message = {"type": "no_round", "symbol": symbol}
+        epoch, seq = ws_hub.get_position(symbol)
+        if epoch is not None:
+            message["seq"], message["epoch"] = seq, epoch
+        message["message"] = f"No active round for {symbol}. Waiting for next round..."
+        await ws_hub.send(websocket, message)
+
+
+async def resume_arena(websocket: WebSocket, symbol: str, epoch, seq) -> None:
+    """
+    Move the arena to `symbol`, replaying the events after (epoch, seq) if
+    they are still buffered, else sending the full round snapshot.
+    """
+    if isinstance(epoch, str) and isinstance(seq, int) and not isinstance(seq, bool):
+        replayed = await ws_hub.resume(websocket, symbol, epoch, seq)
+    else:
+        await ws_hub.subscribe(websocket, symbol)
+        replayed = None
+
+    if replayed is None:
+        await send_round_snapshot(websocket, symbol)
+    else:
+        await ws_hub.send(websocket, {
+            "type": "resumed",
+            "symbol": symbol,
+            "epoch": epoch,
+            "seq": seq,
+            "replayed": replayed
+        })
 
 
 @router.websocket("/arena")
 async def arena_websocket(
     websocket: WebSocket,
-    symbol: str = Query(default="BTCUSDT")
+    symbol: str = Query(default="BTCUSDT"),
+    topics: str = Query(default="arena", description="Comma-separated: " + ",".join(TOPICS)),
+    epoch: str | None = Query(default=None, description="Resume: epoch of the last arena event received"),
+    seq: int | None = Query(default=None, description="Resume: seq of the last arena event received"),
+    encoding: str = Query(default="json", description="Wire encoding: json or compact"),
+    tick_interval: int = Query(default=1, description="Seconds between price_ticks (1 = every tick)")
 ):
     """
     WebSocket endpoint for real-time arena updates.
     
-    Connect: ws://host/api/v1/ws/arena?symbol=BTCUSDT
+    Connect: ws://host/api/v1/ws/arena?symbol=BTCUSDT&topics=arena,bets[&encoding=compact]
     
     Server messages:
-    - {"type": "round_start", "data": {...}}  - New round started
-    - {"type": "price_tick", "data": {...}}   - Price update (every second)
-    - {"type": "round_end", "data": {...}}    - Round ended with result
-    - {"type": "bets_update", "data": {...}}  - Bets changed (optional)
+    - {"type": "round_start", "seq": N, "epoch": "...", "data": {...}}  - New round started / snapshot
+    - {"type": "price_tick", "symbol": "...", "data": {...}}  - Price update (every second)
+    - {"type": "round_end", "symbol": "...", "data": {...}}   - Round ended with result
+    - {"type": "bets_update", "symbol": "...", "data": {...}}      - Bet placed (topic: bets)
+    - {"type": "message", "symbol": "...", "data": {...}}          - Chat message (topic: messages)
+    - {"type": "reaction", "symbol": "...", "data": {...}}         - Reaction added/removed (topic: reactions)
+    - {"type": "danmaku", "symbol": "...", "data": {...}}          - Danmaku sent (topic: danmaku)
+    - {"type": "thought" / "thought_comment", "data": {...}}       - Thought activity (topic: thoughts, global)
+    - {"type": "symbols_updated", "data": {...}}                   - Symbol list changed (topic: symbols, global)
+    - {"type": "subscribed" / "unsubscribed", "symbol": ..., "topics": [...]}
+    - {"type": "resumed", "symbol": ..., "seq": N, "replayed": n}  - Missed events replayed
     - {"type": "pong"}                        - Response to ping
     - {"type": "error", "message": "..."}     - Error message
     
     Client messages:
-    - {"action": "switch", "symbol": "ETHUSDT"}  - Switch subscription
+    - {"action": "switch", "symbol": "ETHUSDT"}  - Switch the arena symbol
+    - {"action": "subscribe", "symbol": "ETHUSDT", "topics": ["arena", "bets"]}
+                                                  - Add symbols/topics (default topic: arena)
+    - {"action": "subscribe", "symbol": "ETHUSDT", "tick_interval": 5}
+                                                  - One price_tick per 5s for that arena
+    - {"action": "unsubscribe", "symbol": "ETHUSDT", "topics": ["bets"]}
+    - {"action": "resume", "symbol": "BTCUSDT", "epoch": "...", "seq": 1234}
+                                                  - Arena from seq 1234 on (or a snapshot)
     - {"action": "ping"}                          - Keep-alive ping
     """
     await websocket.accept()
+    ws_hub.register(websocket)
     logger.info(f"WS connection accepted for {symbol}")
     
     try:
-        # Subscribe to initial symbol
-        await ws_hub.subscribe(websocket, symbol)
-        
-        # Send current round data
-        round_data = await get_current_round_data(symbol)
-        if round_data:
-            await websocket.send_json({
-                "type": "round_start",
-                "data": round_data
-            })
-        else:
-            await websocket.send_json({
-                "type": "no_round",
-                "message": f"No active round for {symbol}. Waiting for next round..."
+        if encoding != "json":
+            try:
+                ws_hub.set_encoding(websocket, encoding)
+            except ValueError:
+                await ws_hub.send(websocket, {
+                    "type": "error",
+                    "message": f"Unknown encoding {encoding}, expected one of: {', '.join(ws_hub.encodings)}"
+                })
+
+        interval = parse_tick_interval(tick_interval)
+        if interval is None:
+            await ws_hub.send(websocket, {
+                "type": "error",
+                "message": f"Invalid tick_interval, expected 1-{settings.WS_MAX_TICK_INTERVAL}"
             })
+        elif interval > 1:
+            await ws_hub.set_tick_interval(websocket, [symbol], interval)
+
+        # Subscribe to initial symbol and send its round (or what was missed)
+        await resume_arena(websocket, symbol, epoch, seq)
+        initial_topics = parse_topics(topics) or ["arena"]
+        await ws_hub.add_channels(websocket, [
+            channel_name(t, symbol) for t in initial_topics if t != "arena"
+        ])
         
         # Listen for client messages
         while True:
@@ -174,7 +175,7 @@ async def arena_websocket(
                 try:
                     data = json.loads(raw_data)
                 except json.JSONDecodeError:
-                    await websocket.send_json({
+                    await ws_hub.send(websocket, {
                         "type": "error",
                         "message": "Invalid JSON"
                     })
@@ -191,28 +192,68 @@ async def arena_websocket(
                         logger.info(f"WS switched to {symbol}")
                         
                         # Send new round data
-                        round_data = await get_current_round_data(symbol)
-                        if round_data:
-                            await websocket.send_json({
-                                "type": "round_start",
-                                "data": round_data
-                            })
-                        else:
-                            await websocket.send_json({
-                                "type": "no_round",
-                                "message": f"No active round for {symbol}"
-                            })
+                        await send_round_snapshot(websocket, symbol)
                     else:
-                        await websocket.send_json({
+                        await ws_hub.send(websocket, {
                             "type": "error",
                             "message": "Invalid or same symbol"
                         })
                 
+                elif action in ("subscribe", "unsubscribe"):
+                    target = data.get("symbol") or symbol
+                    wanted = parse_topics(data.get("topics"))
+                    if wanted is None or not isinstance(target, str):
+                        await ws_hub.send(websocket, {
+                            "type": "error",
+                            "message": f"Invalid topics, expected a list of: {', '.join(TOPICS)}"
+                        })
+                        continue
+                    interval = None
+                    if action == "subscribe" and "tick_interval" in data:
+                        interval = parse_tick_interval(data["tick_interval"])
+                        if interval is None:
+                            await ws_hub.send(websocket, {
+                                "type": "error",
+                                "message": f"Invalid tick_interval, expected 1-{settings.WS_MAX_TICK_INTERVAL}"
+                            })
+                            continue
+                    channels = {channel_name(t, target): t for t in wanted}
+                    if interval is not None:
+                        # Also re-times an arena that is already subscribed
+                        await ws_hub.set_tick_interval(websocket, channels, interval)
+                    if action == "subscribe":
+                        changed = await ws_hub.add_channels(websocket, channels)
+                    else:
+                        changed = await ws_hub.remove_channels(websocket, channels)
+                    reply = {
+                        "type": f"{action}d",
+                        "symbol": target,
+                        "topics": [t for c, t in channels.items() if c in changed],
+                        "channels": sorted(ws_hub.get_channels(websocket)),
+                    }
+                    if interval is not None:
+                        reply["tick_interval"] = interval
+                    await ws_hub.send(websocket, reply)
+                    # A newly subscribed arena starts with its current round
+                    if action == "subscribe" and target in changed:
+                        await send_round_snapshot(websocket, target)
+                
+                elif action == "resume":
+                    target = data.get("symbol") or symbol
+                    if not isinstance(target, str):
+                        await ws_hub.send(websocket, {
+                            "type": "error",
+                            "message": "Invalid symbol"
+                        })
+                        continue
+                    await resume_arena(websocket, target, data.get("epoch"), data.get("seq"))
+                    symbol = target
+                
                 elif action == "ping":
-                    await websocket.send_json({"type": "pong"})
+                    await ws_hub.send(websocket, {"type": "pong"})
                 
                 else:
-                    await websocket.send_json({
+                    await ws_hub.send(websocket, {
                         "type": "error",
                         "message": f"Unknown action: {action}"
                     })
@@ -21,11 +21,81 @@ class Settings(BaseSettings):
     # Market Data API
     BITGET_API_BASE: str = "https://api.bitget.com"
 
+    # Outbound HTTP pool (shared keep-alive client)
+    HTTP2_ENABLED: bool = True
+    HTTP_MAX_CONNECTIONS: int = 100
+    HTTP_MAX_KEEPALIVE: int = 20
+    HTTP_MAX_CONNECTIONS_PER_HOST: int = 20
+    HTTP_KEEPALIVE_EXPIRY: float = 60.0  # seconds
+    HTTP_TIMEOUT: float = 10.0  # seconds
+    HTTP_CONNECT_TIMEOUT: float = 5.0  # seconds
+
+    # Streaming Price Feed (Bitget public WebSocket)
+    PRICE_FEED_ENABLED: bool = True
+    BITGET_WS_URL: str = "wss://ws.bitget.com/v2/ws/public"
+    PRICE_FEED_MAX_AGE: float = 5.0  # Streamed price older than this falls back to REST (seconds)
+    PRICE_FEED_PING_INTERVAL: float = 25.0  # Bitget drops connections without a ping every 30s
+    PRICE_FEED_SILENCE_TIMEOUT: float = 15.0  # Reconnect if nothing arrives for this long (seconds)
+    PRICE_FEED_GAP_THRESHOLD_MS: int = 3000  # Exchange-clock jump counted as a gap
+
+    # Price cache (REST fallback, shared by endpoints and scheduler jobs)
+    PRICE_CACHE_TTL: float = 1.0  # Serve a cached REST price up to this age (seconds)
+
+    # Price snapshot write-behind buffer
+    PRICE_WRITER_FLUSH_INTERVAL: float = 5.0  # Flush buffered ticks at least this often (seconds)
+    PRICE_WRITER_BATCH_SIZE: int = 500  # Rows per multi-row insert; a full batch triggers an early flush
+    PRICE_WRITER_MAX_BUFFER: int = 20000  # Oldest ticks are dropped beyond this (~1h of 5 symbols)
+    PRICE_BUFFER_SLACK: int = 60  # In-memory ring capacity = round duration + this many points
+
+    # Symbol config registry (in-memory copy of the symbols table)
+    SYMBOL_CONFIG_POLL_INTERVAL: float = 30.0  # Check symbols.updated_at for changes this often (seconds)
+    ADMIN_TOKEN: Optional[str] = None  # X-Admin-Token for admin endpoints (e.g. /symbols/reload); unset = disabled
+
+    # Leaderboard materializer (boards rebuilt after each settlement)
+    LEADERBOARD_MAX_LIMIT: int = 100  # Entries kept per board (the largest `limit` a request may ask for)
+    LEADERBOARD_REBUILD_DELAY: float = 1.0  # Wait after a round_end so symbols settling together share a rebuild (seconds)
+    LEADERBOARD_MAX_AGE: float = 900.0  # Rebuild on read if no settlement refreshed a board for this long (seconds)
+
+    # Active round registry (current round per symbol for request paths)
+    ACTIVE_ROUND_REFRESH_INTERVAL: float = 30.0  # Re-read all active rounds in one query this often (seconds)
+    ACTIVE_ROUND_GRACE: float = 5.0  # A round still listed this long past end_time triggers a re-check (seconds)
+
+    # Rank index (global / per-symbol rank without COUNT(*) queries)
+    RANK_INDEX_REFRESH_INTERVAL: float = 300.0  # Re-read every score as a consistency check this often (seconds)
+
+    # Price history backfill (Bitget fills-history)
+    BITGET_FILLS_RATE_LIMIT: float = 10.0  # fills-history requests/second (Bitget limit)
+    BACKFILL_SLICE_SECONDS: int = 10  # Window slice fetched as one paginated unit
+    BACKFILL_CONCURRENCY: int = 5  # Slices fetched at the same time
+    BACKFILL_MAX_PAGES_PER_SLICE: int = 20  # Safety cap on pagination per slice
+    BACKFILL_MAX_RETRIES: int = 3  # Retries per page (e.g. after a 429)
+
+    # WebSocket fan-out (per-connection outbound queues)
+    WS_SEND_QUEUE_SIZE: int = 64  # Frames buffered per connection before the overflow policy applies
+    WS_DROPPABLE_TYPES: list[str] = ["price_tick"]  # Stale frames of these types are dropped first
+    WS_SLOW_CLIENT_TIMEOUT: float = 10.0  # Disconnect a client whose queue stays full this long (seconds)
+    WS_MAX_CHANNELS_PER_CONNECTION: int = 50  # (topic, symbol) subscriptions per socket
+    WS_REPLAY_BUFFER_SIZE: int = 60  # Arena events kept per symbol for `resume` (keep <= WS_SEND_QUEUE_SIZE)
+    WS_MAX_TICK_INTERVAL: int = 60  # Slowest price_tick cadence a client may ask for (seconds)
+    WS_SWEEP_INTERVAL: float = 1.0  # Batch removal of closed connections from the hub registry (seconds)
+    ROUND_SNAPSHOT_EMPTY_TTL: float = 2.0  # Cache "no active round" per symbol for WS connects (seconds)
+    WS_BACKPLANE: str = "memory"  # "memory" (single process) or "redis" (multiple workers/nodes)
+    WS_BACKPLANE_URL: str = "redis://localhost:6379/0"
+    WS_BACKPLANE_CHANNEL: str = "clawbrawl:ws"  # Channel prefix; events go to <prefix>:<symbol>
+
+    # Leader election (only the lease holder runs the round scheduler and price sampler)
+    LEADER_ELECTION_ENABLED: bool = False  # Enable when running several API processes (needs scheduler_leases)
+    LEADER_LEASE_TTL: float = 15.0  # Lease expiry without renewal = worst-case failover (seconds)
+    LEADER_HEARTBEAT_INTERVAL: float = 5.0  # Renewal period; keep well below the TTL (seconds)
+
     # OpenAI (for keyword extraction)
     OPENAI_API_KEY: Optional[str] = None
 
     # Round Settings
     DEFAULT_ROUND_DURATION: int = 600  # 10 minutes in seconds
+    ROUND_RECONCILE_INTERVAL: int = 60  # Safety DB reconcile of round timers (seconds)
+    ROUND_RETRY_DELAY: float = 5.0  # Retry delay after a failed settlement/creation (seconds)
+    SETTLEMENT_BATCH_SIZE: int = 1000  # Rows per bulk statement when settling a round
     BETTING_WINDOW: int = 420  # First 7 minutes of each round (in seconds)
     BETTING_CUTOFF_REMAINING: int = 180  # Must have >= 180 seconds remaining to bet (last 3 min closed)
     DRAW_THRESHOLD: float = 0.0001  # 0.01%
@@ -56,6 +126,7 @@ class Settings(BaseSettings):
     STREAK_DECAY_AMOUNT: int = 1                # How much streak decays per skipped round
     STREAK_SKIP_GRACE_ROUNDS: int = 2           # Allow skipping N rounds before decay kicks in
     STREAK_ACTIVITY_WINDOW_ROUNDS: int = 10     # Window to check for activity (last N rounds)
+    STREAK_DISPLAY_CAP: int = 10                # Displayed streak (current_streak) is capped at ±N, as the old last-10-bets window was
 
     class Config:
         env_file = ".env"
@@ -6,16 +6,27 @@ from contextlib import asynccontextmanager
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.interval import IntervalTrigger
 from datetime import datetime
+import asyncio
 import logging
 
 from app.core.config import settings
 from app.db.database import AsyncSessionLocal
 from app.api import api_router
-from app.services.round_manager import round_manager
+from app.services.round_scheduler import round_scheduler
 from app.services.market import market_service
-from app.services.price_history import price_history_service
+from app.services.http_client import http_transport
+from app.services.price_feed import price_feed
+from app.services.price_history import snapshot_writer
+from app.services.price_buffer import price_buffers
+from app.services.active_rounds import active_rounds
+from app.services.symbol_config import symbol_configs
+from app.services.leaderboard import leaderboards
+from app.services.rank_index import rank_index
+from app.services.round_snapshot import round_snapshots
+from app.services.ws_codec import compact_codec
 from app.services.ws_hub import ws_hub
-from app.models import Symbol, Round
+from app.services.leader import scheduler_lease
+from app.models import Symbol
 from sqlalchemy import select
 import time
 
@@ -35,211 +46,85 @@ async def price_sampler_job():
     Price sampler job - runs every second
     Records current price for all active rounds to database.
     Also broadcasts price_tick to WebSocket subscribers.
+    Active rounds come from the `active_rounds` registry: no query per tick.
     
     This ensures we have second-level price history even if:
     - Frontend is not connected
     - Backend restarts (data persists in DB)
     - Bitget API has gaps
     """
-    async with AsyncSessionLocal() as db:
-        try:
-            # Get all active rounds
-            result = await db.execute(
-                select(Round, Symbol)
-                .join(Symbol, Round.symbol == Symbol.symbol)
-                .where(Round.status == "active")
-            )
-            active_rounds = result.all()
-            
-            for round_obj, symbol_config in active_rounds:
-                try:
-                    # Get current price
-                    current_price = await market_service.get_price_by_source(
-                        symbol_config.symbol,
-                        symbol_config.api_source,
-                        symbol_config.product_type
-                    )
-                    
-                    # Record to database
-                    timestamp_ms = int(time.time() * 1000)
-                    await price_history_service.record_price(
-                        db=db,
-                        round_id=round_obj.id,
-                        timestamp_ms=timestamp_ms,
-                        price=current_price
-                    )
-                    
-                    # Calculate price change and remaining time
-                    now = datetime.utcnow()
-                    remaining = max(0, int((round_obj.end_time - now).total_seconds()))
-                    price_change = ((current_price - round_obj.open_price) / 
-                                    round_obj.open_price) * 100 if round_obj.open_price else 0
-                    
-                    # Broadcast price_tick to WebSocket subscribers
-                    await ws_hub.broadcast(symbol_config.symbol, {
-                        "type": "price_tick",
-                        "data": {
-                            "price": float(current_price),
-                            "timestamp": timestamp_ms,
-                            "change_percent": round(price_change, 4),
-                            "remaining_seconds": remaining
-                        }
-                    })
-                    
-                except Exception as e:
-                    logger.debug(f"Price sample failed for {symbol_config.symbol}: {e}")
-                    
-        except Exception as e:
-            logger.error(f"Price sampler error: {e}")
-
+    if not scheduler_lease.is_leader:
+        return  # Paused on followers; guards a tick already queued at demotion
 
-async def round_scheduler_job():
-    """
-    Round scheduler job - runs every 5 seconds
-    Checks all enabled symbols and manages their rounds.
-    Also broadcasts round_start and round_end events to WebSocket subscribers.
-    
-    Rounds are aligned to fixed 10-minute intervals:
-    - Start times: :00, :10, :20, :30, :40, :50
-    - Each round runs for exactly 10 minutes
-    - Example: 14:00-14:10, 14:10-14:20, etc.
-    """
-    logger.debug("Running round scheduler...")
+    try:
+        # All active rounds, from the in-process registry (no per-tick query)
+        rows = [
+            (round_obj, symbol_config)
+            for round_obj in await active_rounds.all()
+            if (symbol_config := await symbol_configs.get(round_obj.symbol)) is not None
+        ]
+        if not rows:
+            return
 
-    async with AsyncSessionLocal() as db:
-        # Get all enabled symbols
-        result = await db.execute(
-            select(Symbol).where(Symbol.enabled == True)
+        # One batched fetch for every active symbol (one call per product type)
+        prices = await market_service.get_prices(
+            [symbol_config for _, symbol_config in rows]
         )
-        symbols = result.scalars().all()
 
-        for sym in symbols:
+        broadcasts = []
+        for round_obj, symbol_config in rows:
+            current_price = prices.get(symbol_config.symbol)
+            if current_price is None:
+                logger.debug(f"Price sample failed for {symbol_config.symbol}: no price")
+                continue
             try:
+                # Queue for persistence (flushed in batches by snapshot_writer)
+                timestamp_ms = int(time.time() * 1000)
+                snapshot_writer.append(round_obj.id, timestamp_ms, current_price)
+                price_buffers.append(round_obj.id, timestamp_ms, current_price)
+                
+                # Calculate price change and remaining time
                 now = datetime.utcnow()
-                duration = sym.round_duration or settings.DEFAULT_ROUND_DURATION
+                remaining = max(0, int((round_obj.end_time - now).total_seconds()))
+                price_change = ((current_price - round_obj.open_price) / 
+                                round_obj.open_price) * 100 if round_obj.open_price else 0
+                
+                # price_tick for WebSocket subscribers (sent together below)
+                broadcasts.append(ws_hub.broadcast(symbol_config.symbol, {
+                    "type": "price_tick",
+                    "symbol": symbol_config.symbol,
+                    "data": {
+                        "round_id": round_obj.id,
+                        "price": float(current_price),
+                        "timestamp": timestamp_ms,
+                        "change_percent": round(price_change, 4),
+                        "remaining_seconds": remaining
+                    }
+                }))
                 
-                # Calculate current aligned interval
-                current_start, current_end = round_manager.get_aligned_round_times(now, duration)
-
-                # Check for active or settling rounds
-                active_result = await db.execute(
-                    select(Round)
-                    .where(Round.symbol == sym.symbol, Round.status.in_(["active", "settling"]))
-                    .order_by(Round.start_time.desc())
-                    .limit(1)
-                )
-                active_round = active_result.scalar_one_or_none()
-
-                if active_round:
-                    # Check if round should be settled (end_time has passed)
-                    if now >= active_round.end_time:
-                        logger.info(
-                            f"Settling round {active_round.id} for {sym.symbol} "
-                            f"(ended at {active_round.end_time.strftime('%H:%M:%S')}, status: {active_round.status})")
-                        try:
-                            settled_round = await round_manager.settle_round(db, active_round.id)
-                            
-                            # Broadcast round_end event
-                            if settled_round:
-                                price_change_pct = (settled_round.price_change * 100) if settled_round.price_change else 0
-                                await ws_hub.broadcast(sym.symbol, {
-                                    "type": "round_end",
-                                    "data": {
-                                        "id": settled_round.id,
-                                        "result": settled_round.result,
-                                        "close_price": float(settled_round.close_price) if settled_round.close_price else None,
-                                        "price_change_percent": round(price_change_pct, 4)
-                                    }
-                                })
-                                logger.info(f"Broadcast round_end for {sym.symbol} round {settled_round.id}")
-                        except Exception as settle_err:
-                            logger.error(
-                                f"Settlement error for {sym.symbol}: {settle_err}")
-                        
-                        # Check if we need a new round for the current interval
-                        # Only create if we're within the current aligned interval
-                        if current_start <= now < current_end:
-                            # Check if a round already exists for this interval
-                            existing_result = await db.execute(
-                                select(Round)
-                                .where(
-                                    Round.symbol == sym.symbol,
-                                    Round.start_time == current_start
-                                )
-                            )
-                            existing_round = existing_result.scalar_one_or_none()
-                            
-                            if not existing_round:
-                                logger.info(
-                                    f"Creating new round for {sym.symbol} "
-                                    f"({current_start.strftime('%H:%M')} - {current_end.strftime('%H:%M')})")
-                                new_round = await round_manager.create_round(db, sym)
-                                
-                                # Broadcast round_start event
-                                if new_round:
-                                    await _broadcast_round_start(sym, new_round)
-                else:
-                    # No active round - check if we should create one for current interval
-                    if current_start <= now < current_end:
-                        # Check if a round already exists for this interval (might be settled)
-                        existing_result = await db.execute(
-                            select(Round)
-                            .where(
-                                Round.symbol == sym.symbol,
-                                Round.start_time == current_start
-                            )
-                        )
-                        existing_round = existing_result.scalar_one_or_none()
-                        
-                        if not existing_round:
-                            logger.info(
-                                f"No active round for {sym.symbol}, creating one "
-                                f"({current_start.strftime('%H:%M')} - {current_end.strftime('%H:%M')})")
-                            new_round = await round_manager.create_round(db, sym)
-                            
-                            # Broadcast round_start event
-                            if new_round:
-                                await _broadcast_round_start(sym, new_round)
-                        else:
-                            logger.debug(
-                                f"Round already exists for current interval {sym.symbol} "
-                                f"(id={existing_round.id}, status={existing_round.status})")
-
             except Exception as e:
-                logger.error(f"Error processing {sym.symbol}: {e}")
+                logger.debug(f"Price sample failed for {symbol_config.symbol}: {e}")
+
+        if broadcasts:
+            await asyncio.gather(*broadcasts, return_exceptions=True)
+                
+    except Exception as e:
+        logger.error(f"Price sampler error: {e}")
+
 
+async def round_scheduler_job():
+    """
+    Round reconcile job - safety net, runs every ROUND_RECONCILE_INTERVAL seconds.
 
-async def _broadcast_round_start(sym: Symbol, round_obj: Round) -> None:
-    """Helper to broadcast round_start event."""
+    Round transitions themselves are fired by `round_scheduler` timers at the
+    exact boundary; this pass only repairs missed timers, newly enabled or
+    disabled symbols and stuck rounds.
+    """
+    logger.debug("Running round reconcile...")
     try:
-        now = datetime.utcnow()
-        remaining = max(0, int((round_obj.end_time - now).total_seconds()))
-        betting_open = remaining >= settings.BETTING_CUTOFF_REMAINING
-        
-        await ws_hub.broadcast(sym.symbol, {
-            "type": "round_start",
-            "data": {
-                "id": round_obj.id,
-                "symbol": round_obj.symbol,
-                "display_name": sym.display_name,
-                "category": sym.category,
-                "emoji": sym.emoji,
-                "start_time": round_obj.start_time.isoformat() + "Z",
-                "end_time": round_obj.end_time.isoformat() + "Z",
-                "open_price": float(round_obj.open_price),
-                "current_price": float(round_obj.open_price),
-                "price_change_percent": 0.0,
-                "status": round_obj.status,
-                "remaining_seconds": remaining,
-                "betting_open": betting_open,
-                "bet_count": 0,
-                "price_history": [],
-                "scoring": None
-            }
-        })
-        logger.info(f"Broadcast round_start for {sym.symbol} round {round_obj.id}")
+        await round_scheduler.reconcile()
     except Exception as e:
-        logger.error(f"Failed to broadcast round_start: {e}")
+        logger.error(f"Round reconcile error: {e}")
 
 
 async def seed_symbols():
@@ -407,20 +292,81 @@ async def seed_symbols():
         logger.info(f"Seeded {len(symbols)} symbols")
 
 
+async def start_leader_duties():
+    """Elected: resume the scheduler jobs and arm the round timers."""
+    scheduler.resume()
+    # Reconcile rounds with the database and arm the boundary timers
+    await round_scheduler.start()
+
+
+async def stop_leader_duties():
+    """Demoted: pause the jobs and drop the round timers."""
+    scheduler.pause()
+    await round_scheduler.stop()
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan management"""
     # Startup
     logger.info("Starting Claw Brawl API...")
 
+    # Open the shared outbound HTTP pool before anything calls Bitget
+    await http_transport.start()
+
     # Seed symbols if needed
     await seed_symbols()
 
+    # Symbol configs for request paths, kept current by a change poll
+    await symbol_configs.reload()
+    await symbol_configs.start()
+
+    # Start streaming prices for enabled symbols before any job needs them
+    await price_feed.start(await symbol_configs.enabled())
+
+    async with AsyncSessionLocal() as db:
+        # Rebuild in-memory price history of active rounds
+        try:
+            await price_buffers.rebuild(db)
+        except Exception as e:
+            logger.warning(f"Price buffer rebuild failed, will load lazily: {e}")
+
+    # Current round per symbol for request paths (retried lazily on failure)
+    try:
+        await active_rounds.refresh()
+    except Exception as e:
+        logger.warning(f"Active round registry load failed, will load lazily: {e}")
+
+    # Global and per-symbol ranks for request paths (retried lazily on failure)
+    try:
+        await rank_index.refresh()
+    except Exception as e:
+        logger.warning(f"Rank index load failed, will load lazily: {e}")
+
+    # Background flusher for buffered price snapshots
+    await snapshot_writer.start()
+
+    # Keep the round snapshots served to WS connects current from hub events
+    ws_hub.add_observer(round_snapshots.observe)
+    # ... and the active round registry, so followers track rounds too
+    ws_hub.add_observer(active_rounds.observe)
+    # Reload symbol configs when any worker announces a change
+    ws_hub.add_observer(symbol_configs.observe)
+    # Rebuild the materialized leaderboards after each settlement
+    ws_hub.add_observer(leaderboards.observe)
+    # ... and the rank index, for settlements run by another worker
+    ws_hub.add_observer(rank_index.observe)
+    # Negotiable `?encoding=compact` for the arena stream
+    ws_hub.register_codec(compact_codec)
+
+    # Connect the WebSocket backplane before anything broadcasts
+    await ws_hub.start()
+
     # Start scheduler
     scheduler.add_job(
         round_scheduler_job,
-        # Run every 5 seconds for responsive round transitions
-        IntervalTrigger(seconds=5),
+        # Boundaries are handled by round_scheduler timers; this is only a safety net
+        IntervalTrigger(seconds=settings.ROUND_RECONCILE_INTERVAL),
         id="round_scheduler",
         replace_existing=True
     )
@@ -433,18 +379,34 @@ async def lifespan(app: FastAPI):
         replace_existing=True
     )
     
-    scheduler.start()
-    logger.info("Scheduler started (round_scheduler: 5s, price_sampler: 1s)")
+    # Jobs stay paused until this replica holds the scheduler lease
+    scheduler.start(paused=True)
+    logger.info(
+        f"Scheduler started (round reconcile: {settings.ROUND_RECONCILE_INTERVAL}s, price_sampler: 1s)")
 
-    # Run initial round check
-    await round_scheduler_job()
+    # Only the lease holder runs the scheduler jobs and round timers
+    await scheduler_lease.start(on_elected=start_leader_duties, on_demoted=stop_leader_duties)
 
     yield
 
-    # Shutdown
+    # Shutdown: step down (stops the jobs) and release the lease to a peer
+    await scheduler_lease.stop()
     scheduler.shutdown()
     logger.info("Scheduler stopped")
 
+    await price_feed.stop()
+    logger.info("Price feed stopped")
+
+    await symbol_configs.stop()
+
+    await ws_hub.stop()
+
+    # Write out ticks still in the buffer before the process exits
+    await snapshot_writer.stop()
+    logger.info(f"Snapshot writer stopped ({snapshot_writer.get_stats()['rows_written']} rows written)")
+
+    await http_transport.close()
+
 
 # Create FastAPI app
 app = FastAPI(
@@ -1,14 +1,15 @@
 from app.models.symbol import Symbol
 from app.models.round import Round
 from app.models.bet import Bet
-from app.models.bot import BotScore, BotSymbolStats
+from app.models.bot import BotScore, BotSymbolStats, BotHourlyStats
 from app.models.danmaku import Danmaku
 from app.models.message import AgentMessage, MessageMention
 from app.models.price_snapshot import PriceSnapshot
 from app.models.thought import AgentThought, ThoughtLike, ThoughtComment
+from app.models.scheduler_lease import SchedulerLease
 
 __all__ = [
-    "Symbol", "Round", "Bet", "BotScore", "BotSymbolStats", "Danmaku",
-    "AgentMessage", "MessageMention", "PriceSnapshot", "AgentThought",
-    "ThoughtLike", "ThoughtComment"
+    "Symbol", "Round", "Bet", "BotScore", "BotSymbolStats", "BotHourlyStats",
+    "Danmaku", "AgentMessage", "MessageMention", "PriceSnapshot", "AgentThought",
+    "ThoughtLike", "ThoughtComment", "SchedulerLease"
 ]
@@ -16,6 +16,9 @@ class BotScore(Base):
     total_wins = Column(Integer, default=0)
     total_losses = Column(Integer, default=0)
     total_draws = Column(Integer, default=0)
+    # Streak state, maintained at settlement (see RoundManager._apply_settlement)
+    win_streak = Column(Integer, default=0)  # Wins since last loss (draws keep it), for scoring
+    current_streak = Column(Integer, default=0)  # Signed, for display: +N wins / -N losses, draw resets
     created_at = Column(DateTime, server_default=func.now())
     updated_at = Column(DateTime, server_default=func.now(),
                         onupdate=func.now())
@@ -37,9 +40,33 @@ class BotSymbolStats(Base):
     losses = Column(Integer, default=0)
     draws = Column(Integer, default=0)
     last_bet_at = Column(DateTime, nullable=True)
+    last_round_id = Column(Integer, nullable=True)  # Last settled round of this symbol the bot bet in
     updated_at = Column(DateTime, server_default=func.now(),
                         onupdate=func.now())
 
     __table_args__ = (
         PrimaryKeyConstraint("bot_id", "symbol"),
     )
+
+
+class BotHourlyStats(Base):
+    """Bot per-symbol per-hour rollup, for the 24h/7d/30d leaderboards"""
+    __tablename__ = "bot_hourly_stats"
+
+    bot_id = Column(String(64), ForeignKey(
+        "bot_scores.bot_id"), nullable=False)
+    symbol = Column(String(20), ForeignKey("symbols.symbol"), nullable=False)
+    hour = Column(DateTime, nullable=False)  # Bet created_at truncated to the hour (UTC)
+    wins = Column(Integer, default=0)
+    losses = Column(Integer, default=0)
+    draws = Column(Integer, default=0)
+    score_delta = Column(Integer, default=0)
+    bet_count = Column(Integer, default=0)
+    updated_at = Column(DateTime, server_default=func.now(),
+                        onupdate=func.now())
+
+    __table_args__ = (
+        PrimaryKeyConstraint("bot_id", "symbol", "hour"),
+        Index("ix_bot_hourly_stats_hour", "hour"),
+        Index("ix_bot_hourly_stats_symbol_hour", "symbol", "hour"),
+    )
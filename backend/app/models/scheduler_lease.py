@@ -0,0 +1,24 @@
+from sqlalchemy import Column, String, BigInteger, DateTime
+from sqlalchemy.dialects.mysql import DATETIME
+from sqlalchemy.sql import func
+from app.db.database import Base
+
+
+class SchedulerLease(Base):
+    """
+    Leader lease for single-writer background jobs.
+
+    One row per lease name. The holder renews `expires_at` (DB clock) on a
+    heartbeat; anyone may take the row over once it has expired, which
+    bumps `fencing_token` so writes of a stale leader can be told apart.
+    """
+    __tablename__ = "scheduler_leases"
+
+    name = Column(String(64), primary_key=True)  # e.g. "scheduler"
+    holder = Column(String(128), nullable=False, default="")  # host:pid:nonce of the leader
+    fencing_token = Column(BigInteger, nullable=False, default=0)  # +1 on every change of holder
+    expires_at = Column(DATETIME(fsp=3), nullable=False)
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<SchedulerLease {self.name} holder={self.holder} token={self.fencing_token}>"
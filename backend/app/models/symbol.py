@@ -1,4 +1,5 @@
 from sqlalchemy import Column, String, Integer, Float, Boolean, DateTime, JSON
+from sqlalchemy.dialects.mysql import DATETIME
 from sqlalchemy.sql import func
 from app.db.database import Base
 
@@ -19,3 +20,6 @@ class Symbol(Base):
     emoji = Column(String(10), default="📈")
     trading_hours = Column(JSON, nullable=True)  # Optional: for stocks/metals
     created_at = Column(DateTime, server_default=func.now())
+    # Microsecond precision: the symbol config poll compares MAX(updated_at)
+    updated_at = Column(DATETIME(fsp=6), server_default=func.now(6),
+                        onupdate=func.now(6))
@@ -0,0 +1,215 @@
+"""
+Active Round Registry
+
+In-process map of the current active round per symbol, so request paths
+(betting, chat, danmaku, /rounds/current, /symbols) resolve it without the
+`WHERE symbol=? AND status='active'` query they used to run.
+- The scheduler updates it directly on create, settling, settle and
+  revert (round_manager); every worker also applies the round_start /
+  round_end / bets_update events it receives from the hub, so followers
+  stay current without running the scheduler
+- Loaded from MySQL at startup and re-read in one query every
+  ACTIVE_ROUND_REFRESH_INTERVAL seconds as a consistency check
+- The 1 Hz price sampler takes its rounds from here too
+- An entry still present ACTIVE_ROUND_GRACE seconds after its end_time
+  means a settle was missed; the next read re-checks the database
+- Writes stay safe regardless: `place_bet` bumps bet_count with a
+  conditional UPDATE on status='active' and rejects the bet if it fails
+"""
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+import asyncio
+import time
+
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.db.database import AsyncSessionLocal
+from app.models import Round
+from app.services.ws_hub import is_sequenced
+
+
+@dataclass
+class ActiveRound:
+    """The fields request paths read from the current round"""
+
+    id: int
+    symbol: str
+    start_time: datetime
+    end_time: datetime
+    open_price: float
+    bet_count: int = 0
+    status: str = "active"
+
+    @classmethod
+    def from_model(cls, round_obj: Round) -> "ActiveRound":
+        return cls(
+            id=round_obj.id,
+            symbol=round_obj.symbol,
+            start_time=round_obj.start_time,
+            end_time=round_obj.end_time,
+            open_price=round_obj.open_price,
+            bet_count=round_obj.bet_count or 0,
+        )
+
+
+class ActiveRoundRegistry:
+    """Current active round per symbol"""
+
+    def __init__(self) -> None:
+        self._rounds: Dict[str, ActiveRound] = {}
+        # symbol -> highest round id known to be settled (never re-added)
+        self._ended: Dict[str, int] = {}
+        # symbol -> change counter value of its last direct update, so a
+        # refresh does not overwrite changes made while it was querying
+        self._touched: Dict[str, int] = {}
+        self._changes = 0
+        self._loaded_at: Optional[float] = None
+        self._last_recheck = 0.0
+        self._refresh_lock = asyncio.Lock()
+        self._stats = {
+            "reads": 0,
+            "refreshes": 0,
+            "stale_entries": 0,
+        }
+
+    # ------------------------------------------------------------------
+    # Updates
+    # ------------------------------------------------------------------
+
+    def _touch(self, symbol: str) -> None:
+        self._changes += 1
+        self._touched[symbol] = self._changes
+
+    def put(self, entry: ActiveRound) -> None:
+        """A round became (or is again) the symbol's active round."""
+        if entry.id <= self._ended.get(entry.symbol, 0):
+            return
+        current = self._rounds.get(entry.symbol)
+        if current is not None and current.id > entry.id:
+            return
+        if current is not None and current.id == entry.id:
+            entry.bet_count = max(entry.bet_count, current.bet_count)
+        self._rounds[entry.symbol] = entry
+        self._touch(entry.symbol)
+
+    def discard(self, symbol: str, round_id: int) -> None:
+        """A round stopped being active (e.g. settling); it may come back via `put`."""
+        current = self._rounds.get(symbol)
+        if current is not None and current.id == round_id:
+            del self._rounds[symbol]
+            self._touch(symbol)
+
+    def end(self, symbol: str, round_id: int) -> None:
+        """A round was settled."""
+        self._ended[symbol] = max(self._ended.get(symbol, 0), round_id)
+        current = self._rounds.get(symbol)
+        if current is not None and current.id <= round_id:
+            del self._rounds[symbol]
+        self._touch(symbol)
+
+    def set_bet_count(self, symbol: str, round_id: int, bet_count: int) -> None:
+        current = self._rounds.get(symbol)
+        if current is not None and current.id == round_id:
+            current.bet_count = max(current.bet_count, bet_count)
+
+    def observe(self, channel: str, message: Dict[str, Any]) -> None:
+        """ConnectionHub observer: apply round lifecycle and bet events."""
+        kind = message.get("type")
+        data = message.get("data") or {}
+        if kind == "bets_update" and channel.startswith("bets:"):
+            self.set_bet_count(channel[5:], data["round_id"], data["bet_count"])
+        elif not is_sequenced(channel):
+            return
+        elif kind == "round_start":
+            self.put(ActiveRound(
+                id=data["id"],
+                symbol=channel,
+                start_time=datetime.fromisoformat(data["start_time"].rstrip("Z")),
+                end_time=datetime.fromisoformat(data["end_time"].rstrip("Z")),
+                open_price=data["open_price"],
+                bet_count=data.get("bet_count") or 0,
+            ))
+        elif kind == "round_end":
+            self.end(channel, data["id"])
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    async def get(self, symbol: str) -> Optional[ActiveRound]:
+        """Current active round of a symbol, or None."""
+        self._stats["reads"] += 1
+        await self._ensure_fresh()
+        entry = self._rounds.get(symbol)
+        if entry is not None and datetime.utcnow() >= entry.end_time + timedelta(
+                seconds=settings.ACTIVE_ROUND_GRACE):
+            # Should have been settled by now: a round_end may have been missed
+            self._stats["stale_entries"] += 1
+            if time.monotonic() - self._last_recheck >= settings.ACTIVE_ROUND_GRACE:
+                self._last_recheck = time.monotonic()
+                await self.refresh()
+            entry = self._rounds.get(symbol)
+        return entry
+
+    async def has_active(self, symbol: str) -> bool:
+        return await self.get(symbol) is not None
+
+    async def all(self) -> List[ActiveRound]:
+        """Every current active round, ordered by symbol."""
+        self._stats["reads"] += 1
+        await self._ensure_fresh()
+        return [entry for _, entry in sorted(self._rounds.items())]
+
+    async def _ensure_fresh(self) -> None:
+        loaded_at = self._loaded_at
+        if loaded_at is not None and time.monotonic() - loaded_at < settings.ACTIVE_ROUND_REFRESH_INTERVAL:
+            return
+        async with self._refresh_lock:
+            # Concurrent readers share one refresh
+            if self._loaded_at == loaded_at:
+                await self._refresh_locked()
+
+    async def refresh(self) -> None:
+        """Re-read all active rounds in one query."""
+        async with self._refresh_lock:
+            await self._refresh_locked()
+
+    async def _refresh_locked(self) -> None:
+        started = self._changes
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(Round)
+                .where(Round.status == "active")
+                .order_by(Round.start_time)
+            )
+            rows = result.scalars().all()
+
+        fresh: Dict[str, ActiveRound] = {}
+        for row in rows:
+            if row.id > self._ended.get(row.symbol, 0):
+                fresh[row.symbol] = ActiveRound.from_model(row)  # Latest start wins
+        # Direct updates that landed during the query are newer than it
+        for symbol, change in self._touched.items():
+            if change > started:
+                current = self._rounds.get(symbol)
+                if current is None:
+                    fresh.pop(symbol, None)
+                else:
+                    fresh[symbol] = current
+        self._rounds = fresh
+        self._loaded_at = time.monotonic()
+        self._stats["refreshes"] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "symbols": {s: r.id for s, r in sorted(self._rounds.items())},
+            "age_seconds": round(time.monotonic() - self._loaded_at, 1) if self._loaded_at else None,
+            **self._stats,
+        }
+
+
+# Singleton
+active_rounds = ActiveRoundRegistry()
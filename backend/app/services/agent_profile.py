@@ -9,6 +9,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models import BotScore, BotSymbolStats, Bet
 from app.services.leaderboard_metrics import compute_metrics_from_bets, LeaderboardMetrics
+from app.services.rank_index import rank_index
 from app.services.tags import compute_tags, AgentStats
 
 
@@ -88,17 +89,21 @@ async def fetch_favorite_symbols(
     
     result: Dict[str, Optional[str]] = {bid: None for bid in bot_ids}
     
-    # 子查询：每个 bot 按 symbol 分组计数，取最大的
-    for bot_id in bot_ids:
-        fav_result = await db.execute(
-            select(BotSymbolStats.symbol)
-            .where(BotSymbolStats.bot_id == bot_id)
-            .order_by(BotSymbolStats.score.desc())
-            .limit(1)
-        )
-        fav_row = fav_result.first()
-        if fav_row:
-            result[bot_id] = fav_row[0]
+    # 一次窗口查询：每个 bot 得分最高的 symbol（同分按 symbol 排序）
+    rn = func.row_number().over(
+        partition_by=BotSymbolStats.bot_id,
+        order_by=(BotSymbolStats.score.desc(), BotSymbolStats.symbol)
+    ).label("rn")
+    subq = (
+        select(BotSymbolStats.bot_id, BotSymbolStats.symbol, rn)
+        .where(BotSymbolStats.bot_id.in_(bot_ids))
+        .subquery()
+    )
+    fav_rows = await db.execute(
+        select(subq.c.bot_id, subq.c.symbol).where(subq.c.rn == 1)
+    )
+    for bot_id, symbol in fav_rows.all():
+        result[str(bot_id)] = symbol
     
     return result
 
@@ -114,10 +119,14 @@ def build_agent_profile(
     draws: int,
     recent_bets: List[tuple],
     favorite_symbol: Optional[str] = None,
+    streak: Optional[int] = None,
 ) -> AgentProfile:
     """
     从原始数据构建完整的 AgentProfile
     这是核心的可复用逻辑
+
+    streak: 结算时维护的全局连胜/连败（bot_scores.current_streak）；
+            不传时（按标的/按周期的榜单）从 recent_bets 计算
     """
     total_rounds = wins + losses + draws
     win_rate = wins / total_rounds if total_rounds > 0 else 0
@@ -128,6 +137,9 @@ def build_agent_profile(
         bets=recent_bets,
     )
     
+    if streak is None:
+        streak = metrics.streak
+
     # 提取 battle history
     battle_history = [result for _, result in recent_bets[:80]]
     
@@ -140,7 +152,7 @@ def build_agent_profile(
         losses=losses,
         draws=draws,
         total_rounds=total_rounds,
-        streak=metrics.streak,
+        streak=streak,
         drawdown=metrics.drawdown,
     )
     tags = compute_tags(agent_stats)
@@ -164,7 +176,7 @@ def build_agent_profile(
         roi=metrics.roi,
         profit_factor=metrics.profit_factor,
         drawdown=metrics.drawdown,
-        streak=metrics.streak,
+        streak=streak,
         equity_curve=metrics.equity_curve,
         strategy=strategy,
         tags=tags,
@@ -185,11 +197,7 @@ async def get_single_agent_profile(
         return None
     
     # 获取全局排名
-    rank_result = await db.execute(
-        select(func.count(BotScore.bot_id))
-        .where(BotScore.total_score > bot_score.total_score)
-    )
-    global_rank = (rank_result.scalar() or 0) + 1
+    global_rank = await rank_index.global_rank(bot_score.bot_id, int(bot_score.total_score))
     
     # 获取 recent bets
     recent_bets_map = await fetch_recent_bets_for_bots(db, [agent_id])
@@ -210,4 +218,5 @@ async def get_single_agent_profile(
         draws=bot_score.total_draws,
         recent_bets=recent_bets,
         favorite_symbol=favorite_symbol,
+        streak=bot_score.current_streak or 0,
     )
@@ -0,0 +1,209 @@
+"""
+Fills-History Backfill Engine
+
+Rebuilds second-level price history for a time window from Bitget's
+`fills-history` endpoint, which returns at most 1000 trades per call
+(a few seconds of a busy BTC market).
+- Splits the window into BACKFILL_SLICE_SECONDS slices
+- Fetches slices concurrently; each slice pages backwards until complete
+- Every request takes a token from a shared bucket (Bitget: 10 req/s)
+- Stitches all pages, de-duplicates by tradeId and aggregates into
+  fixed buckets (last trade price), carrying the last price through
+  seconds without trades
+"""
+
+from typing import Any, Dict, List, Optional
+import asyncio
+import logging
+import time
+
+from app.core.config import settings
+from app.services.market import market_service
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """Async token bucket: `rate` tokens/second, bursts up to `capacity`"""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None) -> None:
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else rate
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        """Wait until a token is available and take it."""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class FillsBackfill:
+    """Sliced, concurrent, rate-limited fills-history fetcher"""
+
+    PAGE_LIMIT = 1000  # Bitget max per fills-history call
+
+    def __init__(self) -> None:
+        # One bucket per process: all backfills share Bitget's per-IP limit.
+        # No burst: Bitget counts over a sliding second, so a full bucket
+        # followed by the steady rate would exceed it.
+        self._bucket = TokenBucket(settings.BITGET_FILLS_RATE_LIMIT, capacity=1)
+        self._stats = {
+            "windows": 0,
+            "requests": 0,
+            "retries": 0,
+            "failed_slices": 0,
+            "trades": 0,
+        }
+
+    async def fetch_prices(
+        self,
+        symbol: str,
+        product_type: str,
+        start_time: int,
+        end_time: int,
+        interval_ms: int = 1000
+    ) -> List[dict]:
+        """
+        Fetch and aggregate the trades of [start_time, end_time] (ms).
+
+        Returns:
+            List of {timestamp, price} dicts, one per interval, ascending.
+            Slices that keep failing are skipped (logged), so the result
+            may still contain holes.
+        """
+        if end_time <= start_time:
+            return []
+        self._stats["windows"] += 1
+
+        slice_ms = settings.BACKFILL_SLICE_SECONDS * 1000
+        slices = [
+            (s, min(s + slice_ms - 1, end_time))
+            for s in range(start_time, end_time + 1, slice_ms)
+        ]
+        limit = asyncio.Semaphore(settings.BACKFILL_CONCURRENCY)
+
+        async def run(slice_start: int, slice_end: int) -> List[dict]:
+            async with limit:
+                return await self._fetch_slice(symbol, product_type, slice_start, slice_end)
+
+        results = await asyncio.gather(
+            *(run(s, e) for s, e in slices), return_exceptions=True
+        )
+
+        trades: Dict[Any, dict] = {}
+        for (slice_start, slice_end), result in zip(slices, results):
+            if isinstance(result, BaseException):
+                self._stats["failed_slices"] += 1
+                logger.warning(
+                    f"Backfill slice {slice_start}-{slice_end} for {symbol} failed: {result}")
+                continue
+            for trade in result:
+                trades[trade["tradeId"] or (trade["timestamp"], trade["price"])] = trade
+        self._stats["trades"] += len(trades)
+
+        return self._aggregate(list(trades.values()), start_time, end_time, interval_ms)
+
+    async def _fetch_slice(
+        self,
+        symbol: str,
+        product_type: str,
+        start_time: int,
+        end_time: int
+    ) -> List[dict]:
+        """
+        Fetch every trade of one slice. fills-history returns the newest
+        trades first, so a full page means older trades remain: page again
+        with endTime moved to the oldest trade seen (tradeIds de-dup the overlap).
+        """
+        trades: List[dict] = []
+        page_end = end_time
+        for _ in range(settings.BACKFILL_MAX_PAGES_PER_SLICE):
+            page = await self._fetch_page(symbol, product_type, start_time, page_end)
+            trades.extend(page)
+            if len(page) < self.PAGE_LIMIT:
+                break
+            oldest = min(t["timestamp"] for t in page)
+            if oldest >= page_end:
+                # A single millisecond holds a full page; step past it
+                oldest = page_end - 1
+            if oldest < start_time:
+                break
+            page_end = oldest
+        else:
+            logger.warning(
+                f"Backfill slice {start_time}-{end_time} for {symbol} hit the page cap")
+        return trades
+
+    async def _fetch_page(
+        self,
+        symbol: str,
+        product_type: str,
+        start_time: int,
+        end_time: int
+    ) -> List[dict]:
+        """One rate-limited fills-history call, retried on errors (incl. 429)."""
+        attempts = settings.BACKFILL_MAX_RETRIES + 1
+        for attempt in range(attempts):
+            await self._bucket.acquire()
+            self._stats["requests"] += 1
+            try:
+                return await market_service.get_historical_fills(
+                    symbol=symbol,
+                    product_type=product_type,
+                    start_time=start_time,
+                    end_time=end_time,
+                    limit=self.PAGE_LIMIT
+                )
+            except Exception:
+                if attempt == attempts - 1:
+                    raise
+                self._stats["retries"] += 1
+                await asyncio.sleep(0.5 * (2 ** attempt))
+        return []
+
+    @staticmethod
+    def _aggregate(
+        trades: List[dict],
+        start_time: int,
+        end_time: int,
+        interval_ms: int
+    ) -> List[dict]:
+        """Last trade price per interval, forward-filled between trades."""
+        if not trades:
+            return []
+        trades.sort(key=lambda t: t["timestamp"])
+
+        buckets: Dict[int, float] = {}
+        for trade in trades:
+            ts = trade["timestamp"]
+            if start_time <= ts <= end_time:
+                buckets[(ts // interval_ms) * interval_ms] = trade["price"]
+        if not buckets:
+            return []
+
+        # Carry the last price through quiet seconds (the sampler would have
+        # recorded the unchanged price there too)
+        result = []
+        first = min(buckets)
+        last_bucket = (end_time // interval_ms) * interval_ms
+        price = buckets[first]
+        for ts in range(first, last_bucket + 1, interval_ms):
+            price = buckets.get(ts, price)
+            result.append({"timestamp": ts, "price": price})
+        return result
+
+    def get_stats(self) -> Dict[str, Any]:
+        return dict(self._stats)
+
+
+# Singleton
+fills_backfill = FillsBackfill()
@@ -0,0 +1,134 @@
+"""
+Shared HTTP Transport
+
+One process-wide `httpx.AsyncClient` with a keep-alive connection pool, used by
+every outbound call (Bitget REST etc.) instead of a client per request.
+- HTTP/2 when `h2` is installed (falls back to HTTP/1.1 keep-alive otherwise)
+- Global and per-host connection limits, configurable timeouts
+- Opened/closed by the FastAPI lifespan; lazily opened for scripts
+- Request/latency counters and pool occupancy via `get_stats()`
+"""
+
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
+import asyncio
+import logging
+import time
+
+import httpx
+
+from app.core.config import settings
+
+try:
+    import h2  # noqa: F401 - only needed to enable HTTP/2
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+
+class HttpTransport:
+    """Lifecycle-managed pooled HTTP client"""
+
+    def __init__(self) -> None:
+        self._client: Optional[httpx.AsyncClient] = None
+        self._host_limits: Dict[str, asyncio.Semaphore] = {}
+        self._stats = {
+            "requests": 0,
+            "errors": 0,
+            "total_latency_ms": 0.0,
+            "max_latency_ms": 0.0,
+        }
+
+    async def start(self) -> None:
+        """Open the connection pool (idempotent)."""
+        if self._client is not None:
+            return
+        http2 = settings.HTTP2_ENABLED and HTTP2_AVAILABLE
+        self._client = httpx.AsyncClient(
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=settings.HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE,
+                keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY,
+            ),
+            timeout=httpx.Timeout(
+                settings.HTTP_TIMEOUT,
+                connect=settings.HTTP_CONNECT_TIMEOUT,
+            ),
+        )
+        logger.info(
+            f"HTTP transport opened (http2={http2}, "
+            f"max_connections={settings.HTTP_MAX_CONNECTIONS}, "
+            f"per_host={settings.HTTP_MAX_CONNECTIONS_PER_HOST})")
+
+    async def close(self) -> None:
+        """Close the pool and all keep-alive connections."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            logger.info("HTTP transport closed")
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """The underlying pooled client (opened by `start`)."""
+        if self._client is None:
+            raise RuntimeError("HTTP transport is not started")
+        return self._client
+
+    async def get(self, url: str, **kwargs: Any) -> httpx.Response:
+        """GET through the shared pool. Accepts the same kwargs as httpx."""
+        return await self.request("GET", url, **kwargs)
+
+    async def request(self, method: str, url: str, **kwargs: Any) -> httpx.Response:
+        """Send a request through the shared pool, honoring the per-host limit."""
+        if self._client is None:
+            # Scripts and one-off tools may call services without the lifespan
+            await self.start()
+
+        host = urlsplit(url).netloc
+        limit = self._host_limits.get(host)
+        if limit is None:
+            limit = asyncio.Semaphore(settings.HTTP_MAX_CONNECTIONS_PER_HOST)
+            self._host_limits[host] = limit
+
+        started = time.perf_counter()
+        try:
+            async with limit:
+                return await self._client.request(method, url, **kwargs)
+        except Exception:
+            self._stats["errors"] += 1
+            raise
+        finally:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            self._stats["requests"] += 1
+            self._stats["total_latency_ms"] += elapsed_ms
+            self._stats["max_latency_ms"] = max(self._stats["max_latency_ms"], elapsed_ms)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Request counters plus current pool occupancy."""
+        requests = self._stats["requests"]
+        stats: Dict[str, Any] = {
+            "open": self._client is not None,
+            "http2": bool(self._client and settings.HTTP2_ENABLED and HTTP2_AVAILABLE),
+            "requests": requests,
+            "errors": self._stats["errors"],
+            "avg_latency_ms": round(self._stats["total_latency_ms"] / requests, 2) if requests else 0.0,
+            "max_latency_ms": round(self._stats["max_latency_ms"], 2),
+            "connections": 0,
+            "idle_connections": 0,
+        }
+        # httpx does not expose pool stats publicly; read httpcore's pool best-effort
+        try:
+            pool = self._client._transport._pool  # type: ignore[union-attr]
+            connections = list(pool.connections)
+            stats["connections"] = len(connections)
+            stats["idle_connections"] = sum(1 for c in connections if c.is_idle())
+        except Exception:
+            pass
+        return stats
+
+
+# Singleton
+http_transport = HttpTransport()
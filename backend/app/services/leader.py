@@ -0,0 +1,239 @@
+"""
+Leader Election (DB-row lease)
+
+Exactly one API replica runs the single-writer background work (round
+scheduler, price sampler); the others only serve requests.
+- The lease is a row in `scheduler_leases`; expiry uses the database clock,
+  so replica clock skew does not matter
+- The holder renews it every LEADER_HEARTBEAT_INTERVAL seconds; any replica
+  takes it over once it has gone LEADER_LEASE_TTL seconds without renewal
+- Every change of holder bumps `fencing_token`; writers can `verify()` the
+  token inside their transaction so a paused ex-leader cannot write
+- A leader that cannot renew steps down locally before the lease expires,
+  and a clean shutdown releases the lease so a peer takes over at once
+"""
+
+from typing import Any, Awaitable, Callable, Dict, Optional
+import asyncio
+import logging
+import os
+import socket
+import time
+import uuid
+
+from sqlalchemy import select, update, func, text
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.database import AsyncSessionLocal
+from app.models import SchedulerLease
+
+logger = logging.getLogger(__name__)
+
+Callback = Callable[[], Awaitable[None]]
+
+
+class LeaderLease:
+    """Heartbeat loop around one named lease row"""
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.holder_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.fencing_token: Optional[int] = None
+        self._is_leader = False
+        # Local (monotonic) deadline after which we stop acting as leader
+        self._valid_until = 0.0
+        self._on_elected: Optional[Callback] = None
+        self._on_demoted: Optional[Callback] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stats = {
+            "elections": 0,
+            "demotions": 0,
+            "renew_errors": 0,
+        }
+
+    @property
+    def is_leader(self) -> bool:
+        return self._is_leader and time.monotonic() < self._valid_until
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    async def start(self, on_elected: Callback, on_demoted: Callback) -> None:
+        """
+        Start campaigning. `on_elected` runs when this replica becomes leader,
+        `on_demoted` when it loses the lease (or on stop).
+
+        With LEADER_ELECTION_ENABLED off the replica leads unconditionally.
+        """
+        self._on_elected = on_elected
+        self._on_demoted = on_demoted
+        if not settings.LEADER_ELECTION_ENABLED:
+            self._is_leader = True
+            self._valid_until = float("inf")
+            await on_elected()
+            return
+
+        # First attempt inline, so a sole replica leads before startup completes
+        await self._tick()
+        self._task = asyncio.create_task(self._run(), name=f"leader_lease:{self.name}")
+
+    async def stop(self) -> None:
+        """Stop campaigning, step down and release the lease."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        was_leader = self._is_leader
+        await self._demote("shutdown")
+        if was_leader and settings.LEADER_ELECTION_ENABLED:
+            try:
+                await self._release()
+            except Exception as e:
+                logger.warning(f"Failed to release lease {self.name}: {e}")
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(settings.LEADER_HEARTBEAT_INTERVAL)
+            await self._tick()
+
+    async def _tick(self) -> None:
+        """One acquire/renew attempt and the resulting state change."""
+        attempt_started = time.monotonic()
+        try:
+            token = await self._acquire()
+        except Exception as e:
+            self._stats["renew_errors"] += 1
+            logger.warning(f"Lease {self.name} heartbeat failed: {e}")
+            if self._is_leader and time.monotonic() >= self._valid_until:
+                await self._demote("heartbeat failing")
+            return
+
+        if token is None:
+            if self._is_leader:
+                await self._demote("lease taken over")
+            return
+
+        # The DB lease runs TTL from the UPDATE; measure locally from before it was sent
+        self._valid_until = attempt_started + settings.LEADER_LEASE_TTL - settings.LEADER_HEARTBEAT_INTERVAL
+        if self._is_leader and token != self.fencing_token:
+            # Lost and re-acquired between heartbeats: someone else led meanwhile
+            await self._demote("lease changed hands")
+        if not self._is_leader:
+            self.fencing_token = token
+            await self._elect()
+
+    async def _elect(self) -> None:
+        self._is_leader = True
+        self._stats["elections"] += 1
+        logger.info(f"Elected leader for {self.name} (token {self.fencing_token}, {self.holder_id})")
+        try:
+            await self._on_elected()
+        except Exception as e:
+            logger.error(f"Leader startup for {self.name} failed: {e}")
+
+    async def _demote(self, reason: str) -> None:
+        if not self._is_leader:
+            return
+        self._is_leader = False
+        self._stats["demotions"] += 1
+        logger.warning(f"Stepping down as leader for {self.name}: {reason}")
+        try:
+            await self._on_demoted()
+        except Exception as e:
+            logger.error(f"Leader shutdown for {self.name} failed: {e}")
+
+    # ------------------------------------------------------------------
+    # Lease row
+    # ------------------------------------------------------------------
+
+    async def _acquire(self) -> Optional[int]:
+        """
+        Take or renew the lease in one conditional UPDATE.
+
+        Returns:
+            The fencing token if we hold the lease, None if someone else does
+        """
+        ttl_us = int(settings.LEADER_LEASE_TTL * 1_000_000)
+        now = func.now(3)
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                mysql_insert(SchedulerLease)
+                .prefix_with("IGNORE")
+                .values(name=self.name, holder="", fencing_token=0, expires_at=now)
+            )
+            # MySQL applies SET left to right: the token is bumped based on the old holder
+            result = await db.execute(
+                update(SchedulerLease)
+                .where(
+                    SchedulerLease.name == self.name,
+                    (SchedulerLease.holder == self.holder_id) | (SchedulerLease.expires_at < now)
+                )
+                .ordered_values(
+                    (SchedulerLease.fencing_token, func.IF(
+                        SchedulerLease.holder == self.holder_id,
+                        SchedulerLease.fencing_token,
+                        SchedulerLease.fencing_token + 1
+                    )),
+                    (SchedulerLease.holder, self.holder_id),
+                    (SchedulerLease.expires_at, func.timestampadd(text("MICROSECOND"), ttl_us, now)),
+                )
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+            if result.rowcount != 1:
+                return None
+            token = await db.scalar(
+                select(SchedulerLease.fencing_token)
+                .where(SchedulerLease.name == self.name, SchedulerLease.holder == self.holder_id)
+            )
+            return token
+
+    async def _release(self) -> None:
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                update(SchedulerLease)
+                .where(SchedulerLease.name == self.name, SchedulerLease.holder == self.holder_id)
+                .values(expires_at=func.now(3))
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+        logger.info(f"Released lease {self.name}")
+
+    async def verify(self, db: AsyncSession) -> bool:
+        """
+        Fencing check for writers: True if this replica still holds the lease
+        with the token it was elected with, by the database's clock.
+        """
+        if not settings.LEADER_ELECTION_ENABLED:
+            return True
+        if not self.is_leader:
+            return False
+        token = await db.scalar(
+            select(SchedulerLease.fencing_token)
+            .where(
+                SchedulerLease.name == self.name,
+                SchedulerLease.holder == self.holder_id,
+                SchedulerLease.expires_at > func.now(3),
+            )
+        )
+        return token is not None and token == self.fencing_token
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": settings.LEADER_ELECTION_ENABLED,
+            "holder_id": self.holder_id,
+            "is_leader": self.is_leader,
+            "fencing_token": self.fencing_token,
+            **self._stats,
+        }
+
+
+# Singleton: the lease guarding round scheduling and price sampling
+scheduler_lease = LeaderLease("scheduler")
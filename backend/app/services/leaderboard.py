@@ -0,0 +1,525 @@
+"""
+Leaderboard Materializer
+
+`GET /leaderboard` used to rebuild its board per request: sort bot_scores,
+load up to 80 recent bets for each of up to 100 bots, look up favorite
+symbols, then compute metrics and tags in Python. Boards only change when a
+round settles, so they are now built once per settlement and served from
+memory:
+- Every worker watches `round_end` (published after the settlement commit)
+  and rebuilds after LEADERBOARD_REBUILD_DELAY seconds, so the symbols that
+  settle on the same boundary cost one rebuild
+- A rebuild covers the global and every enabled symbol's all-time board,
+  plus any other board (period filters) served since the previous rebuild
+- Boards hold LEADERBOARD_MAX_LIMIT entries; a request for `limit` gets the
+  top `limit` of them. The encoded APIResponse is cached per limit
+- While a rebuild runs, requests get the previous board; only a cold
+  board (first request, or older than LEADERBOARD_MAX_AGE) waits, and
+  concurrent waiters share one build
+- Period boards (24h/7d/30d) sum the hourly rollups in bot_hourly_stats
+  (filled at settlement), so a 30d board reads at most 720 buckets per bot
+  rather than a month of bets. Windows are whole hours: the current hour
+  plus the 23/167/719 before it, moved forward on rebuild
+"""
+
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+import asyncio
+import logging
+import time
+
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.database import AsyncSessionLocal
+from app.models import BotScore, BotSymbolStats, BotHourlyStats, Bet
+from app.schemas.common import APIResponse
+from app.schemas.leaderboard import LeaderboardEntry, LeaderboardResponse
+from app.services.agent_profile import (
+    fetch_recent_bets_for_bots,
+    fetch_favorite_symbols,
+    build_agent_profile,
+)
+from app.services.single_flight import SingleFlight
+from app.services.symbol_config import symbol_configs
+from app.services.ws_hub import is_sequenced
+
+logger = logging.getLogger(__name__)
+
+# Period to timedelta mapping (whole hours: the window is that many buckets)
+PERIOD_DELTAS = {
+    "24h": timedelta(hours=24),
+    "7d": timedelta(days=7),
+    "30d": timedelta(days=30),
+    "all": None,
+}
+
+# (symbol or None for global, period)
+BoardKey = Tuple[Optional[str], str]
+
+
+def profile_to_leaderboard_entry(profile, favorite_symbol: Optional[str] = None) -> LeaderboardEntry:
+    """将 AgentProfile 转换为 LeaderboardEntry"""
+    return LeaderboardEntry(
+        rank=profile.rank,
+        bot_id=profile.bot_id,
+        bot_name=profile.bot_name,
+        avatar_url=profile.avatar_url,
+        score=profile.score,
+        wins=profile.wins,
+        losses=profile.losses,
+        draws=profile.draws,
+        win_rate=profile.win_rate,
+        total_rounds=profile.total_rounds,
+        favorite_symbol=favorite_symbol or profile.favorite_symbol,
+        pnl=profile.pnl,
+        roi=profile.roi,
+        profit_factor=profile.profit_factor,
+        drawdown=profile.drawdown,
+        streak=profile.streak,
+        equity_curve=profile.equity_curve,
+        strategy=profile.strategy,
+        tags=profile.tags,
+        battle_history=profile.battle_history,
+    )
+
+
+# ----------------------------------------------------------------------
+# Board builders
+# ----------------------------------------------------------------------
+
+async def build_symbol_leaderboard(db: AsyncSession, symbol: str, limit: int) -> LeaderboardResponse:
+    """Per-symbol leaderboard"""
+    sym = await symbol_configs.get(symbol)
+
+    # Get top bots for this symbol
+    result = await db.execute(
+        select(BotSymbolStats, BotScore)
+        .join(BotScore, BotSymbolStats.bot_id == BotScore.bot_id)
+        .where(BotSymbolStats.symbol == symbol)
+        .order_by(BotSymbolStats.score.desc())
+        .limit(limit)
+    )
+    rows = result.all()
+    bot_ids = [stats.bot_id for stats, _ in rows]
+
+    # 批量获取 recent bets
+    recent_bets_map = await fetch_recent_bets_for_bots(db, bot_ids, symbol=symbol)
+
+    items: list[LeaderboardEntry] = []
+    for i, (stats, bot_score) in enumerate(rows, 1):
+        profile = build_agent_profile(
+            bot_id=stats.bot_id,
+            bot_name=bot_score.bot_name,
+            avatar_url=bot_score.avatar_url,
+            score=int(stats.score),
+            rank=i,
+            wins=stats.wins,
+            losses=stats.losses,
+            draws=stats.draws,
+            recent_bets=recent_bets_map.get(stats.bot_id, []),
+            favorite_symbol=symbol,  # 当前 symbol 作为 favorite
+        )
+        items.append(profile_to_leaderboard_entry(profile))
+
+    return LeaderboardResponse(
+        type="symbol",
+        symbol=symbol,
+        display_name=sym.display_name if sym else symbol,
+        emoji=sym.emoji if sym else "📈",
+        items=items,
+        updated_at=datetime.utcnow()
+    )
+
+
+async def build_global_leaderboard(db: AsyncSession, limit: int) -> LeaderboardResponse:
+    """Global leaderboard"""
+    result = await db.execute(
+        select(BotScore)
+        .order_by(BotScore.total_score.desc())
+        .limit(limit)
+    )
+    bots = result.scalars().all()
+    bot_ids = [b.bot_id for b in bots]
+
+    # 批量获取 recent bets 和 favorite symbols
+    recent_bets_map = await fetch_recent_bets_for_bots(db, bot_ids)
+    favorite_symbols = await fetch_favorite_symbols(db, bot_ids)
+
+    items: list[LeaderboardEntry] = []
+    for i, bot in enumerate(bots, 1):
+        fav_symbol = favorite_symbols.get(bot.bot_id)
+        profile = build_agent_profile(
+            bot_id=bot.bot_id,
+            bot_name=bot.bot_name,
+            avatar_url=bot.avatar_url,
+            score=int(bot.total_score),
+            rank=i,
+            wins=bot.total_wins,
+            losses=bot.total_losses,
+            draws=bot.total_draws,
+            recent_bets=recent_bets_map.get(bot.bot_id, []),
+            favorite_symbol=fav_symbol,
+            streak=bot.current_streak or 0,
+        )
+        items.append(profile_to_leaderboard_entry(profile, fav_symbol))
+
+    return LeaderboardResponse(
+        type="global",
+        items=items,
+        updated_at=datetime.utcnow()
+    )
+
+
+def period_window_start(delta: timedelta, now: Optional[datetime] = None) -> datetime:
+    """First hourly bucket of a period window ending in the current hour."""
+    current_hour = (now or datetime.utcnow()).replace(minute=0, second=0, microsecond=0)
+    return current_hour - delta + timedelta(hours=1)
+
+
+async def build_period_leaderboard(
+    db: AsyncSession,
+    symbol: Optional[str],
+    window_start: datetime,
+    limit: int
+) -> LeaderboardResponse:
+    """Get leaderboard filtered by time period, summed from bot_hourly_stats"""
+
+    conditions = [BotHourlyStats.hour >= window_start]
+    if symbol:
+        conditions.append(BotHourlyStats.symbol == symbol)
+
+    score_delta = func.sum(BotHourlyStats.score_delta)
+    agg_query = (
+        select(
+            BotHourlyStats.bot_id,
+            BotScore.bot_name,
+            BotScore.avatar_url,
+            func.sum(BotHourlyStats.wins).label("wins"),
+            func.sum(BotHourlyStats.losses).label("losses"),
+            func.sum(BotHourlyStats.draws).label("draws"),
+            score_delta.label("score_delta"),
+            func.sum(BotHourlyStats.bet_count).label("total_rounds"),
+        )
+        .join(BotScore, BotHourlyStats.bot_id == BotScore.bot_id)
+        .where(*conditions)
+        .group_by(BotHourlyStats.bot_id, BotScore.bot_name, BotScore.avatar_url)
+        .order_by(score_delta.desc())
+        .limit(limit)
+    )
+
+    result = await db.execute(agg_query)
+    rows = result.all()
+
+    if not rows:
+        return LeaderboardResponse(
+            type="symbol" if symbol else "global",
+            symbol=symbol,
+            items=[],
+            updated_at=datetime.utcnow()
+        )
+
+    bot_ids = [row.bot_id for row in rows]
+
+    # 批量获取 recent bets（带时间过滤）
+    recent_bets_map = await _fetch_period_bets(db, bot_ids, symbol, window_start)
+
+    items: list[LeaderboardEntry] = []
+    for i, row in enumerate(rows, 1):
+        wins = int(row.wins or 0)
+        losses = int(row.losses or 0)
+        draws = int(row.draws or 0)
+        score_delta = int(row.score_delta or 0)
+
+        profile = build_agent_profile(
+            bot_id=row.bot_id,
+            bot_name=row.bot_name,
+            avatar_url=row.avatar_url,
+            score=score_delta,  # 期间得分变化
+            rank=i,
+            wins=wins,
+            losses=losses,
+            draws=draws,
+            recent_bets=recent_bets_map.get(row.bot_id, []),
+            favorite_symbol=symbol,
+        )
+        items.append(profile_to_leaderboard_entry(profile))
+
+    # Get symbol info
+    sym_info = None
+    if symbol:
+        sym_info = await symbol_configs.get(symbol)
+
+    return LeaderboardResponse(
+        type="symbol" if symbol else "global",
+        symbol=symbol,
+        display_name=sym_info.display_name if sym_info else symbol,
+        emoji=sym_info.emoji if sym_info else "📈",
+        items=items,
+        updated_at=datetime.utcnow()
+    )
+
+
+async def _fetch_period_bets(
+    db: AsyncSession,
+    bot_ids: list[str],
+    symbol: Optional[str],
+    window_start: datetime,
+    limit: int = 80
+) -> dict[str, list[tuple]]:
+    """
+    获取指定时间段内的最近 bets
+
+    只读每个 bot 最近 `limit` 笔所在的那几个小时：先用 bot_hourly_stats
+    按小时倒序累计 bet_count 求出每个 bot 的起点，30d 与 24h 读的 bets 行数相同。
+    """
+    if not bot_ids:
+        return {}
+
+    recent_bets: dict[str, list[tuple]] = {bid: [] for bid in bot_ids}
+
+    # Settled bets per (bot, hour) in the window
+    hour_conditions = [BotHourlyStats.bot_id.in_(bot_ids), BotHourlyStats.hour >= window_start]
+    if symbol:
+        hour_conditions.append(BotHourlyStats.symbol == symbol)
+    hourly = (
+        select(
+            BotHourlyStats.bot_id,
+            BotHourlyStats.hour,
+            func.sum(BotHourlyStats.bet_count).label("bets"),
+        )
+        .where(*hour_conditions)
+        .group_by(BotHourlyStats.bot_id, BotHourlyStats.hour)
+        .subquery()
+    )
+    # Bets in strictly newer hours; an hour is needed while that is < limit
+    newer = (
+        func.sum(hourly.c.bets).over(partition_by=hourly.c.bot_id, order_by=hourly.c.hour.desc())
+        - hourly.c.bets
+    ).label("newer")
+    ranked = select(hourly.c.bot_id, hourly.c.hour, newer).subquery()
+    since = (
+        select(ranked.c.bot_id, func.min(ranked.c.hour).label("since"))
+        .where(ranked.c.newer < limit)
+        .group_by(ranked.c.bot_id)
+        .subquery()
+    )
+
+    rn = func.row_number().over(
+        partition_by=Bet.bot_id, order_by=Bet.created_at.desc()
+    ).label("rn")
+
+    conditions = [Bet.bot_id.in_(bot_ids), Bet.result != "pending", Bet.created_at >= since.c.since]
+    if symbol:
+        conditions.append(Bet.symbol == symbol)
+
+    subq = (
+        select(Bet.bot_id, Bet.score_change, Bet.result, rn)
+        .join(since, Bet.bot_id == since.c.bot_id)
+        .where(*conditions)
+        .subquery()
+    )
+    bet_rows = await db.execute(
+        select(subq.c.bot_id, subq.c.score_change, subq.c.result)
+        .where(subq.c.rn <= limit)
+        .order_by(subq.c.bot_id)
+    )
+    for bot_id, score_change, result_str in bet_rows.all():
+        recent_bets[str(bot_id)].append((score_change, str(result_str)))
+
+    return recent_bets
+
+
+async def build_leaderboard(
+    db: AsyncSession,
+    symbol: Optional[str],
+    period: str,
+    limit: int
+) -> LeaderboardResponse:
+    """Board for a (symbol, period), as `GET /leaderboard` defines it."""
+    delta = PERIOD_DELTAS.get(period)
+    if delta is not None:
+        return await build_period_leaderboard(db, symbol, period_window_start(delta), limit)
+    if symbol:
+        return await build_symbol_leaderboard(db, symbol, limit)
+    return await build_global_leaderboard(db, limit)
+
+
+# ----------------------------------------------------------------------
+# Materializer
+# ----------------------------------------------------------------------
+
+@dataclass
+class Board:
+    """One materialized board and its encoded responses"""
+
+    data: LeaderboardResponse
+    generation: int
+    built_at: float
+    build_ms: float
+    # limit -> encoded APIResponse
+    frames: Dict[int, bytes] = field(default_factory=dict)
+
+    def frame(self, limit: int) -> bytes:
+        cached = self.frames.get(limit)
+        if cached is None:
+            data = self.data.model_copy(update={"items": self.data.items[:limit]})
+            cached = self.frames[limit] = APIResponse(success=True, data=data).model_dump_json().encode()
+        return cached
+
+
+class LeaderboardMaterializer:
+    """Leaderboards built once per settlement, served from memory"""
+
+    def __init__(self) -> None:
+        self._boards: Dict[BoardKey, Board] = {}
+        # Bumped by every settlement; a board from an older one is stale
+        self._generation = 0
+        # Boards served since the last rebuild, rebuilt eagerly next time
+        self._requested: set[BoardKey] = set()
+        self._building: SingleFlight[BoardKey, Board] = SingleFlight()
+        self._rebuild_handle: Optional[asyncio.TimerHandle] = None
+        self._rebuild_task: Optional[asyncio.Task] = None
+        self._stats = {
+            "hits": 0,
+            "stale_hits": 0,
+            "cold_builds": 0,
+            "rebuilds": 0,
+            "boards_built": 0,
+            "build_failures": 0,
+            "last_rebuild_ms": None,
+        }
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    async def get_frame(self, symbol: Optional[str], period: str, limit: int) -> bytes:
+        """Encoded APIResponse for `GET /leaderboard`."""
+        if symbol and await symbol_configs.get(symbol) is None:
+            # Unknown symbol: not worth a cache slot, build as before
+            async with AsyncSessionLocal() as db:
+                data = await build_leaderboard(db, symbol, period, limit)
+            return APIResponse(success=True, data=data).model_dump_json().encode()
+
+        key: BoardKey = (symbol, period)
+        self._requested.add(key)
+        board = self._boards.get(key)
+        if board is not None and time.monotonic() - board.built_at < settings.LEADERBOARD_MAX_AGE:
+            if board.generation == self._generation:
+                self._stats["hits"] += 1
+            else:
+                # A rebuild is pending or running; serve the previous board meanwhile
+                self._stats["stale_hits"] += 1
+                self._schedule_rebuild(0)
+            return board.frame(limit)
+
+        self._stats["cold_builds"] += 1
+        board = await self._build(key)
+        return board.frame(limit)
+
+    async def _build(self, key: BoardKey) -> Board:
+        """Single-flight build of one board."""
+        return await self._building.run(key, lambda: self._build_board(key))
+
+    async def _build_board(self, key: BoardKey) -> Board:
+        generation = self._generation
+        started = time.perf_counter()
+        try:
+            async with AsyncSessionLocal() as db:
+                data = await build_leaderboard(db, key[0], key[1], settings.LEADERBOARD_MAX_LIMIT)
+        except Exception:
+            self._stats["build_failures"] += 1
+            raise
+        board = Board(
+            data=data,
+            generation=generation,
+            built_at=time.monotonic(),
+            build_ms=(time.perf_counter() - started) * 1000,
+        )
+        self._boards[key] = board
+        self._stats["boards_built"] += 1
+        return board
+
+    # ------------------------------------------------------------------
+    # Settlement-driven rebuild
+    # ------------------------------------------------------------------
+
+    def observe(self, channel: str, message: Dict[str, Any]) -> None:
+        """ConnectionHub observer: a `round_end` means scores changed."""
+        if message.get("type") != "round_end" or not is_sequenced(channel):
+            return
+        self._generation += 1
+        self._schedule_rebuild(settings.LEADERBOARD_REBUILD_DELAY)
+
+    def _schedule_rebuild(self, delay: float) -> None:
+        if self._rebuild_handle is not None or self._rebuild_task is not None:
+            return  # Already pending; it rebuilds at the then-current generation
+        loop = asyncio.get_running_loop()
+        self._rebuild_handle = loop.call_later(delay, self._start_rebuild)
+
+    def _start_rebuild(self) -> None:
+        self._rebuild_handle = None
+        self._rebuild_task = asyncio.get_running_loop().create_task(
+            self._rebuild(), name="leaderboard_rebuild"
+        )
+
+    async def _rebuild(self) -> None:
+        generation = self._generation
+        try:
+            await self.rebuild()
+        except Exception as e:
+            logger.warning(f"Leaderboard rebuild failed: {e}")
+        finally:
+            self._rebuild_task = None
+        # Settlements that landed while building need another pass (failed
+        # boards are retried by the next settlement or a cold read)
+        if self._generation != generation:
+            self._schedule_rebuild(settings.LEADERBOARD_REBUILD_DELAY)
+
+    async def board_keys(self) -> List[BoardKey]:
+        """Boards a rebuild covers: all-time global and per enabled symbol, plus recently served ones."""
+        keys: List[BoardKey] = [(None, "all")]
+        keys += [(s.symbol, "all") for s in await symbol_configs.enabled()]
+        keys += sorted(self._requested - set(keys), key=lambda k: (k[0] or "", k[1]))
+        return keys
+
+    async def rebuild(self) -> Dict[BoardKey, float]:
+        """
+        Rebuild every board in `board_keys` one after another.
+        Returns the build time (ms) per board.
+        """
+        started = time.perf_counter()
+        keys = await self.board_keys()
+        self._requested.clear()
+        timings: Dict[BoardKey, float] = {}
+        for key in keys:
+            try:
+                board = await self._build(key)
+                timings[key] = board.build_ms
+            except Exception as e:
+                logger.warning(f"Leaderboard build failed for {key}: {e}")
+        # Boards nobody asked for since the last rebuild are dropped
+        for key in list(self._boards):
+            if key not in keys and key not in self._requested:
+                del self._boards[key]
+        self._stats["rebuilds"] += 1
+        self._stats["last_rebuild_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        return timings
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "generation": self._generation,
+            "boards": {
+                f"{symbol or 'global'}:{period}": round(board.build_ms, 1)
+                for (symbol, period), board in sorted(self._boards.items(), key=lambda kv: (kv[0][0] or "", kv[0][1]))
+            },
+            "rebuild_pending": self._rebuild_handle is not None or self._rebuild_task is not None,
+            **self._stats,
+        }
+
+
+# Singleton
+leaderboards = LeaderboardMaterializer()
@@ -1,73 +1,282 @@
-import httpx
 from decimal import Decimal
-from typing import Optional
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+import asyncio
+import time
 from app.core.config import settings
+from app.services.http_client import http_transport
+from app.services.price_feed import price_feed
+from app.services.single_flight import SingleFlight
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+class PriceCache:
+    """
+    Short-lived price cache keyed by (symbol, api_source).
+
+    Concurrent misses for the same key share one in-flight upstream call
+    (single-flight), so the sampler, `/rounds/current` and new WebSocket
+    connections asking in the same second cost one Bitget request. The
+    fetch runs as its own task, so a cancelled caller does not fail the
+    others waiting on it.
+    """
+
+    def __init__(self) -> None:
+        # key -> (price, time.monotonic() when fetched)
+        self._entries: Dict[Tuple[str, str], Tuple[float, float]] = {}
+        self._inflight: SingleFlight[Tuple[str, str], float] = SingleFlight()
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "errors": 0,
+        }
+
+    async def get(
+        self,
+        key: Tuple[str, str],
+        fetch: Callable[[], Awaitable[float]],
+        max_age: Optional[float] = None,
+    ) -> float:
+        """
+        Get a cached price or fetch it, coalescing concurrent fetches.
+
+        Args:
+            key: (symbol, api_source)
+            fetch: Coroutine factory performing the upstream call
+            max_age: Max staleness in seconds (default PRICE_CACHE_TTL)
+        """
+        if max_age is None:
+            max_age = settings.PRICE_CACHE_TTL
+
+        entry = self._entries.get(key)
+        if entry is not None and time.monotonic() - entry[1] <= max_age:
+            self._stats["hits"] += 1
+            return entry[0]
+
+        if key in self._inflight:
+            self._stats["coalesced"] += 1
+        else:
+            self._stats["misses"] += 1
+        return await self._inflight.run(key, lambda: self._fetch(key, fetch))
+
+    async def _fetch(self, key: Tuple[str, str], fetch: Callable[[], Awaitable[float]]) -> float:
+        try:
+            price = await fetch()
+        except Exception:
+            self._stats["errors"] += 1
+            raise
+        self.put(key, price)
+        return price
+
+    def peek(self, key: Tuple[str, str], max_age: Optional[float] = None) -> Optional[float]:
+        """Cached price if fresh enough, without fetching or counting."""
+        if max_age is None:
+            max_age = settings.PRICE_CACHE_TTL
+        entry = self._entries.get(key)
+        if entry is None or time.monotonic() - entry[1] > max_age:
+            return None
+        return entry[0]
+
+    def put(self, key: Tuple[str, str], price: float) -> None:
+        """Store a freshly fetched price."""
+        self._entries[key] = (price, time.monotonic())
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self._stats["hits"] + self._stats["misses"] + self._stats["coalesced"]
+        return {
+            **self._stats,
+            "hit_ratio": round((lookups - self._stats["misses"]) / lookups, 4) if lookups else 0.0,
+            "entries": len(self._entries),
+            "inflight": len(self._inflight),
+            "ttl_seconds": settings.PRICE_CACHE_TTL,
+        }
+
+
 class MarketService:
     """Service for fetching market data from external APIs"""
 
     def __init__(self):
         self.base_url = settings.BITGET_API_BASE
+        self.price_cache = PriceCache()
 
     async def get_mark_price(self, symbol: str, product_type: str = "USDT-FUTURES") -> float:
         """Get mark price for a symbol"""
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{self.base_url}/api/v2/mix/market/symbol-price",
-                params={"symbol": symbol, "productType": product_type},
-                timeout=10.0
-            )
-            data = response.json()
+        response = await http_transport.get(
+            f"{self.base_url}/api/v2/mix/market/symbol-price",
+            params={"symbol": symbol, "productType": product_type},
+            timeout=10.0
+        )
+        data = response.json()
 
-            if data.get("code") != "00000":
-                raise Exception(
-                    f"Bitget API error: {data.get('msg', 'Unknown error')}")
+        if data.get("code") != "00000":
+            raise Exception(
+                f"Bitget API error: {data.get('msg', 'Unknown error')}")
 
-            if not data.get("data"):
-                raise Exception(f"No data returned for {symbol}")
+        if not data.get("data"):
+            raise Exception(f"No data returned for {symbol}")
 
-            return float(data["data"][0]["markPrice"])
+        return float(data["data"][0]["markPrice"])
 
     async def get_ticker(self, symbol: str, product_type: str = "USDT-FUTURES") -> dict:
         """Get full ticker data for a symbol"""
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{self.base_url}/api/v2/mix/market/ticker",
-                params={"symbol": symbol, "productType": product_type},
-                timeout=10.0
-            )
-            data = response.json()
-
-            if data.get("code") != "00000":
-                raise Exception(
-                    f"Bitget API error: {data.get('msg', 'Unknown error')}")
-
-            if not data.get("data"):
-                raise Exception(f"No data returned for {symbol}")
-
-            ticker = data["data"][0]
+        response = await http_transport.get(
+            f"{self.base_url}/api/v2/mix/market/ticker",
+            params={"symbol": symbol, "productType": product_type},
+            timeout=10.0
+        )
+        data = response.json()
+
+        if data.get("code") != "00000":
+            raise Exception(
+                f"Bitget API error: {data.get('msg', 'Unknown error')}")
+
+        if not data.get("data"):
+            raise Exception(f"No data returned for {symbol}")
+
+        ticker = data["data"][0]
+        return {
+            "symbol": symbol,
+            "last_price": float(ticker["lastPr"]),
+            "mark_price": float(ticker["markPrice"]),
+            "index_price": float(ticker.get("indexPrice", ticker["markPrice"])),
+            "high_24h": float(ticker["high24h"]),
+            "low_24h": float(ticker["low24h"]),
+            "change_24h": float(ticker["change24h"]),
+            "timestamp": int(ticker["ts"])
+        }
+
+    async def get_all_tickers(self, product_type: str = "USDT-FUTURES") -> Dict[str, dict]:
+        """
+        Get raw tickers for every contract of a product type in one call.
+
+        Returns:
+            Dict of symbol -> Bitget ticker item (lastPr, markPrice, ts, ...)
+        """
+        response = await http_transport.get(
+            f"{self.base_url}/api/v2/mix/market/tickers",
+            params={"productType": product_type},
+            timeout=10.0
+        )
+        data = response.json()
+
+        if data.get("code") != "00000":
+            raise Exception(
+                f"Bitget API error: {data.get('msg', 'Unknown error')}")
+
+        return {t["symbol"]: t for t in data.get("data") or [] if t.get("symbol")}
+
+    async def get_prices(self, symbol_configs: Iterable[Any]) -> Dict[str, float]:
+        """
+        Get current prices for many symbols with as few upstream calls as possible.
+
+        Streamed and cached prices are used first; the rest are grouped by
+        product type and fetched with one all-tickers call per group, all
+        groups concurrently. Fetched prices prime the price cache, so later
+        `get_price_by_source` calls in the same tick are served from memory.
+
+        Args:
+            symbol_configs: Objects with `symbol`, `api_source`, `product_type`
+
+        Returns:
+            Dict of symbol -> price. Symbols whose price could not be
+            fetched are left out (callers treat them as a failed sample).
+        """
+        prices: Dict[str, float] = {}
+        # (api_source, product_type) -> symbols still needing a price
+        missing: Dict[Tuple[str, str], List[str]] = {}
+
+        for cfg in symbol_configs:
+            price = price_feed.get_price(cfg.symbol, cfg.api_source)
+            if price is None:
+                price = self.price_cache.peek((cfg.symbol, cfg.api_source))
+            if price is not None:
+                prices[cfg.symbol] = price
+            else:
+                missing.setdefault((cfg.api_source, cfg.product_type), []).append(cfg.symbol)
+
+        if not missing:
+            return prices
+
+        groups = list(missing.items())
+        results = await asyncio.gather(
+            *(self._fetch_group_prices(api_source, product_type, symbols)
+              for (api_source, product_type), symbols in groups),
+            return_exceptions=True,
+        )
+        for ((api_source, product_type), symbols), result in zip(groups, results):
+            if isinstance(result, BaseException):
+                logger.debug(
+                    f"Batch price fetch failed for {api_source}/{product_type} "
+                    f"({len(symbols)} symbols): {result}")
+                continue
+            for symbol, price in result.items():
+                self.price_cache.put((symbol, api_source), price)
+                prices[symbol] = price
+
+        return prices
+
+    async def _fetch_group_prices(
+        self,
+        api_source: str,
+        product_type: str,
+        symbols: List[str]
+    ) -> Dict[str, float]:
+        """Fetch prices for symbols sharing an API source and product type."""
+        if api_source == "futures":
+            if len(symbols) == 1:
+                # One symbol: the single-symbol endpoint is a much smaller payload
+                return {symbols[0]: await self.get_mark_price(symbols[0], product_type)}
+            tickers = await self.get_all_tickers(product_type)
             return {
-                "symbol": symbol,
-                "last_price": float(ticker["lastPr"]),
-                "mark_price": float(ticker["markPrice"]),
-                "index_price": float(ticker.get("indexPrice", ticker["markPrice"])),
-                "high_24h": float(ticker["high24h"]),
-                "low_24h": float(ticker["low24h"]),
-                "change_24h": float(ticker["change24h"]),
-                "timestamp": int(ticker["ts"])
+                symbol: float(tickers[symbol]["markPrice"])
+                for symbol in symbols
+                if symbol in tickers
             }
 
+        # Sources without a batch endpoint: concurrent per-symbol calls
+        results = await asyncio.gather(
+            *(self._fetch_price_by_source(symbol, api_source, product_type) for symbol in symbols),
+            return_exceptions=True,
+        )
+        failed = [r for r in results if isinstance(r, BaseException)]
+        if failed and len(failed) == len(results):
+            raise failed[0]
+        return {
+            symbol: price
+            for symbol, price in zip(symbols, results)
+            if not isinstance(price, BaseException)
+        }
+
     async def get_price_by_source(
         self,
         symbol: str,
         api_source: str,
         product_type: str
     ) -> float:
-        """Get price based on API source type"""
+        """
+        Get price based on API source type.
+
+        Prefers the in-memory streaming price table; otherwise serves the
+        short-lived price cache, where concurrent misses share one REST call.
+        """
+        live_price = price_feed.get_price(symbol, api_source)
+        if live_price is not None:
+            return live_price
+
+        return await self.price_cache.get(
+            (symbol, api_source),
+            lambda: self._fetch_price_by_source(symbol, api_source, product_type),
+        )
+
+    async def _fetch_price_by_source(
+        self,
+        symbol: str,
+        api_source: str,
+        product_type: str
+    ) -> float:
+        """Upstream price call for an API source (uncached)."""
         if api_source == "futures":
             return await self.get_mark_price(symbol, product_type)
         elif api_source == "tradfi":
@@ -93,43 +302,42 @@ class MarketService:
         
         Returns list of dicts with: timestamp, open, high, low, close, volume
         """
-        async with httpx.AsyncClient() as client:
-            params = {
-                "symbol": symbol,
-                "productType": product_type.lower().replace("_", "-"),
-                "granularity": granularity,
-                "limit": str(limit)
-            }
-            if start_time:
-                params["startTime"] = str(start_time)
-            if end_time:
-                params["endTime"] = str(end_time)
-            
-            response = await client.get(
-                f"{self.base_url}/api/v2/mix/market/candles",
-                params=params,
-                timeout=10.0
-            )
-            data = response.json()
-
-            if data.get("code") != "00000":
-                raise Exception(
-                    f"Bitget API error: {data.get('msg', 'Unknown error')}")
-
-            candles = []
-            for item in data.get("data", []):
-                candles.append({
-                    "timestamp": int(item[0]),
-                    "open": float(item[1]),
-                    "high": float(item[2]),
-                    "low": float(item[3]),
-                    "close": float(item[4]),
-                    "volume": float(item[5])
-                })
-            
-            # Sort by timestamp ascending
-            candles.sort(key=lambda x: x["timestamp"])
-            return candles
+        params = {
+            "symbol": symbol,
+            "productType": product_type.lower().replace("_", "-"),
+            "granularity": granularity,
+            "limit": str(limit)
+        }
+        if start_time:
+            params["startTime"] = str(start_time)
+        if end_time:
+            params["endTime"] = str(end_time)
+        
+        response = await http_transport.get(
+            f"{self.base_url}/api/v2/mix/market/candles",
+            params=params,
+            timeout=10.0
+        )
+        data = response.json()
+
+        if data.get("code") != "00000":
+            raise Exception(
+                f"Bitget API error: {data.get('msg', 'Unknown error')}")
+
+        candles = []
+        for item in data.get("data", []):
+            candles.append({
+                "timestamp": int(item[0]),
+                "open": float(item[1]),
+                "high": float(item[2]),
+                "low": float(item[3]),
+                "close": float(item[4]),
+                "volume": float(item[5])
+            })
+        
+        # Sort by timestamp ascending
+        candles.sort(key=lambda x: x["timestamp"])
+        return candles
 
     async def get_historical_fills(
         self,
@@ -143,7 +351,8 @@ class MarketService:
         Get historical transaction/fill data from Bitget (tick-level).
         
         Endpoint: GET /api/v2/mix/market/fills-history
-        Rate limit: 10 requests/second
+        Rate limit: 10 requests/second (see `app.services.backfill` for
+        windows larger than one page)
         
         Args:
             symbol: Trading pair (e.g., "BTCUSDT")
@@ -155,110 +364,41 @@ class MarketService:
         Returns:
             List of trade records with tradeId, price, size, side, ts, symbol
         """
-        async with httpx.AsyncClient() as client:
-            params = {
-                "symbol": symbol,
-                "productType": product_type.lower().replace("_", "-"),
-                "limit": str(limit)
-            }
-            if start_time:
-                params["startTime"] = str(start_time)
-            if end_time:
-                params["endTime"] = str(end_time)
-            
-            response = await client.get(
-                f"{self.base_url}/api/v2/mix/market/fills-history",
-                params=params,
-                timeout=15.0
-            )
-            data = response.json()
-
-            if data.get("code") != "00000":
-                raise Exception(
-                    f"Bitget API error: {data.get('msg', 'Unknown error')}")
-
-            trades = []
-            for item in data.get("data", []):
-                trades.append({
-                    "tradeId": item.get("tradeId"),
-                    "price": float(item.get("price", 0)),
-                    "size": float(item.get("size", 0)),
-                    "side": item.get("side"),
-                    "timestamp": int(item.get("ts", 0)),
-                    "symbol": item.get("symbol")
-                })
-            
-            # Sort by timestamp ascending
-            trades.sort(key=lambda x: x["timestamp"])
-            return trades
-
-    async def get_historical_prices_aggregated(
-        self,
-        symbol: str,
-        product_type: str = "USDT-FUTURES",
-        start_time: int | None = None,
-        end_time: int | None = None,
-        interval_ms: int = 1000
-    ) -> list[dict]:
-        """
-        Get historical price data from Bitget fills-history API,
-        aggregated into fixed time intervals.
-        
-        This provides second-level granularity for chart display.
+        params = {
+            "symbol": symbol,
+            "productType": product_type.lower().replace("_", "-"),
+            "limit": str(limit)
+        }
+        if start_time:
+            params["startTime"] = str(start_time)
+        if end_time:
+            params["endTime"] = str(end_time)
         
-        Args:
-            symbol: Trading pair (e.g., "BTCUSDT")
-            product_type: Product type (default "USDT-FUTURES")
-            start_time: Start timestamp in milliseconds
-            end_time: End timestamp in milliseconds
-            interval_ms: Aggregation interval in milliseconds (default 1000 = 1 second)
+        response = await http_transport.get(
+            f"{self.base_url}/api/v2/mix/market/fills-history",
+            params=params,
+            timeout=15.0
+        )
+        data = response.json()
+
+        if data.get("code") != "00000":
+            raise Exception(
+                f"Bitget API error: {data.get('msg', 'Unknown error')}")
+
+        trades = []
+        for item in data.get("data", []):
+            trades.append({
+                "tradeId": item.get("tradeId"),
+                "price": float(item.get("price", 0)),
+                "size": float(item.get("size", 0)),
+                "side": item.get("side"),
+                "timestamp": int(item.get("ts", 0)),
+                "symbol": item.get("symbol")
+            })
         
-        Returns:
-            List of {timestamp, price} dicts, one per interval
-        """
-        try:
-            # Fetch tick-level data
-            trades = await self.get_historical_fills(
-                symbol=symbol,
-                product_type=product_type,
-                start_time=start_time,
-                end_time=end_time,
-                limit=1000
-            )
-            
-            if not trades:
-                return []
-            
-            # Aggregate trades into fixed intervals
-            price_map: dict[int, list[float]] = {}
-            
-            for trade in trades:
-                ts = trade["timestamp"]
-                price = trade["price"]
-                
-                # Round timestamp to interval
-                interval_ts = (ts // interval_ms) * interval_ms
-                
-                if interval_ts not in price_map:
-                    price_map[interval_ts] = []
-                price_map[interval_ts].append(price)
-            
-            # Convert to list with last price per interval
-            result = []
-            for ts in sorted(price_map.keys()):
-                prices = price_map[ts]
-                # Use last price in interval (most recent)
-                result.append({
-                    "timestamp": ts,
-                    "price": prices[-1]
-                })
-            
-            logger.info(f"Fetched {len(result)} price points from Bitget fills for {symbol}")
-            return result
-            
-        except Exception as e:
-            logger.warning(f"Failed to fetch Bitget fills for {symbol}: {e}")
-            return []
+        # Sort by timestamp ascending
+        trades.sort(key=lambda x: x["timestamp"])
+        return trades
 
 
 # Singleton instance
@@ -0,0 +1,189 @@
+"""
+Price Ring Buffers
+
+Compact in-memory price history for active rounds, so `/rounds/current`
+and WebSocket connects serve `price_history` without touching MySQL.
+- One array-backed ring buffer per active round: timestamps as int64
+  (`array('q')`), prices as float64 (`array('d')`)
+- Opened when the round is created (or its round_start is seen), fed by
+  the price sampler; rebuilt from `price_snapshots` on startup
+- Dropped once the round is settled
+
+Memory: 16 bytes per point (8 + 8) plus ~300 bytes of object overhead.
+Capacity is the round duration plus PRICE_BUFFER_SLACK seconds, so a
+10-minute round at 1 tick/s costs (600 + 60) * 16 B ≈ 10.6 KB per symbol;
+14 symbols ≈ 150 KB. The serialized list handed to the API is cached
+until the next tick, so concurrent readers share one copy.
+"""
+
+from array import array
+from typing import Any, Dict, Iterable, Optional
+import logging
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models import Round, PriceSnapshot
+
+logger = logging.getLogger(__name__)
+
+
+class RoundPriceBuffer:
+    """Fixed-capacity ring of (timestamp_ms, price) points in time order"""
+
+    __slots__ = ("round_id", "capacity", "_ts", "_px", "_head", "_size", "_cached")
+
+    def __init__(self, round_id: int, capacity: int) -> None:
+        self.round_id = round_id
+        self.capacity = capacity
+        self._ts = array("q", bytes(8 * capacity))
+        self._px = array("d", bytes(8 * capacity))
+        self._head = 0  # Index of the oldest point
+        self._size = 0
+        self._cached: Optional[list[dict]] = None
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def nbytes(self) -> int:
+        return self._ts.itemsize * len(self._ts) + self._px.itemsize * len(self._px)
+
+    def last_timestamp(self) -> Optional[int]:
+        if not self._size:
+            return None
+        return self._ts[(self._head + self._size - 1) % self.capacity]
+
+    def append(self, timestamp_ms: int, price: float) -> bool:
+        """
+        Append a point. Older-than-last points are ignored (the sampler is
+        monotonic); an equal timestamp replaces the last price.
+
+        Returns:
+            True if the buffer changed
+        """
+        last = self.last_timestamp()
+        if last is not None and timestamp_ms < last:
+            return False
+        self._cached = None
+        if last is not None and timestamp_ms == last:
+            self._px[(self._head + self._size - 1) % self.capacity] = price
+            return True
+
+        if self._size < self.capacity:
+            idx = (self._head + self._size) % self.capacity
+            self._size += 1
+        else:
+            # Full: overwrite the oldest point
+            idx = self._head
+            self._head = (self._head + 1) % self.capacity
+        self._ts[idx] = timestamp_ms
+        self._px[idx] = price
+        return True
+
+    def to_list(self) -> list[dict]:
+        """Points as [{timestamp, price}, ...] ordered by time (cached until next append)."""
+        if self._cached is None:
+            ts, px, cap, head = self._ts, self._px, self.capacity, self._head
+            self._cached = [
+                {"timestamp": ts[(head + i) % cap], "price": px[(head + i) % cap]}
+                for i in range(self._size)
+            ]
+        return self._cached
+
+
+class PriceBufferRegistry:
+    """Ring buffers of all active rounds, keyed by round_id"""
+
+    def __init__(self) -> None:
+        self._buffers: Dict[int, RoundPriceBuffer] = {}
+
+    @staticmethod
+    def _capacity(duration_seconds: Optional[int] = None) -> int:
+        duration = duration_seconds or settings.DEFAULT_ROUND_DURATION
+        return int(duration) + settings.PRICE_BUFFER_SLACK
+
+    def get(self, round_id: int) -> Optional[RoundPriceBuffer]:
+        return self._buffers.get(round_id)
+
+    def open(self, round_id: int, duration_seconds: Optional[int] = None) -> RoundPriceBuffer:
+        """Get or create the buffer for a round."""
+        buf = self._buffers.get(round_id)
+        if buf is None:
+            buf = RoundPriceBuffer(round_id, self._capacity(duration_seconds))
+            self._buffers[round_id] = buf
+        return buf
+
+    def append(self, round_id: int, timestamp_ms: int, price: float) -> None:
+        """
+        Add a point to an open round's buffer. Unknown rounds are ignored:
+        only `open` / `load` create buffers, so a tick that races the
+        round's settlement cannot resurrect a buffer `discard` just freed.
+        """
+        buf = self._buffers.get(round_id)
+        if buf is not None:
+            buf.append(timestamp_ms, float(price))
+
+    def load(
+        self,
+        round_id: int,
+        points: Iterable[dict],
+        duration_seconds: Optional[int] = None
+    ) -> RoundPriceBuffer:
+        """Replace a round's buffer with points ({timestamp, price}, time ordered)."""
+        buf = RoundPriceBuffer(round_id, self._capacity(duration_seconds))
+        for point in points:
+            buf.append(int(point["timestamp"]), float(point["price"]))
+        self._buffers[round_id] = buf
+        return buf
+
+    def discard(self, round_id: int) -> None:
+        """Drop a round's buffer (after settlement)."""
+        self._buffers.pop(round_id, None)
+
+    async def rebuild(self, db: AsyncSession) -> int:
+        """
+        Rebuild buffers for all active rounds from `price_snapshots`.
+
+        Returns:
+            Number of rounds loaded
+        """
+        rounds_result = await db.execute(
+            select(Round.id, Round.start_time, Round.end_time)
+            .where(Round.status == "active")
+        )
+        rounds = rounds_result.all()
+        self._buffers.clear()
+        if not rounds:
+            return 0
+
+        durations = {
+            r.id: int((r.end_time - r.start_time).total_seconds()) for r in rounds
+        }
+        for round_id, duration in durations.items():
+            self.open(round_id, duration)
+
+        result = await db.execute(
+            select(PriceSnapshot.round_id, PriceSnapshot.timestamp, PriceSnapshot.price)
+            .where(PriceSnapshot.round_id.in_(list(durations)))
+            .order_by(PriceSnapshot.round_id, PriceSnapshot.timestamp)
+        )
+        for round_id, timestamp, price in result.all():
+            self._buffers[round_id].append(timestamp, float(price))
+
+        logger.info(
+            f"Rebuilt price buffers for {len(rounds)} active rounds "
+            f"({sum(len(b) for b in self._buffers.values())} points)")
+        return len(rounds)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "rounds": len(self._buffers),
+            "points": sum(len(b) for b in self._buffers.values()),
+            "bytes": sum(b.nbytes for b in self._buffers.values()),
+        }
+
+
+# Singleton
+price_buffers = PriceBufferRegistry()
@@ -0,0 +1,356 @@
+"""
+Streaming Price Feed
+
+Keeps one long-lived WebSocket connection per exchange and maintains an
+in-memory last-price table for every subscribed symbol.
+- Subscribes to Bitget's public `ticker` channel for all enabled futures symbols
+- Reconnects automatically with exponential backoff
+- Detects gaps (disconnects or silent periods) and reports them in stats
+- Readers look prices up in memory; stale entries fall back to REST
+"""
+
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional, Set, Tuple, Any
+import asyncio
+import json
+import logging
+import time
+
+import websockets
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class PriceQuote:
+    """Last known price for a symbol"""
+    symbol: str
+    price: float
+    exchange_ts: int  # Exchange timestamp in milliseconds
+    received_at: float  # Local time.monotonic() when the update arrived
+
+
+class BitgetPriceFeed:
+    """
+    Single WebSocket connection to Bitget's public stream.
+
+    Subscriptions are (product_type, symbol) pairs, e.g. ("USDT-FUTURES", "BTCUSDT").
+    The mark price is tracked so streamed prices match `MarketService.get_mark_price`.
+    """
+
+    exchange = "bitget"
+
+    def __init__(self, url: str) -> None:
+        self.url = url
+        self._wanted: Set[Tuple[str, str]] = set()
+        self._subscribed: Set[Tuple[str, str]] = set()
+        self._quotes: Dict[str, PriceQuote] = {}
+        self._ws: Optional[Any] = None
+        self._task: Optional[asyncio.Task] = None
+        self._send_lock = asyncio.Lock()
+        self._stopping = False
+        # Last exchange timestamp seen before a disconnect, per symbol
+        self._gap_from: Dict[str, int] = {}
+        self._stats = {
+            "connects": 0,
+            "disconnects": 0,
+            "messages": 0,
+            "updates": 0,
+            "gaps": 0,
+            "max_gap_ms": 0,
+        }
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    async def start(self, subscriptions: Iterable[Tuple[str, str]]) -> None:
+        """Start the connection loop with an initial subscription set."""
+        self._wanted = set(subscriptions)
+        if self._task is None:
+            self._stopping = False
+            self._task = asyncio.create_task(self._run(), name=f"price_feed:{self.exchange}")
+
+    async def stop(self) -> None:
+        """Close the connection and stop reconnecting."""
+        self._stopping = True
+        if self._ws is not None:
+            try:
+                await self._ws.close()
+            except Exception:
+                pass
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._task = None
+
+    async def sync_subscriptions(self, subscriptions: Iterable[Tuple[str, str]]) -> None:
+        """
+        Update the subscription set. Sends subscribe/unsubscribe ops on the
+        live connection; otherwise the set is applied on the next connect.
+        """
+        wanted = set(subscriptions)
+        if wanted == self._wanted:
+            return
+        self._wanted = wanted
+
+        if self._ws is None:
+            return
+        to_add = wanted - self._subscribed
+        to_remove = self._subscribed - wanted
+        try:
+            if to_add:
+                await self._send_op("subscribe", to_add)
+            if to_remove:
+                await self._send_op("unsubscribe", to_remove)
+                for _, symbol in to_remove:
+                    self._quotes.pop(symbol, None)
+            self._subscribed = set(wanted)
+        except Exception as e:
+            logger.warning(f"Price feed resubscribe failed, will retry on reconnect: {e}")
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def get_quote(self, symbol: str) -> Optional[PriceQuote]:
+        """Get the last quote for a symbol (may be stale)."""
+        return self._quotes.get(symbol)
+
+    def get_price(self, symbol: str, max_age: Optional[float] = None) -> Optional[float]:
+        """
+        Get the last streamed price if it is fresh enough.
+
+        Args:
+            symbol: Symbol code
+            max_age: Max age in seconds (default PRICE_FEED_MAX_AGE)
+
+        Returns:
+            Price, or None if unknown or stale
+        """
+        quote = self._quotes.get(symbol)
+        if quote is None:
+            return None
+        if max_age is None:
+            max_age = settings.PRICE_FEED_MAX_AGE
+        if time.monotonic() - quote.received_at > max_age:
+            return None
+        return quote.price
+
+    @property
+    def connected(self) -> bool:
+        return self._ws is not None
+
+    def get_stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        return {
+            **self._stats,
+            "connected": self.connected,
+            "subscriptions": sorted(s for _, s in self._wanted),
+            "age_seconds": {
+                s: round(now - q.received_at, 3) for s, q in self._quotes.items()
+            },
+        }
+
+    # ------------------------------------------------------------------
+    # Connection loop
+    # ------------------------------------------------------------------
+
+    async def _run(self) -> None:
+        backoff = 1.0
+        while not self._stopping:
+            try:
+                async with websockets.connect(
+                    self.url,
+                    ping_interval=None,  # Bitget uses text "ping"/"pong"
+                    open_timeout=10,
+                    close_timeout=2,
+                ) as ws:
+                    self._ws = ws
+                    self._stats["connects"] += 1
+                    logger.info(f"Price feed connected to {self.url}")
+                    backoff = 1.0
+
+                    self._subscribed = set()
+                    if self._wanted:
+                        await self._send_op("subscribe", self._wanted)
+                        self._subscribed = set(self._wanted)
+
+                    heartbeat = asyncio.create_task(self._heartbeat(ws))
+                    try:
+                        await self._read_loop(ws)
+                    finally:
+                        heartbeat.cancel()
+            except asyncio.CancelledError:
+                raise
+            except websockets.ConnectionClosed as e:
+                if not self._stopping:
+                    logger.info(f"Price feed disconnected: {e}")
+            except Exception as e:
+                if not self._stopping:
+                    logger.warning(f"Price feed connection error: {e}")
+            finally:
+                if self._ws is not None:
+                    self._ws = None
+                    self._stats["disconnects"] += 1
+                    # Remember where each symbol stopped so the first update
+                    # after reconnect can measure the gap
+                    for symbol, quote in self._quotes.items():
+                        self._gap_from.setdefault(symbol, quote.exchange_ts)
+
+            if self._stopping:
+                break
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 30.0)
+
+    async def _heartbeat(self, ws: Any) -> None:
+        """Send text pings so Bitget keeps the connection open."""
+        interval = settings.PRICE_FEED_PING_INTERVAL
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                async with self._send_lock:
+                    await ws.send("ping")
+            except Exception:
+                return
+
+    async def _read_loop(self, ws: Any) -> None:
+        silence_timeout = settings.PRICE_FEED_SILENCE_TIMEOUT
+        while True:
+            try:
+                raw = await asyncio.wait_for(ws.recv(), timeout=silence_timeout)
+            except asyncio.TimeoutError:
+                logger.warning(
+                    f"Price feed silent for {silence_timeout}s, reconnecting")
+                return
+            self._stats["messages"] += 1
+            if raw == "pong":
+                continue
+            try:
+                message = json.loads(raw)
+            except (TypeError, ValueError):
+                continue
+            self._handle_message(message)
+
+    def _handle_message(self, message: dict) -> None:
+        event = message.get("event")
+        if event == "error":
+            logger.warning(f"Price feed error event: {message.get('msg')} ({message.get('code')})")
+            return
+        if event:
+            return  # subscribe/unsubscribe acks
+
+        arg = message.get("arg") or {}
+        if arg.get("channel") != "ticker":
+            return
+
+        now = time.monotonic()
+        for item in message.get("data") or []:
+            symbol = item.get("instId") or arg.get("instId")
+            raw_price = item.get("markPrice") or item.get("lastPr")
+            if not symbol or raw_price is None:
+                continue
+            try:
+                price = float(raw_price)
+                exchange_ts = int(item.get("ts") or message.get("ts") or 0)
+            except (TypeError, ValueError):
+                continue
+
+            self._check_gap(symbol, exchange_ts)
+            self._quotes[symbol] = PriceQuote(
+                symbol=symbol,
+                price=price,
+                exchange_ts=exchange_ts,
+                received_at=now,
+            )
+            self._stats["updates"] += 1
+
+    def _check_gap(self, symbol: str, exchange_ts: int) -> None:
+        """Record a gap if the exchange clock jumped past the threshold."""
+        previous = self._gap_from.pop(symbol, None)
+        if previous is None:
+            quote = self._quotes.get(symbol)
+            previous = quote.exchange_ts if quote else None
+        if previous is None or not exchange_ts:
+            return
+
+        gap_ms = exchange_ts - previous
+        if gap_ms > settings.PRICE_FEED_GAP_THRESHOLD_MS:
+            self._stats["gaps"] += 1
+            self._stats["max_gap_ms"] = max(self._stats["max_gap_ms"], gap_ms)
+            logger.warning(f"Price feed gap for {symbol}: {gap_ms}ms without updates")
+
+    async def _send_op(self, op: str, subscriptions: Iterable[Tuple[str, str]]) -> None:
+        ws = self._ws
+        if ws is None:
+            return
+        args = [
+            {"instType": product_type, "channel": "ticker", "instId": symbol}
+            for product_type, symbol in sorted(subscriptions)
+        ]
+        async with self._send_lock:
+            await ws.send(json.dumps({"op": op, "args": args}))
+
+
+class PriceFeedService:
+    """
+    Registry of exchange feeds, keyed by API source.
+
+    Only the `futures` source (Bitget USDT-M) streams today; other sources
+    keep using their REST paths in `MarketService`.
+    """
+
+    def __init__(self) -> None:
+        self._feeds: Dict[str, BitgetPriceFeed] = {}
+
+    async def start(self, symbols: Iterable[Any]) -> None:
+        """
+        Start streaming for the given symbol configs.
+
+        Args:
+            symbols: Objects with `symbol`, `api_source`, `product_type`
+        """
+        if not settings.PRICE_FEED_ENABLED:
+            logger.info("Price feed disabled, using REST prices")
+            return
+        if "futures" not in self._feeds:
+            self._feeds["futures"] = BitgetPriceFeed(settings.BITGET_WS_URL)
+        await self._feeds["futures"].start(self._futures_subscriptions(symbols))
+
+    async def stop(self) -> None:
+        for feed in self._feeds.values():
+            await feed.stop()
+        self._feeds.clear()
+
+    async def sync_symbols(self, symbols: Iterable[Any]) -> None:
+        """Apply the current set of enabled symbols to the running feeds."""
+        feed = self._feeds.get("futures")
+        if feed is not None:
+            await feed.sync_subscriptions(self._futures_subscriptions(symbols))
+
+    def get_price(self, symbol: str, api_source: str = "futures") -> Optional[float]:
+        """Fresh streamed price, or None if not streaming / stale."""
+        feed = self._feeds.get(api_source)
+        if feed is None:
+            return None
+        return feed.get_price(symbol)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {source: feed.get_stats() for source, feed in self._feeds.items()}
+
+    @staticmethod
+    def _futures_subscriptions(symbols: Iterable[Any]) -> Set[Tuple[str, str]]:
+        return {
+            (s.product_type, s.symbol)
+            for s in symbols
+            if s.api_source == "futures"
+        }
+
+
+# Singleton
+price_feed = PriceFeedService()
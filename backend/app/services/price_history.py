@@ -5,18 +5,24 @@ Manages second-level price snapshots for each round.
 - Stores prices in database for persistence
 - Auto-backfills missing data on startup using Bitget API
 - Supports multiple symbols through round_id
+- Live ticks go through a write-behind buffer flushed as multi-row inserts
 """
 
+from collections import deque
 from datetime import datetime
-from typing import Optional
+from typing import Any, Deque, Dict, Optional, Tuple
 from sqlalchemy import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.dialects.mysql import insert as mysql_insert
+from app.db.database import AsyncSessionLocal
 from app.models import Round, PriceSnapshot
-from app.services.market import market_service
+from app.services.backfill import fills_backfill
+from app.services.price_buffer import price_buffers
 from app.core.config import settings
+import asyncio
 import logging
 import calendar
+import time
 
 logger = logging.getLogger(__name__)
 
@@ -24,44 +30,28 @@ logger = logging.getLogger(__name__)
 class PriceHistoryService:
     """Service for managing price snapshots"""
 
-    async def record_price(
+    async def write_snapshots(
         self,
         db: AsyncSession,
-        round_id: int,
-        timestamp_ms: int,
-        price: float
-    ) -> bool:
+        rows: list[dict]
+    ) -> int:
         """
-        Record a single price snapshot for a round.
-        Uses INSERT IGNORE to handle duplicates gracefully.
-        
+        Write many snapshots in one multi-row upsert and commit once.
+
         Args:
             db: Database session
-            round_id: Round ID
-            timestamp_ms: Unix timestamp in milliseconds
-            price: Price value
-        
+            rows: List of {round_id, timestamp, price} dicts
+
         Returns:
-            True if recorded, False if skipped (duplicate)
+            Number of affected rows reported by MySQL
         """
-        try:
-            # Use MySQL INSERT ... ON DUPLICATE KEY UPDATE (effectively ignore)
-            stmt = mysql_insert(PriceSnapshot).values(
-                round_id=round_id,
-                timestamp=timestamp_ms,
-                price=price
-            ).on_duplicate_key_update(
-                # Update price even if exists (idempotent, no real change)
-                price=price
-            )
-            result = await db.execute(stmt)
-            await db.commit()
-            
-            return result.rowcount > 0
-        except Exception as e:
-            logger.warning(f"Failed to record price for round {round_id}: {e}")
-            await db.rollback()
-            return False
+        if not rows:
+            return 0
+        stmt = mysql_insert(PriceSnapshot).values(rows)
+        stmt = stmt.on_duplicate_key_update(price=stmt.inserted.price)
+        result = await db.execute(stmt)
+        await db.commit()
+        return result.rowcount or 0
 
     async def get_price_history(
         self,
@@ -70,6 +60,9 @@ class PriceHistoryService:
     ) -> list[dict]:
         """
         Get all price snapshots for a round from database.
+
+        Ticks still waiting in the write-behind buffer are merged in, so
+        readers never see a hole of up to one flush interval.
         
         Args:
             db: Database session
@@ -83,10 +76,19 @@ class PriceHistoryService:
             .where(PriceSnapshot.round_id == round_id)
             .order_by(PriceSnapshot.timestamp)
         )
+        history = {row[0]: float(row[1]) for row in result.all()}
+
+        pending = snapshot_writer.pending(round_id)
+        if pending:
+            history.update(pending)
+            return [
+                {"timestamp": ts, "price": price}
+                for ts, price in sorted(history.items())
+            ]
         
         return [
-            {"timestamp": row[0], "price": float(row[1])}
-            for row in result.all()
+            {"timestamp": ts, "price": price}
+            for ts, price in history.items()
         ]
 
     async def get_snapshot_count(
@@ -94,12 +96,12 @@ class PriceHistoryService:
         db: AsyncSession,
         round_id: int
     ) -> int:
-        """Get number of price snapshots for a round"""
+        """Get number of price snapshots for a round (including buffered ticks)"""
         result = await db.execute(
             select(func.count(PriceSnapshot.id))
             .where(PriceSnapshot.round_id == round_id)
         )
-        return result.scalar() or 0
+        return (result.scalar() or 0) + len(snapshot_writer.pending(round_id))
 
     async def backfill_round_history(
         self,
@@ -148,8 +150,8 @@ class PriceHistoryService:
         logger.info(f"Round {round.id}: Backfilling {current_points}/{expected_points} points ({missing_ratio:.0%} missing)")
         
         try:
-            # Fetch historical data from Bitget
-            tick_prices = await market_service.get_historical_prices_aggregated(
+            # Fetch historical trades from Bitget (sliced, paginated, rate-limited)
+            tick_prices = await fills_backfill.fetch_prices(
                 symbol=round.symbol,
                 product_type=symbol_product_type,
                 start_time=round_start_ms,
@@ -161,16 +163,14 @@ class PriceHistoryService:
                 logger.warning(f"No tick data returned for round {round.id}")
                 return 0
             
-            # Insert new snapshots
-            added = 0
-            for point in tick_prices:
-                ts = point["timestamp"]
-                if ts not in existing_timestamps:
-                    success = await self.record_price(
-                        db, round.id, ts, point["price"]
-                    )
-                    if success:
-                        added += 1
+            # Insert new snapshots in one bulk upsert
+            new_rows = [
+                {"round_id": round.id, "timestamp": point["timestamp"], "price": point["price"]}
+                for point in tick_prices
+                if point["timestamp"] not in existing_timestamps
+            ]
+            await self.write_snapshots(db, new_rows)
+            added = len(new_rows)
             
             logger.info(f"Round {round.id}: Backfilled {added} new price points")
             return added
@@ -189,7 +189,9 @@ class PriceHistoryService:
         """
         Ensure a round has sufficient price history, backfilling if needed.
         
-        This is the main method called by the API endpoint.
+        This is the main method called by the API endpoint. Active rounds are
+        normally answered from the in-memory ring buffer; the database is only
+        read (and the buffer reloaded) when the buffer is missing or too sparse.
         
         Args:
             db: Database session
@@ -200,13 +202,19 @@ class PriceHistoryService:
         Returns:
             List of {timestamp, price} dicts
         """
-        # Get current count
-        count = await self.get_snapshot_count(db, round.id)
-        
         # Calculate expected count
         now = datetime.utcnow()
         elapsed = (min(now, round.end_time) - round.start_time).total_seconds()
         expected = max(1, int(elapsed))
+        duration = int((round.end_time - round.start_time).total_seconds())
+
+        # Serve from the in-memory ring buffer when it covers enough (no DB query)
+        buf = price_buffers.get(round.id)
+        if buf is not None and len(buf) / expected >= min_coverage:
+            return buf.to_list()
+
+        # Get current count
+        count = await self.get_snapshot_count(db, round.id)
         
         coverage = count / expected if expected > 0 else 1
         
@@ -214,9 +222,143 @@ class PriceHistoryService:
         if coverage < min_coverage:
             await self.backfill_round_history(db, round, symbol_product_type)
         
-        # Return current history from database
-        return await self.get_price_history(db, round.id)
+        # Return current history from database, and keep it in memory for next time
+        history = await self.get_price_history(db, round.id)
+        if round.status == "active":
+            price_buffers.load(round.id, history, duration)
+        return history
+
+
+class SnapshotWriter:
+    """
+    Write-behind buffer for live price ticks.
+
+    The sampler appends ticks in memory; a background task flushes them as
+    multi-row upserts every PRICE_WRITER_FLUSH_INTERVAL seconds, or sooner
+    once PRICE_WRITER_BATCH_SIZE rows are waiting. The buffer is bounded by
+    PRICE_WRITER_MAX_BUFFER: when MySQL is unavailable for long, the oldest
+    ticks are dropped (and counted) instead of growing without limit.
+    """
+
+    def __init__(self) -> None:
+        # (round_id, timestamp_ms, price)
+        self._buffer: Deque[Tuple[int, int, float]] = deque()
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._flush_lock = asyncio.Lock()
+        self._stats = {
+            "appended": 0,
+            "flushes": 0,
+            "rows_written": 0,
+            "dropped": 0,
+            "errors": 0,
+            "last_flush_ms": 0.0,
+            "max_flush_ms": 0.0,
+            "total_flush_ms": 0.0,
+            "max_backlog": 0,
+        }
+
+    async def start(self) -> None:
+        """Start the background flusher (idempotent)."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="snapshot_writer")
+
+    async def stop(self) -> None:
+        """Stop the flusher and write everything still buffered."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._task = None
+        while self._buffer:
+            if not await self.flush():
+                logger.error(f"Dropping {len(self._buffer)} buffered price snapshots on shutdown")
+                break
+
+    def append(self, round_id: int, timestamp_ms: int, price: float) -> None:
+        """Queue one tick for persistence (non-blocking)."""
+        if len(self._buffer) >= settings.PRICE_WRITER_MAX_BUFFER:
+            self._buffer.popleft()
+            self._stats["dropped"] += 1
+        self._buffer.append((round_id, timestamp_ms, float(price)))
+        self._stats["appended"] += 1
+        backlog = len(self._buffer)
+        if backlog > self._stats["max_backlog"]:
+            self._stats["max_backlog"] = backlog
+        if backlog >= settings.PRICE_WRITER_BATCH_SIZE:
+            self._wakeup.set()
+
+    def pending(self, round_id: int) -> Dict[int, float]:
+        """Buffered (not yet written) ticks for a round: timestamp -> price."""
+        return {ts: price for rid, ts, price in self._buffer if rid == round_id}
+
+    async def flush(self) -> bool:
+        """
+        Write up to one batch of buffered ticks.
+
+        Returns:
+            True on success (or nothing to do), False if the write failed
+            and the batch was put back into the buffer.
+        """
+        async with self._flush_lock:
+            if not self._buffer:
+                return True
+            batch_size = settings.PRICE_WRITER_BATCH_SIZE
+            batch = [self._buffer.popleft() for _ in range(min(batch_size, len(self._buffer)))]
+
+            # Last write wins for duplicate (round_id, timestamp) keys in one batch
+            rows = list({
+                (rid, ts): {"round_id": rid, "timestamp": ts, "price": price}
+                for rid, ts, price in batch
+            }.values())
+
+            started = time.perf_counter()
+            try:
+                async with AsyncSessionLocal() as db:
+                    await price_history_service.write_snapshots(db, rows)
+            except Exception as e:
+                self._stats["errors"] += 1
+                logger.warning(f"Price snapshot flush failed ({len(rows)} rows), will retry: {e}")
+                # Put the batch back in front, keeping the buffer bounded
+                room = settings.PRICE_WRITER_MAX_BUFFER - len(self._buffer)
+                keep = batch[-room:] if room > 0 else []
+                self._stats["dropped"] += len(batch) - len(keep)
+                self._buffer.extendleft(reversed(keep))
+                return False
+
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            self._stats["flushes"] += 1
+            self._stats["rows_written"] += len(rows)
+            self._stats["last_flush_ms"] = round(elapsed_ms, 2)
+            self._stats["total_flush_ms"] += elapsed_ms
+            self._stats["max_flush_ms"] = max(self._stats["max_flush_ms"], round(elapsed_ms, 2))
+            return True
+
+    def get_stats(self) -> Dict[str, Any]:
+        flushes = self._stats["flushes"]
+        stats = {k: v for k, v in self._stats.items() if k != "total_flush_ms"}
+        stats["avg_flush_ms"] = round(self._stats["total_flush_ms"] / flushes, 2) if flushes else 0.0
+        stats["backlog"] = len(self._buffer)
+        stats["max_buffer"] = settings.PRICE_WRITER_MAX_BUFFER
+        stats["running"] = self._task is not None
+        return stats
+
+    async def _run(self) -> None:
+        interval = settings.PRICE_WRITER_FLUSH_INTERVAL
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            # Drain the backlog; after a failure wait for the next interval
+            while self._buffer:
+                if not await self.flush():
+                    break
 
 
-# Singleton
+# Singletons
 price_history_service = PriceHistoryService()
+snapshot_writer = SnapshotWriter()
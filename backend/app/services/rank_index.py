@@ -0,0 +1,260 @@
+"""
+Rank Index
+
+In-memory order statistics over bot scores, so the endpoints agents poll
+every heartbeat (`/bets/me/score`, `/bets/me/stats`, `/agents/{id}`) get
+their rank without a `SELECT COUNT(*) ... WHERE score > ?` range scan that
+grows with the number of agents.
+- One index over bot_scores.total_score, one per symbol over
+  bot_symbol_stats.score
+- Each index is a list of (-score, bot_id) kept sorted: rank is a bisect
+  (O(log n)), top-k a slice (O(k)); an update is a bisect plus a list
+  insert/delete (C-level memmove)
+- Ties: equal scores share the best rank (1, 2, 2, 4), exactly what the
+  COUNT(*) query returned; top-k lists equal scores by bot_id ascending
+- The scheduler applies each settlement's score deltas after its commit;
+  other workers re-read the absolute scores of the round's bots when they
+  see its `round_end` on the hub
+- Loaded at startup and re-read in full every RANK_INDEX_REFRESH_INTERVAL
+  seconds as a consistency check (bots registered on other workers, deletes)
+"""
+
+from bisect import bisect_left, insort
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+import asyncio
+import logging
+import time
+
+from sqlalchemy import select, and_
+
+from app.core.config import settings
+from app.db.database import AsyncSessionLocal
+from app.models import Bet, BotScore, BotSymbolStats
+from app.services.ws_hub import is_sequenced
+
+logger = logging.getLogger(__name__)
+
+# (symbol or None for the global index, bot_id)
+ScoreKey = Tuple[Optional[str], str]
+
+
+class ScoreIndex:
+    """Scores of one ranking, kept sorted best-first"""
+
+    def __init__(self, scores: Iterable[Tuple[str, int]] = ()) -> None:
+        self._scores: Dict[str, int] = dict(scores)
+        self._keys: List[Tuple[int, str]] = sorted((-s, b) for b, s in self._scores.items())
+
+    def __len__(self) -> int:
+        return len(self._scores)
+
+    def get(self, bot_id: str) -> Optional[int]:
+        return self._scores.get(bot_id)
+
+    def set(self, bot_id: str, score: int) -> None:
+        old = self._scores.get(bot_id)
+        if old == score:
+            return
+        if old is not None:
+            del self._keys[bisect_left(self._keys, (-old, bot_id))]
+        insort(self._keys, (-score, bot_id))
+        self._scores[bot_id] = score
+
+    def discard(self, bot_id: str) -> None:
+        old = self._scores.pop(bot_id, None)
+        if old is not None:
+            del self._keys[bisect_left(self._keys, (-old, bot_id))]
+
+    def rank_of_score(self, score: int) -> int:
+        """1 + number of bots scoring strictly higher."""
+        # (-score,) sorts before every (-score, bot_id)
+        return bisect_left(self._keys, (-score,)) + 1
+
+    def rank(self, bot_id: str) -> Optional[int]:
+        score = self._scores.get(bot_id)
+        return None if score is None else self.rank_of_score(score)
+
+    def top(self, k: int) -> List[Tuple[str, int]]:
+        """Best `k` as (bot_id, score), ties by bot_id ascending."""
+        return [(bot_id, -neg) for neg, bot_id in self._keys[:k]]
+
+
+class RankIndex:
+    """Global and per-symbol rank indexes"""
+
+    def __init__(self) -> None:
+        self._global = ScoreIndex()
+        self._symbols: Dict[str, ScoreIndex] = {}
+        # symbol -> last round whose scores were applied (skips its round_end)
+        self._applied: Dict[str, int] = {}
+        # Keys updated while a refresh is querying; they keep the newer value
+        self._dirty: Optional[Set[ScoreKey]] = None
+        self._loaded_at: Optional[float] = None
+        self._refresh_lock = asyncio.Lock()
+        # Running settlement fetches (the loop only holds weak references)
+        self._fetches: Set[asyncio.Task] = set()
+        self._stats = {
+            "rank_queries": 0,
+            "refreshes": 0,
+            "settlements_applied": 0,
+            "settlements_fetched": 0,
+        }
+
+    def _index(self, symbol: Optional[str]) -> ScoreIndex:
+        if symbol is None:
+            return self._global
+        index = self._symbols.get(symbol)
+        if index is None:
+            index = self._symbols[symbol] = ScoreIndex()
+        return index
+
+    def _set(self, symbol: Optional[str], bot_id: str, score: int) -> None:
+        self._index(symbol).set(bot_id, score)
+        if self._dirty is not None:
+            self._dirty.add((symbol, bot_id))
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    async def rank(self, symbol: Optional[str], bot_id: str, score: int) -> int:
+        """
+        Rank of a bot with `score` (the caller's freshly read row): global
+        if `symbol` is None, else within the symbol. A bot the index has
+        not seen yet (just registered) is added.
+        """
+        self._stats["rank_queries"] += 1
+        await self._ensure_fresh()
+        index = self._index(symbol)
+        stored = index.get(bot_id)
+        if stored is None:
+            self._set(symbol, bot_id, score)
+        rank = index.rank_of_score(score)
+        if stored is not None and stored > score:
+            rank -= 1  # Its own (stale) entry is not a higher bot
+        return rank
+
+    async def global_rank(self, bot_id: str, score: int) -> int:
+        return await self.rank(None, bot_id, score)
+
+    async def symbol_rank(self, symbol: str, bot_id: str, score: int) -> int:
+        return await self.rank(symbol, bot_id, score)
+
+    async def top(self, symbol: Optional[str], k: int) -> List[Tuple[str, int]]:
+        """Best `k` (bot_id, score), global or within a symbol."""
+        await self._ensure_fresh()
+        return self._index(symbol).top(k)
+
+    # ------------------------------------------------------------------
+    # Settlement updates
+    # ------------------------------------------------------------------
+
+    def apply_settlement(self, round_id: int, symbol: str, deltas: Iterable[Tuple[str, int]]) -> None:
+        """Add a committed settlement's (bot_id, score_change) deltas."""
+        initial = settings.INITIAL_SCORE
+        for bot_id, delta in deltas:
+            for scope in (None, symbol):
+                current = self._index(scope).get(bot_id)
+                self._set(scope, bot_id, (initial if current is None else current) + delta)
+        self._applied[symbol] = max(self._applied.get(symbol, 0), round_id)
+        self._stats["settlements_applied"] += 1
+
+    def observe(self, channel: str, message: Dict[str, Any]) -> None:
+        """ConnectionHub observer: pick up settlements run by another worker."""
+        if message.get("type") != "round_end" or not is_sequenced(channel):
+            return
+        round_id = (message.get("data") or {}).get("id")
+        if round_id is None or round_id <= self._applied.get(channel, 0):
+            return  # Applied here already (this worker settled it)
+        task = asyncio.get_running_loop().create_task(self._fetch_settlement(channel, round_id))
+        self._fetches.add(task)
+        task.add_done_callback(self._fetches.discard)
+
+    async def _fetch_settlement(self, symbol: str, round_id: int) -> None:
+        """Re-read the absolute scores of the bots that bet in a round."""
+        try:
+            async with AsyncSessionLocal() as db:
+                global_rows = (await db.execute(
+                    select(BotScore.bot_id, BotScore.total_score)
+                    .join(Bet, Bet.bot_id == BotScore.bot_id)
+                    .where(Bet.round_id == round_id)
+                )).all()
+                symbol_rows = (await db.execute(
+                    select(BotSymbolStats.bot_id, BotSymbolStats.score)
+                    .join(Bet, and_(Bet.bot_id == BotSymbolStats.bot_id,
+                                    Bet.symbol == BotSymbolStats.symbol))
+                    .where(Bet.round_id == round_id)
+                )).all()
+        except Exception as e:
+            logger.warning(f"Rank index update for round {round_id} failed, next refresh repairs it: {e}")
+            return
+        for bot_id, score in global_rows:
+            self._set(None, bot_id, score)
+        for bot_id, score in symbol_rows:
+            self._set(symbol, bot_id, score)
+        self._applied[symbol] = max(self._applied.get(symbol, 0), round_id)
+        self._stats["settlements_fetched"] += 1
+
+    # ------------------------------------------------------------------
+    # Loading
+    # ------------------------------------------------------------------
+
+    async def _ensure_fresh(self) -> None:
+        loaded_at = self._loaded_at
+        if loaded_at is not None and time.monotonic() - loaded_at < settings.RANK_INDEX_REFRESH_INTERVAL:
+            return
+        async with self._refresh_lock:
+            # Concurrent readers share one refresh
+            if self._loaded_at == loaded_at:
+                await self._refresh_locked()
+
+    async def refresh(self) -> None:
+        """Re-read every score in two queries."""
+        async with self._refresh_lock:
+            await self._refresh_locked()
+
+    async def _refresh_locked(self) -> None:
+        self._dirty = set()
+        try:
+            async with AsyncSessionLocal() as db:
+                global_rows = (await db.execute(
+                    select(BotScore.bot_id, BotScore.total_score)
+                )).all()
+                symbol_rows = (await db.execute(
+                    select(BotSymbolStats.symbol, BotSymbolStats.bot_id, BotSymbolStats.score)
+                )).all()
+
+            by_symbol: Dict[str, List[Tuple[str, int]]] = {}
+            for symbol, bot_id, score in symbol_rows:
+                by_symbol.setdefault(symbol, []).append((bot_id, score))
+            fresh_global = ScoreIndex((bot_id, score) for bot_id, score in global_rows)
+            fresh_symbols = {symbol: ScoreIndex(rows) for symbol, rows in by_symbol.items()}
+
+            # Updates that landed during the queries are newer than them
+            for symbol, bot_id in self._dirty:
+                score = self._index(symbol).get(bot_id)
+                if score is None:
+                    continue
+                if symbol is None:
+                    fresh_global.set(bot_id, score)
+                else:
+                    fresh_symbols.setdefault(symbol, ScoreIndex()).set(bot_id, score)
+        finally:
+            self._dirty = None
+
+        self._global = fresh_global
+        self._symbols = fresh_symbols
+        self._loaded_at = time.monotonic()
+        self._stats["refreshes"] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "bots": len(self._global),
+            "symbols": {s: len(index) for s, index in sorted(self._symbols.items())},
+            "age_seconds": round(time.monotonic() - self._loaded_at, 1) if self._loaded_at else None,
+            **self._stats,
+        }
+
+
+# Singleton
+rank_index = RankIndex()
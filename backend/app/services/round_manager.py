@@ -1,9 +1,13 @@
 from datetime import datetime, timedelta
 from typing import Optional, Tuple
-from sqlalchemy import select, update, func
+from sqlalchemy import select, update, func, case
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.models import Symbol, Round, Bet, BotScore, BotSymbolStats
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from app.models import Symbol, Round, Bet, BotScore, BotSymbolStats, BotHourlyStats
+from app.services.active_rounds import active_rounds, ActiveRound
 from app.services.market import market_service
+from app.services.price_buffer import price_buffers
+from app.services.rank_index import rank_index
 from app.services.scoring import scoring_service
 from app.core.config import settings
 import logging
@@ -11,6 +15,48 @@ import logging
 logger = logging.getLogger(__name__)
 
 
+def advance_streaks(win_streak: int, current_streak: int, result: str) -> Tuple[int, int]:
+    """
+    One settled bet's effect on (win_streak, current_streak).
+
+    win_streak (scoring): +1 on win, 0 on loss, kept on draw.
+    current_streak (display): extends a run of the same result up to
+    ±STREAK_DISPLAY_CAP, flips to ±1 on the other, resets on draw.
+    `streak_updates` is the same transition in SQL.
+    """
+    cap = settings.STREAK_DISPLAY_CAP
+    if result == "win":
+        return win_streak + 1, min(current_streak + 1, cap) if current_streak > 0 else 1
+    if result == "lose":
+        return 0, max(current_streak - 1, -cap) if current_streak < 0 else -1
+    return win_streak, 0
+
+
+def streak_updates(win_streak, current_streak, won, lost) -> dict:
+    """
+    `advance_streaks` as SQL expressions over the old column values.
+    Each expression reads only its own column, so it is safe in an upsert.
+    """
+    cap = settings.STREAK_DISPLAY_CAP
+    return {
+        "win_streak": case(
+            (won, win_streak + 1),
+            (lost, 0),
+            else_=win_streak,
+        ),
+        "current_streak": case(
+            (won, case((current_streak >= cap, cap), (current_streak > 0, current_streak + 1), else_=1)),
+            (lost, case((current_streak <= -cap, -cap), (current_streak < 0, current_streak - 1), else_=-1)),
+            else_=0,
+        ),
+    }
+
+
+def hour_bucket(when: datetime) -> datetime:
+    """The bot_hourly_stats bucket a bet placed at `when` falls in."""
+    return when.replace(minute=0, second=0, microsecond=0)
+
+
 class RoundManager:
     """Service for managing game rounds"""
 
@@ -122,6 +168,8 @@ class RoundManager:
         db.add(round)
         await db.commit()
         await db.refresh(round)
+        active_rounds.put(ActiveRound.from_model(round))
+        price_buffers.open(round.id, int((end_time - start_time).total_seconds()))
 
         logger.info(
             f"Created round {round.id} for {symbol_config.symbol}: {start_time.strftime('%H:%M')} - {end_time.strftime('%H:%M')} @ {open_price}")
@@ -148,11 +196,14 @@ class RoundManager:
                 f"Round {round_id} status is {round.status}, skipping settlement")
             return None
 
+        entry = ActiveRound.from_model(round)
         try:
             # Update status to settling (if not already)
             if round.status == "active":
                 round.status = "settling"
                 await db.commit()
+            # No more bets from here on
+            active_rounds.discard(entry.symbol, round_id)
 
             # Get close price
             close_price = await market_service.get_price_by_source(
@@ -178,11 +229,12 @@ class RoundManager:
             round.price_change = price_change
             round.result = round_result
 
-            # Get all bets for this round
+            # Get all bets for this round (plain columns, no ORM objects)
             bets_result = await db.execute(
-                select(Bet).where(Bet.round_id == round_id)
+                select(Bet.id, Bet.bot_id, Bet.bot_name, Bet.direction, Bet.time_progress, Bet.created_at)
+                .where(Bet.round_id == round_id)
             )
-            bets = bets_result.scalars().all()
+            bets = bets_result.all()
 
             # Get win streaks for all bots in this round (with skip penalty applied)
             bot_ids = [b.bot_id for b in bets]
@@ -190,7 +242,8 @@ class RoundManager:
                 db, bot_ids, current_round_id=round_id, symbol=round.symbol
             )
 
-            # Settle each bet
+            # Compute every bet's result and score in memory
+            settled = []
             for bet in bets:
                 if round_result == "draw":
                     bet_result = "draw"
@@ -206,21 +259,23 @@ class RoundManager:
                 score_change = scoring_service.calculate_score_change(
                     time_progress, bet_result, win_streak
                 )
+                settled.append((bet.id, bet.bot_id, bet.bot_name, bet_result, score_change,
+                                hour_bucket(bet.created_at or round.start_time)))
 
-                # Update bet
-                bet.result = bet_result
-                bet.score_change = score_change
-
-                # Update bot global score
-                await self._update_bot_score(db, bet.bot_id, bet.bot_name, score_change, bet_result)
-
-                # Update bot symbol stats
-                await self._update_bot_symbol_stats(db, bet.bot_id, round.symbol, score_change, bet_result)
+            # Apply them with a few set-based statements
+            await self._apply_settlement(db, round.id, round.symbol, settled)
 
             # Finalize round
             round.status = "settled"
             await db.commit()
 
+            # History of settled rounds is served from the database
+            price_buffers.discard(round_id)
+            active_rounds.end(entry.symbol, round_id)
+            rank_index.apply_settlement(
+                round_id, round.symbol, [(s[1], s[4]) for s in settled]
+            )
+
             logger.info(
                 f"Settled round {round_id}: {round_result} ({price_change:.4%})")
             
@@ -232,6 +287,7 @@ class RoundManager:
             try:
                 round.status = "active"
                 await db.commit()
+                active_rounds.put(entry)
             except Exception:
                 pass  # Ignore rollback errors
             raise  # Re-raise to let caller handle
@@ -246,6 +302,9 @@ class RoundManager:
         """
         Get current win streak for each bot, with skip penalty.
         
+        Reads the materialized `bot_scores.win_streak` (wins since the last
+        loss; draws don't break it), maintained by `_apply_settlement`.
+
         If a bot skips too many consecutive rounds (beyond grace period),
         their streak is reset to 0 to prevent "cherry-picking" rounds.
         
@@ -255,41 +314,11 @@ class RoundManager:
         if not bot_ids:
             return {}
 
-        streaks: dict[str, int] = {}
-
-        # Get recent settled bets for each bot (up to 10)
-        rn = func.row_number().over(
-            partition_by=Bet.bot_id, order_by=Bet.created_at.desc()
-        ).label("rn")
-        subq = (
-            select(Bet.bot_id, Bet.result, rn)
-            .where(Bet.bot_id.in_(bot_ids), Bet.result != "pending")
-            .subquery()
-        )
         streak_rows = await db.execute(
-            select(subq.c.bot_id, subq.c.result)
-            .where(subq.c.rn <= 10)
-            .order_by(subq.c.bot_id, subq.c.rn)
+            select(BotScore.bot_id, BotScore.win_streak)
+            .where(BotScore.bot_id.in_(bot_ids))
         )
-
-        # Group results by bot_id
-        bot_results: dict[str, list[str]] = {}
-        for bot_id, result in streak_rows.all():
-            if bot_id not in bot_results:
-                bot_results[bot_id] = []
-            bot_results[bot_id].append(result)
-
-        # Calculate streak for each bot
-        for bot_id, results in bot_results.items():
-            streak = 0
-            for res in results:
-                if res == "win":
-                    streak += 1
-                elif res == "draw":
-                    continue  # Draws don't break streak
-                else:
-                    break  # Lose breaks streak
-            streaks[bot_id] = streak
+        streaks = {bot_id: win_streak or 0 for bot_id, win_streak in streak_rows.all()}
 
         # Apply skip penalty if enabled
         if settings.STREAK_DECAY_ON_SKIP and current_round_id and symbol:
@@ -311,9 +340,12 @@ class RoundManager:
         Apply streak penalty for bots who skipped too many rounds.
         
         If a bot has a streak but skipped more than GRACE rounds recently,
-        reset their streak to 0.
+        reset their streak to 0. Skips are counted from the bot's
+        `bot_symbol_stats.last_round_id`: the number of recent settled
+        rounds of the symbol newer than it.
         """
-        if not bot_ids:
+        streak_bots = [bot_id for bot_id in bot_ids if streaks.get(bot_id, 0) > 0]
+        if not streak_bots:
             return streaks
 
         # Get recent N settled rounds for this symbol
@@ -329,31 +361,19 @@ class RoundManager:
         if not recent_round_ids:
             return streaks
 
-        # Get bets in these rounds for each bot
-        bets_result = await db.execute(
-            select(Bet.bot_id, Bet.round_id)
-            .where(
-                Bet.bot_id.in_(bot_ids),
-                Bet.round_id.in_(recent_round_ids)
-            )
+        # Position in the recent list (0 = most recent) = consecutive skips before it
+        position = {round_id: i for i, round_id in enumerate(recent_round_ids)}
+
+        last_rounds_result = await db.execute(
+            select(BotSymbolStats.bot_id, BotSymbolStats.last_round_id)
+            .where(BotSymbolStats.symbol == symbol, BotSymbolStats.bot_id.in_(streak_bots))
         )
-        
-        # Build set of (bot_id, round_id) pairs
-        bot_round_pairs = {(row[0], row[1]) for row in bets_result.all()}
+        last_rounds = dict(last_rounds_result.all())
+
+        for bot_id in streak_bots:
+            # Not in the window (or never bet on this symbol): skipped the whole window
+            consecutive_skips = position.get(last_rounds.get(bot_id), len(recent_round_ids))
 
-        # Check each bot's participation in recent rounds (ordered from most recent)
-        for bot_id in bot_ids:
-            if streaks.get(bot_id, 0) <= 0:
-                continue  # No streak to protect
-            
-            # Count consecutive skipped rounds from most recent
-            consecutive_skips = 0
-            for round_id in recent_round_ids:
-                if (bot_id, round_id) not in bot_round_pairs:
-                    consecutive_skips += 1
-                else:
-                    break  # Found a bet, stop counting
-            
             # If skipped more than grace period, reset streak
             if consecutive_skips > settings.STREAK_SKIP_GRACE_ROUNDS:
                 logger.info(
@@ -364,72 +384,129 @@ class RoundManager:
 
         return streaks
 
-    async def _update_bot_score(
+    async def _apply_settlement(
         self,
         db: AsyncSession,
-        bot_id: str,
-        bot_name: str,
-        score_change: int,
-        result: str
-    ) -> None:
-        """Update bot's global score"""
-        # Get or create bot score
-        bot_score = await db.get(BotScore, bot_id)
-
-        if not bot_score:
-            bot_score = BotScore(
-                bot_id=bot_id,
-                bot_name=bot_name,
-                total_score=settings.INITIAL_SCORE,
-                avatar_url=f"https://api.dicebear.com/7.x/bottts/svg?seed={bot_id}"
-            )
-            db.add(bot_score)
-
-        # Update score and stats
-        bot_score.total_score += score_change
-        if result == "win":
-            bot_score.total_wins += 1
-        elif result == "lose":
-            bot_score.total_losses += 1
-        else:
-            bot_score.total_draws += 1
-
-    async def _update_bot_symbol_stats(
-        self,
-        db: AsyncSession,
-        bot_id: str,
+        round_id: int,
         symbol: str,
-        score_change: int,
-        result: str
+        settled: list[tuple[int, str, str, str, int, datetime]]
     ) -> None:
-        """Update bot's per-symbol stats"""
-        # Get or create stats
-        stats_result = await db.execute(
-            select(BotSymbolStats)
-            .where(BotSymbolStats.bot_id == bot_id, BotSymbolStats.symbol == symbol)
-        )
-        stats = stats_result.scalar_one_or_none()
-
-        if not stats:
-            stats = BotSymbolStats(
-                bot_id=bot_id,
-                symbol=symbol,
-                score=settings.INITIAL_SCORE,
-                wins=0,
-                losses=0,
-                draws=0,
+        """
+        Write settled bets and score deltas in bulk.
+
+        - bets: one UPDATE per (result, score_change) class; scores are
+          integers, so a round has a few dozen classes at most
+        - bot_scores / bot_symbol_stats: multi-row upserts adding each bot's
+          delta (a bot has one bet per round, so one row per bot)
+        - streak state is advanced in the same upserts (`streak_updates`,
+          see `advance_streaks`); `last_round_id` records this round for
+          the skip penalty
+        - bot_hourly_stats: each bet added to its (bot, symbol, hour) bucket,
+          which the 24h/7d/30d leaderboards sum
+
+        Args:
+            settled: (bet_id, bot_id, bot_name, result, score_change, hour) tuples
+        """
+        if not settled:
+            return
+
+        chunk = settings.SETTLEMENT_BATCH_SIZE
+
+        classes: dict[tuple[str, int], list[int]] = {}
+        for bet_id, _, _, bet_result, score_change, _ in settled:
+            classes.setdefault((bet_result, score_change), []).append(bet_id)
+        for (bet_result, score_change), bet_ids in classes.items():
+            for i in range(0, len(bet_ids), chunk):
+                await db.execute(
+                    update(Bet)
+                    .where(Bet.id.in_(bet_ids[i:i + chunk]))
+                    .values(result=bet_result, score_change=score_change)
+                    .execution_options(synchronize_session=False)
+                )
+
+        # New rows start from INITIAL_SCORE + delta; existing rows add the
+        # delta, recovered as inserted.score - INITIAL_SCORE
+        initial = settings.INITIAL_SCORE
+        now = datetime.utcnow()
+        score_rows = []
+        stats_rows = []
+        hourly: dict[tuple[str, datetime], dict] = {}
+        for _, bot_id, bot_name, bet_result, score_change, hour in settled:
+            wins = 1 if bet_result == "win" else 0
+            losses = 1 if bet_result == "lose" else 0
+            draws = 1 if bet_result == "draw" else 0
+            score_rows.append({
+                "bot_id": bot_id,
+                "bot_name": bot_name,
+                "avatar_url": f"https://api.dicebear.com/7.x/bottts/svg?seed={bot_id}",
+                "total_score": initial + score_change,
+                "total_wins": wins,
+                "total_losses": losses,
+                "total_draws": draws,
+                "win_streak": wins,
+                "current_streak": wins - losses,
+            })
+            stats_rows.append({
+                "bot_id": bot_id,
+                "symbol": symbol,
+                "score": initial + score_change,
+                "wins": wins,
+                "losses": losses,
+                "draws": draws,
+                "last_bet_at": now,
+                "last_round_id": round_id,
+            })
+            bucket = hourly.setdefault((bot_id, hour), {
+                "bot_id": bot_id, "symbol": symbol, "hour": hour,
+                "wins": 0, "losses": 0, "draws": 0, "score_delta": 0, "bet_count": 0,
+            })
+            bucket["wins"] += wins
+            bucket["losses"] += losses
+            bucket["draws"] += draws
+            bucket["score_delta"] += score_change
+            bucket["bet_count"] += 1
+
+        # bot_scores first: bot_symbol_stats references it
+        for i in range(0, len(score_rows), chunk):
+            stmt = mysql_insert(BotScore).values(score_rows[i:i + chunk])
+            stmt = stmt.on_duplicate_key_update(
+                total_score=BotScore.total_score + stmt.inserted.total_score - initial,
+                total_wins=BotScore.total_wins + stmt.inserted.total_wins,
+                total_losses=BotScore.total_losses + stmt.inserted.total_losses,
+                total_draws=BotScore.total_draws + stmt.inserted.total_draws,
+                **streak_updates(
+                    BotScore.win_streak, BotScore.current_streak,
+                    won=stmt.inserted.total_wins == 1, lost=stmt.inserted.total_losses == 1,
+                ),
+                updated_at=func.now(),
             )
-            db.add(stats)
-
-        # Update
-        stats.score += score_change
-        stats.last_bet_at = datetime.utcnow()
-        if result == "win":
-            stats.wins += 1
-        elif result == "lose":
-            stats.losses += 1
-        else:
-            stats.draws += 1
+            await db.execute(stmt)
+
+        for i in range(0, len(stats_rows), chunk):
+            stmt = mysql_insert(BotSymbolStats).values(stats_rows[i:i + chunk])
+            stmt = stmt.on_duplicate_key_update(
+                score=BotSymbolStats.score + stmt.inserted.score - initial,
+                wins=BotSymbolStats.wins + stmt.inserted.wins,
+                losses=BotSymbolStats.losses + stmt.inserted.losses,
+                draws=BotSymbolStats.draws + stmt.inserted.draws,
+                last_bet_at=stmt.inserted.last_bet_at,
+                last_round_id=stmt.inserted.last_round_id,
+                updated_at=func.now(),
+            )
+            await db.execute(stmt)
+
+        hourly_rows = list(hourly.values())
+        for i in range(0, len(hourly_rows), chunk):
+            stmt = mysql_insert(BotHourlyStats).values(hourly_rows[i:i + chunk])
+            stmt = stmt.on_duplicate_key_update(
+                wins=BotHourlyStats.wins + stmt.inserted.wins,
+                losses=BotHourlyStats.losses + stmt.inserted.losses,
+                draws=BotHourlyStats.draws + stmt.inserted.draws,
+                score_delta=BotHourlyStats.score_delta + stmt.inserted.score_delta,
+                bet_count=BotHourlyStats.bet_count + stmt.inserted.bet_count,
+                updated_at=func.now(),
+            )
+            await db.execute(stmt)
 
 
 # Singleton
@@ -0,0 +1,384 @@
+"""
+Round Lifecycle Scheduler
+
+Deadline-driven replacement for polling every symbol every few seconds.
+- Every enabled symbol has one asyncio timer (`loop.call_at`) set to its
+  next boundary: the active round's `end_time`, or the next aligned start
+- At the boundary the round is settled and the next one created right away;
+  symbols sharing a boundary are handled together (one config query, one
+  batched price fetch, then all symbols concurrently)
+- The database is reconciled only at startup and every
+  ROUND_RECONCILE_INTERVAL seconds (missed timers, enabled/disabled
+  symbols, stuck `settling` rounds)
+- A per-symbol lock keeps a timer and a reconcile pass from racing
+"""
+
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Set
+import asyncio
+import logging
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.database import AsyncSessionLocal
+from app.models import Symbol, Round
+from app.services.leader import scheduler_lease
+from app.services.market import market_service
+from app.services.price_feed import price_feed
+from app.services.round_manager import round_manager
+from app.services.ws_hub import ws_hub
+
+logger = logging.getLogger(__name__)
+
+
+class RoundScheduler:
+    """Per-symbol boundary timers plus a slow safety reconcile"""
+
+    def __init__(self) -> None:
+        self._timers: Dict[str, asyncio.TimerHandle] = {}
+        self._deadlines: Dict[str, datetime] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._due: Set[str] = set()
+        self._due_task: Optional[asyncio.Task] = None
+        self._tasks: Set[asyncio.Task] = set()
+        self._running = False
+        self._stats = {
+            "reconciles": 0,
+            "fired": 0,
+            "settled": 0,
+            "created": 0,
+            "errors": 0,
+            "fenced": 0,
+            "last_lateness_ms": 0.0,
+            "max_lateness_ms": 0.0,
+        }
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    async def start(self) -> None:
+        """Reconcile with the database and arm all timers."""
+        self._running = True
+        await self.reconcile()
+
+    async def stop(self) -> None:
+        """Cancel timers and wait for in-flight boundary work."""
+        self._running = False
+        for handle in self._timers.values():
+            handle.cancel()
+        self._timers.clear()
+        self._deadlines.clear()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    # ------------------------------------------------------------------
+    # Reconcile (startup + safety interval)
+    # ------------------------------------------------------------------
+
+    async def reconcile(self) -> None:
+        """
+        Bring every enabled symbol to the right state and re-arm its timer.
+
+        One query loads the open rounds of all enabled symbols; only symbols
+        whose timer is missing or disagrees with the database are processed
+        (settle overdue rounds, create missing rounds, fix stuck `settling`).
+        Timers of disabled symbols are dropped.
+        """
+        self._stats["reconciles"] += 1
+        now = datetime.utcnow()
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(select(Symbol).where(Symbol.enabled == True))
+            symbols = result.scalars().all()
+
+            # Keep the streaming feed subscribed to exactly the enabled symbols
+            await price_feed.sync_symbols(symbols)
+
+            enabled = {s.symbol for s in symbols}
+            for symbol in list(self._timers):
+                if symbol not in enabled:
+                    self._cancel(symbol)
+                    logger.info(f"Round timer removed for disabled symbol {symbol}")
+            if not symbols:
+                return
+
+            open_result = await db.execute(
+                select(Round.symbol, Round.end_time, Round.status)
+                .where(Round.symbol.in_(enabled), Round.status.in_(["active", "settling"]))
+            )
+            open_rounds: Dict[str, List[Any]] = {}
+            for row in open_result.all():
+                open_rounds.setdefault(row.symbol, []).append(row)
+
+        stale = [
+            sym for sym in symbols
+            if self._needs_attention(sym, open_rounds.get(sym.symbol, []), now)
+        ]
+        if not stale:
+            return
+
+        # Settling/opening needs prices; fetch them in one batch so
+        # create_round/settle_round hit the price cache
+        await market_service.get_prices(stale)
+        await asyncio.gather(
+            *(self._run_symbol(sym) for sym in stale),
+            return_exceptions=True,
+        )
+
+    def _needs_attention(self, sym: Symbol, open_rounds: List[Any], now: datetime) -> bool:
+        """True if the armed timer does not match the symbol's rounds in the DB."""
+        if sym.symbol in self._due:
+            return False  # Its timer just fired and is being handled
+        deadline = self._deadlines.get(sym.symbol)
+        if deadline is None:
+            return True
+        if len(open_rounds) != 1:
+            if open_rounds:
+                return True  # Several open rounds: let _process_symbol sort it out
+            # No open round: the timer must point at the next aligned start
+            duration = sym.round_duration or settings.DEFAULT_ROUND_DURATION
+            _, current_end = round_manager.get_aligned_round_times(now, duration)
+            return deadline != current_end
+        row = open_rounds[0]
+        if row.status != "active":
+            return True
+        return deadline != row.end_time
+
+    # ------------------------------------------------------------------
+    # Timers
+    # ------------------------------------------------------------------
+
+    def _arm(self, symbol: str, deadline: datetime) -> None:
+        """(Re)arm the boundary timer of a symbol. `deadline` is naive UTC."""
+        if not self._running:
+            return
+        current = self._timers.get(symbol)
+        if current is not None:
+            if self._deadlines.get(symbol) == deadline:
+                return
+            current.cancel()
+
+        loop = asyncio.get_running_loop()
+        delay = max(0.0, (deadline - datetime.utcnow()).total_seconds())
+        self._timers[symbol] = loop.call_at(loop.time() + delay, self._on_timer, symbol)
+        self._deadlines[symbol] = deadline
+        logger.debug(f"Round timer for {symbol} armed at {deadline.strftime('%H:%M:%S')} (in {delay:.1f}s)")
+
+    def _cancel(self, symbol: str) -> None:
+        handle = self._timers.pop(symbol, None)
+        if handle is not None:
+            handle.cancel()
+        self._deadlines.pop(symbol, None)
+
+    def _on_timer(self, symbol: str) -> None:
+        """Timer callback: queue the symbol; boundary-mates are handled together."""
+        self._timers.pop(symbol, None)
+        deadline = self._deadlines.pop(symbol, None)
+        if deadline is not None:
+            lateness_ms = max(0.0, (datetime.utcnow() - deadline).total_seconds() * 1000)
+            self._stats["last_lateness_ms"] = round(lateness_ms, 2)
+            self._stats["max_lateness_ms"] = max(self._stats["max_lateness_ms"], round(lateness_ms, 2))
+        self._stats["fired"] += 1
+        self._due.add(symbol)
+        if self._due_task is None or self._due_task.done():
+            self._due_task = self._spawn(self._run_due())
+
+    async def _run_due(self) -> None:
+        # Let every timer of the same boundary fire before collecting them
+        await asyncio.sleep(0)
+        while self._due:
+            symbols, self._due = self._due, set()
+            await self._run_boundary(symbols)
+
+    async def _run_boundary(self, symbols: Set[str]) -> None:
+        try:
+            async with AsyncSessionLocal() as db:
+                result = await db.execute(
+                    select(Symbol).where(Symbol.symbol.in_(symbols), Symbol.enabled == True)
+                )
+                configs = result.scalars().all()
+        except Exception as e:
+            self._stats["errors"] += 1
+            logger.error(f"Round timer failed to load symbols {sorted(symbols)}: {e}")
+            self._retry_later(symbols)
+            return
+
+        # One batched price fetch for the whole boundary
+        await market_service.get_prices(configs)
+        await asyncio.gather(
+            *(self._run_symbol(sym) for sym in configs),
+            return_exceptions=True,
+        )
+
+    def _retry_later(self, symbols: Iterable[str]) -> None:
+        retry_at = datetime.utcnow() + timedelta(seconds=settings.ROUND_RETRY_DELAY)
+        for symbol in symbols:
+            self._arm(symbol, retry_at)
+
+    def _spawn(self, coro) -> asyncio.Task:
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    # ------------------------------------------------------------------
+    # Round transitions
+    # ------------------------------------------------------------------
+
+    async def _run_symbol(self, sym: Symbol) -> None:
+        """Process one symbol under its lock and arm its next timer."""
+        lock = self._locks.setdefault(sym.symbol, asyncio.Lock())
+        async with lock:
+            try:
+                async with AsyncSessionLocal() as db:
+                    deadline = await self._process_symbol(db, sym)
+            except Exception as e:
+                self._stats["errors"] += 1
+                logger.error(f"Error processing {sym.symbol}: {e}")
+                deadline = datetime.utcnow() + timedelta(seconds=settings.ROUND_RETRY_DELAY)
+            self._arm(sym.symbol, deadline)
+
+    async def _process_symbol(self, db: AsyncSession, sym: Symbol) -> datetime:
+        """
+        Settle the symbol's round if it ended and open the round of the
+        current interval if it is missing.
+
+        Rounds are aligned to fixed intervals (:00, :10, :20 ... for 10-minute rounds).
+
+        Returns:
+            Naive UTC time of the symbol's next boundary
+        """
+        now = datetime.utcnow()
+        duration = sym.round_duration or settings.DEFAULT_ROUND_DURATION
+        current_start, current_end = round_manager.get_aligned_round_times(now, duration)
+
+        # Fencing: a paused ex-leader must not settle or create rounds
+        if not await scheduler_lease.verify(db):
+            self._stats["fenced"] += 1
+            logger.warning(f"Not the scheduler leader any more, skipping {sym.symbol}")
+            return now + timedelta(seconds=settings.ROUND_RETRY_DELAY)
+
+        # Check for active or settling rounds
+        active_result = await db.execute(
+            select(Round)
+            .where(Round.symbol == sym.symbol, Round.status.in_(["active", "settling"]))
+            .order_by(Round.start_time.desc())
+            .limit(1)
+        )
+        active_round = active_result.scalar_one_or_none()
+
+        if active_round:
+            if now < active_round.end_time:
+                # Nothing to do until this round ends
+                return active_round.end_time
+
+            logger.info(
+                f"Settling round {active_round.id} for {sym.symbol} "
+                f"(ended at {active_round.end_time.strftime('%H:%M:%S')}, status: {active_round.status})")
+            try:
+                settled_round = await round_manager.settle_round(db, active_round.id)
+                if settled_round:
+                    self._stats["settled"] += 1
+                    await broadcast_round_end(sym, settled_round)
+            except Exception as settle_err:
+                self._stats["errors"] += 1
+                logger.error(f"Settlement error for {sym.symbol}: {settle_err}")
+                # Keep the new round waiting until the old one is settled
+                return now + timedelta(seconds=settings.ROUND_RETRY_DELAY)
+
+        # Open the round of the current interval if it does not exist yet
+        existing_result = await db.execute(
+            select(Round)
+            .where(
+                Round.symbol == sym.symbol,
+                Round.start_time == current_start
+            )
+        )
+        existing_round = existing_result.scalar_one_or_none()
+
+        if existing_round:
+            logger.debug(
+                f"Round already exists for current interval {sym.symbol} "
+                f"(id={existing_round.id}, status={existing_round.status})")
+            if existing_round.status == "active":
+                return existing_round.end_time
+            return current_end
+
+        logger.info(
+            f"Creating new round for {sym.symbol} "
+            f"({current_start.strftime('%H:%M')} - {current_end.strftime('%H:%M')})")
+        new_round = await round_manager.create_round(db, sym)
+        if new_round:
+            self._stats["created"] += 1
+            await broadcast_round_start(sym, new_round)
+            return new_round.end_time
+        return current_end
+
+    def get_stats(self) -> Dict[str, Any]:
+        now = datetime.utcnow()
+        return {
+            **self._stats,
+            "timers": len(self._timers),
+            "next_boundaries": {
+                symbol: round((deadline - now).total_seconds(), 1)
+                for symbol, deadline in sorted(self._deadlines.items())
+            },
+        }
+
+
+async def broadcast_round_start(sym: Symbol, round_obj: Round) -> None:
+    """Broadcast a round_start event to the symbol's subscribers."""
+    try:
+        now = datetime.utcnow()
+        remaining = max(0, int((round_obj.end_time - now).total_seconds()))
+        betting_open = remaining >= settings.BETTING_CUTOFF_REMAINING
+
+        await ws_hub.broadcast(sym.symbol, {
+            "type": "round_start",
+            "data": {
+                "id": round_obj.id,
+                "symbol": round_obj.symbol,
+                "display_name": sym.display_name,
+                "category": sym.category,
+                "emoji": sym.emoji,
+                "start_time": round_obj.start_time.isoformat() + "Z",
+                "end_time": round_obj.end_time.isoformat() + "Z",
+                "open_price": float(round_obj.open_price),
+                "current_price": float(round_obj.open_price),
+                "price_change_percent": 0.0,
+                "status": round_obj.status,
+                "remaining_seconds": remaining,
+                "betting_open": betting_open,
+                "bet_count": 0,
+                "price_history": [],
+                "scoring": None
+            }
+        })
+        logger.info(f"Broadcast round_start for {sym.symbol} round {round_obj.id}")
+    except Exception as e:
+        logger.error(f"Failed to broadcast round_start: {e}")
+
+
+async def broadcast_round_end(sym: Symbol, settled_round: Round) -> None:
+    """Broadcast a round_end event to the symbol's subscribers."""
+    try:
+        price_change_pct = (settled_round.price_change * 100) if settled_round.price_change else 0
+        await ws_hub.broadcast(sym.symbol, {
+            "type": "round_end",
+            "symbol": sym.symbol,
+            "data": {
+                "id": settled_round.id,
+                "result": settled_round.result,
+                "close_price": float(settled_round.close_price) if settled_round.close_price else None,
+                "price_change_percent": round(price_change_pct, 4)
+            }
+        })
+        logger.info(f"Broadcast round_end for {sym.symbol} round {settled_round.id}")
+    except Exception as e:
+        logger.error(f"Failed to broadcast round_end: {e}")
+
+
+# Singleton
+round_scheduler = RoundScheduler()
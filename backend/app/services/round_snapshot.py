@@ -0,0 +1,327 @@
+"""
+Round Snapshot Cache
+
+Per-symbol, precomputed `round_start` frame for WebSocket connects and
+symbol switches, so a connect storm costs one memory read plus one send
+instead of two queries, a price fetch and a history load per socket.
+- Kept current from the events this worker already delivers (round_start,
+  price_tick, round_end, bets_update), via a ConnectionHub observer, so it
+  is fresh on every worker, leader or not
+- Each change bumps a global version; the encoded frame is rebuilt at most
+  once per version and wall-clock second (remaining_seconds, scoring) and
+  shared by every reader in between
+- A miss (cold start, new worker) loads from MySQL once per symbol; the
+  concurrent connects of a storm wait on that single load
+- A symbol with no active round is remembered for ROUND_SNAPSHOT_EMPTY_TTL
+  seconds, so a storm on an idle symbol does not hit MySQL either
+"""
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Optional
+import itertools
+import logging
+import time
+
+from app.core.config import settings
+from app.db.database import AsyncSessionLocal
+from app.services.active_rounds import active_rounds
+from app.services.market import market_service
+from app.services.price_buffer import price_buffers
+from app.services.price_history import price_history_service
+from app.services.scoring import scoring_service
+from app.services.single_flight import SingleFlight
+from app.services.symbol_config import symbol_configs
+from app.services.ws_backplane import ALL_SYMBOLS
+from app.services.ws_hub import ws_hub, encode_message, decode_message, GLOBAL_TOPICS
+
+logger = logging.getLogger(__name__)
+
+# Monotonic across symbols, so a (symbol, version) pair is never reused
+_versions = itertools.count(1)
+
+
+@dataclass
+class RoundSnapshot:
+    """Everything needed to render one symbol's round_start frame"""
+
+    round_id: int
+    symbol: str
+    display_name: str
+    category: str
+    emoji: str
+    start_time: datetime
+    end_time: datetime
+    open_price: float
+    current_price: float
+    status: str
+    bet_count: int
+    version: int = 0
+    # Arena stream position this snapshot includes (see ConnectionHub.resume)
+    epoch: Optional[str] = None
+    seq: int = 0
+    # Cached encoding: valid for (frame_version, frame_second)
+    frame: Optional[str] = None
+    frame_version: int = -1
+    frame_second: int = -1
+
+    @property
+    def duration_seconds(self) -> int:
+        return int((self.end_time - self.start_time).total_seconds())
+
+    def touch(self) -> None:
+        self.version = next(_versions)
+
+    def to_data(self, now: datetime) -> Dict[str, Any]:
+        """round_start payload, identical in shape to the scheduler's broadcast."""
+        remaining = max(0, int((self.end_time - now).total_seconds()))
+        price_change = ((self.current_price - self.open_price) /
+                        self.open_price) * 100 if self.open_price else 0
+        betting_open = remaining >= settings.BETTING_CUTOFF_REMAINING
+
+        scoring = None
+        if betting_open:
+            time_progress = scoring_service.calculate_time_progress(
+                now, self.start_time, settings.BETTING_WINDOW
+            )
+            decay = scoring_service.calculate_decay(time_progress)
+            win_score, lose_score = scoring_service.estimate_scores(time_progress, win_streak=0)
+            scoring = {
+                "time_progress": round(time_progress, 3),
+                "time_progress_percent": int(time_progress * 100),
+                "estimated_win_score": win_score,
+                "estimated_lose_score": lose_score,
+                "early_bonus_remaining": round(decay, 3)
+            }
+
+        buf = price_buffers.get(self.round_id)
+        return {
+            "id": self.round_id,
+            "symbol": self.symbol,
+            "display_name": self.display_name,
+            "category": self.category,
+            "emoji": self.emoji,
+            "start_time": self.start_time.isoformat() + "Z",
+            "end_time": self.end_time.isoformat() + "Z",
+            "open_price": self.open_price,
+            "current_price": self.current_price,
+            "price_change_percent": round(price_change, 4),
+            "status": self.status,
+            "remaining_seconds": remaining,
+            "betting_open": betting_open,
+            "bet_count": self.bet_count,
+            "price_history": buf.to_list() if buf is not None else [],
+            "scoring": scoring,
+            "snapshot_version": self.version,
+        }
+
+
+def _parse_time(value: str) -> datetime:
+    """Parse the "...Z" ISO timestamps of round_start back to naive UTC."""
+    return datetime.fromisoformat(value.rstrip("Z"))
+
+
+class RoundSnapshotCache:
+    """Current round snapshot per symbol, fed by hub events"""
+
+    def __init__(self) -> None:
+        self._snapshots: Dict[str, RoundSnapshot] = {}
+        # symbol -> monotonic time until which "no active round" is trusted
+        self._empty_until: Dict[str, float] = {}
+        self._loading: SingleFlight[str, Optional[RoundSnapshot]] = SingleFlight()
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "db_loads": 0,
+            "frames_built": 0,
+            "events": 0,
+        }
+
+    # ------------------------------------------------------------------
+    # Event feed
+    # ------------------------------------------------------------------
+
+    def observe(self, channel: str, message: Dict[str, Any]) -> None:
+        """
+        ConnectionHub observer: apply round events to the snapshots.
+
+        Only the bare-symbol arena channels and `bets:<symbol>` matter here;
+        everything else is skipped.
+        """
+        if channel.startswith("bets:"):
+            symbol = channel[5:]
+            if symbol not in self._snapshots:
+                return
+        elif ":" in channel or channel == ALL_SYMBOLS or channel in GLOBAL_TOPICS:
+            return
+        else:
+            symbol = channel
+
+        kind = message.get("type")
+        data = message.get("data") or {}
+        self._stats["events"] += 1
+
+        if kind == "round_start":
+            self._set_from_event(symbol, data)
+
+        snap = self._snapshots.get(symbol)
+        if snap is not None and "seq" in message:
+            snap.epoch, snap.seq = message["epoch"], message["seq"]
+        if kind == "price_tick":
+            if snap is None or data.get("round_id", snap.round_id) != snap.round_id:
+                return
+            snap.current_price = float(data["price"])
+            # Followers don't run the sampler: keep their price history fed too
+            price_buffers.append(snap.round_id, int(data["timestamp"]), snap.current_price)
+            snap.touch()
+        elif kind == "round_end":
+            if snap is not None and snap.round_id == data.get("id"):
+                del self._snapshots[symbol]
+                price_buffers.discard(snap.round_id)
+            self._empty_until.pop(symbol, None)
+        elif kind == "bets_update":
+            if snap is not None and snap.round_id == data.get("round_id"):
+                snap.bet_count = int(data.get("bet_count", snap.bet_count))
+                snap.touch()
+
+    def _set_from_event(self, symbol: str, data: Dict[str, Any]) -> None:
+        snap = RoundSnapshot(
+            round_id=data["id"],
+            symbol=symbol,
+            display_name=data.get("display_name"),
+            category=data.get("category"),
+            emoji=data.get("emoji"),
+            start_time=_parse_time(data["start_time"]),
+            end_time=_parse_time(data["end_time"]),
+            open_price=float(data["open_price"]),
+            current_price=float(data["current_price"]),
+            status=data.get("status", "active"),
+            bet_count=int(data.get("bet_count") or 0),
+        )
+        old = self._snapshots.get(symbol)
+        if old is not None and old.round_id != snap.round_id:
+            price_buffers.discard(old.round_id)
+        price_buffers.open(snap.round_id, snap.duration_seconds)
+        snap.touch()
+        self._snapshots[symbol] = snap
+        self._empty_until.pop(symbol, None)
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    async def get_frame(self, symbol: str) -> Optional[str]:
+        """
+        Encoded round_start frame for a symbol, or None if it has no active round.
+        """
+        now = datetime.utcnow()
+        snap = self._snapshots.get(symbol)
+        if snap is not None and now >= snap.end_time:
+            # round_end not seen (yet); past the boundary the cache is no authority
+            snap = None
+        if snap is None:
+            if time.monotonic() < self._empty_until.get(symbol, 0.0):
+                self._stats["hits"] += 1
+                return None
+            self._stats["misses"] += 1
+            snap = await self._load(symbol)
+            if snap is None:
+                return None
+        else:
+            self._stats["hits"] += 1
+
+        second = int(now.timestamp())
+        if snap.frame is None or snap.frame_version != snap.version or snap.frame_second != second:
+            message: Dict[str, Any] = {"type": "round_start"}
+            if snap.epoch is not None:
+                message["seq"], message["epoch"] = snap.seq, snap.epoch
+            message["data"] = snap.to_data(now)
+            snap.frame = encode_message(message)
+            snap.frame_version = snap.version
+            snap.frame_second = second
+            self._stats["frames_built"] += 1
+        return snap.frame
+
+    async def get_data(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """round_start payload as a dict (for callers that don't send the frame)."""
+        frame = await self.get_frame(symbol)
+        return decode_message(frame)["data"] if frame is not None else None
+
+    async def _load(self, symbol: str) -> Optional[RoundSnapshot]:
+        """Single-flight DB load: concurrent misses on a symbol share one query."""
+        return await self._loading.run(symbol, lambda: self._load_from_db(symbol))
+
+    async def _load_from_db(self, symbol: str) -> Optional[RoundSnapshot]:
+        self._stats["db_loads"] += 1
+        async with AsyncSessionLocal() as db:
+            sym = await symbol_configs.get(symbol)
+            current_round = None
+            if sym and sym.enabled:
+                current_round = await active_rounds.get(symbol)
+
+            if current_round is None:
+                self._empty_until[symbol] = time.monotonic() + settings.ROUND_SNAPSHOT_EMPTY_TTL
+                return None
+
+            try:
+                current_price = await market_service.get_price_by_source(
+                    sym.symbol, sym.api_source, sym.product_type
+                )
+            except Exception:
+                current_price = current_round.open_price
+
+            # Warms the ring buffer if it is missing or thin (e.g. on a follower)
+            duration = int((current_round.end_time - current_round.start_time).total_seconds())
+            if price_buffers.get(current_round.id) is None:
+                try:
+                    history = await price_history_service.ensure_round_history(
+                        db=db,
+                        round=current_round,
+                        symbol_product_type=sym.product_type,
+                        min_coverage=0.5
+                    )
+                    price_buffers.load(current_round.id, history, duration)
+                except Exception as e:
+                    logger.warning(f"Failed to get price history: {e}")
+
+        snap = RoundSnapshot(
+            round_id=current_round.id,
+            symbol=current_round.symbol,
+            display_name=sym.display_name,
+            category=sym.category,
+            emoji=sym.emoji,
+            start_time=current_round.start_time,
+            end_time=current_round.end_time,
+            open_price=float(current_round.open_price),
+            current_price=float(current_price),
+            status=current_round.status,
+            bet_count=current_round.bet_count,
+        )
+        snap.epoch, snap.seq = ws_hub.get_position(symbol)
+        snap.touch()
+        # An event may have installed a newer round while we were querying
+        existing = self._snapshots.get(symbol)
+        if existing is not None and existing.round_id >= snap.round_id:
+            return existing
+        self._snapshots[symbol] = snap
+        return snap
+
+    def peek(self, symbol: str) -> Optional[RoundSnapshot]:
+        """Cached snapshot of a symbol, without loading on a miss."""
+        return self._snapshots.get(symbol)
+
+    def invalidate(self, symbol: str) -> None:
+        """Forget a symbol's snapshot (e.g. after it is disabled)."""
+        self._snapshots.pop(symbol, None)
+        self._empty_until.pop(symbol, None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "symbols": len(self._snapshots),
+            "versions": {s: snap.version for s, snap in sorted(self._snapshots.items())},
+            **self._stats,
+        }
+
+
+# Singleton
+round_snapshots = RoundSnapshotCache()
@@ -0,0 +1,46 @@
+"""
+Single-flight
+
+Concurrent callers asking for the same key share one run of the work.
+The work runs as its own task and every caller (the first one included)
+awaits it through `asyncio.shield`, so:
+- A cancelled caller (client gone, timeout) leaves the work running for
+  the others, and nobody else sees its CancelledError
+- The task always finishes with a result, an exception or a cancellation
+  (shutdown), and every waiter gets exactly that; none is left hanging
+"""
+
+from functools import partial
+from typing import Awaitable, Callable, Dict, Generic, Hashable, TypeVar
+import asyncio
+
+K = TypeVar("K", bound=Hashable)
+T = TypeVar("T")
+
+
+class SingleFlight(Generic[K, T]):
+    """In-flight work per key"""
+
+    def __init__(self) -> None:
+        self._tasks: Dict[K, asyncio.Task] = {}
+
+    def __contains__(self, key: K) -> bool:
+        return key in self._tasks
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+    async def run(self, key: K, work: Callable[[], Awaitable[T]]) -> T:
+        """Result of `work()`, shared with every concurrent call for `key`."""
+        task = self._tasks.get(key)
+        if task is None:
+            task = asyncio.ensure_future(work())
+            self._tasks[key] = task
+            task.add_done_callback(partial(self._done, key))
+        return await asyncio.shield(task)
+
+    def _done(self, key: K, task: asyncio.Task) -> None:
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+        if not task.cancelled():
+            task.exception()  # Mark retrieved: only the waiters (if any) need to see it
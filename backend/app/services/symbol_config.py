@@ -0,0 +1,231 @@
+"""
+Symbol Config Registry
+
+Immutable, in-memory copy of the `symbols` table. The rows change a few
+times a month, yet betting, history, leaderboard, market, stats and the WS
+snapshot path each looked a symbol up per request (some once per row).
+- Loaded at startup; every read after that is a dict lookup
+- Each worker polls `SELECT MAX(updated_at), COUNT(*) FROM symbols` every
+  SYMBOL_CONFIG_POLL_INTERVAL seconds and reloads when it changes, so edits
+  made straight in MySQL are picked up without a restart
+- `POST /symbols/reload` reloads at once and publishes `symbols_updated` on
+  the hub "symbols" topic; every worker reloads on that event, and clients
+  subscribed to the topic learn the list changed
+- A reload swaps the whole map at once: readers see either the old or the
+  new configuration, never a mix
+"""
+
+from dataclasses import dataclass
+from datetime import datetime
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Optional, Tuple
+import asyncio
+import logging
+import time
+
+from sqlalchemy import select, func
+
+from app.core.config import settings
+from app.db.database import AsyncSessionLocal
+from app.models import Symbol
+
+logger = logging.getLogger(__name__)
+
+# Hub topic carrying `symbols_updated` (see ws_hub.GLOBAL_TOPICS)
+SYMBOLS_TOPIC = "symbols"
+
+
+@dataclass(frozen=True)
+class SymbolConfig:
+    """One `symbols` row; attribute-compatible with the ORM model"""
+
+    symbol: str
+    display_name: str
+    category: str
+    api_source: str
+    product_type: str
+    round_duration: int
+    draw_threshold: float
+    enabled: bool
+    emoji: str
+    trading_hours: Optional[Mapping[str, Any]]
+    created_at: Optional[datetime]
+    updated_at: Optional[datetime]
+
+    @classmethod
+    def from_model(cls, sym: Symbol) -> "SymbolConfig":
+        return cls(
+            symbol=sym.symbol,
+            display_name=sym.display_name,
+            category=sym.category,
+            api_source=sym.api_source,
+            product_type=sym.product_type,
+            round_duration=sym.round_duration or settings.DEFAULT_ROUND_DURATION,
+            draw_threshold=sym.draw_threshold,
+            enabled=bool(sym.enabled),
+            emoji=sym.emoji,
+            trading_hours=MappingProxyType(dict(sym.trading_hours)) if sym.trading_hours else None,
+            created_at=sym.created_at,
+            updated_at=sym.updated_at,
+        )
+
+
+class SymbolConfigRegistry:
+    """All symbol configurations, reloaded on change"""
+
+    def __init__(self) -> None:
+        self._by_symbol: Mapping[str, SymbolConfig] = MappingProxyType({})
+        # Ordered like the old listing query: enabled first, then by symbol
+        self._ordered: Tuple[SymbolConfig, ...] = ()
+        # (MAX(updated_at), COUNT(*)) the current map was loaded at
+        self._version: Optional[Tuple[Optional[datetime], int]] = None
+        self._loaded_at: Optional[float] = None
+        self._load_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        # Reload triggered by `symbols_updated`; a burst of events shares it
+        self._reload_task: Optional[asyncio.Task] = None
+        self._reload_again = False
+        self._stats = {
+            "loads": 0,
+            "polls": 0,
+            "notifications": 0,
+        }
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    async def get(self, symbol: str) -> Optional[SymbolConfig]:
+        """Configuration of one symbol, or None if it does not exist."""
+        if self._loaded_at is None:
+            await self._ensure_loaded()
+        return self._by_symbol.get(symbol)
+
+    async def all(self) -> Tuple[SymbolConfig, ...]:
+        """Every symbol, enabled first, then by symbol code."""
+        if self._loaded_at is None:
+            await self._ensure_loaded()
+        return self._ordered
+
+    async def enabled(self) -> Tuple[SymbolConfig, ...]:
+        return tuple(s for s in await self.all() if s.enabled)
+
+    def peek(self, symbol: str) -> Optional[SymbolConfig]:
+        """Configuration of one symbol, without loading if empty."""
+        return self._by_symbol.get(symbol)
+
+    @property
+    def version(self) -> Optional[str]:
+        """MAX(updated_at) of the loaded table, as an ISO string."""
+        if self._version is None or self._version[0] is None:
+            return None
+        return self._version[0].isoformat()
+
+    # ------------------------------------------------------------------
+    # Loading
+    # ------------------------------------------------------------------
+
+    async def reload(self) -> None:
+        """Re-read the whole table and swap it in."""
+        async with self._load_lock:
+            await self._load_locked()
+
+    async def _ensure_loaded(self) -> None:
+        # Concurrent first readers (load failed at startup) share one load
+        async with self._load_lock:
+            if self._loaded_at is None:
+                await self._load_locked()
+
+    async def _load_locked(self) -> None:
+        async with AsyncSessionLocal() as db:
+            rows = (await db.execute(
+                select(Symbol).order_by(Symbol.enabled.desc(), Symbol.symbol)
+            )).scalars().all()
+        configs = tuple(SymbolConfig.from_model(row) for row in rows)
+        self._by_symbol = MappingProxyType({c.symbol: c for c in configs})
+        self._ordered = configs
+        self._version = (
+            max((c.updated_at for c in configs if c.updated_at), default=None),
+            len(configs),
+        )
+        self._loaded_at = time.monotonic()
+        self._stats["loads"] += 1
+        logger.info(f"Loaded {len(configs)} symbol configs")
+
+    async def poll(self) -> bool:
+        """Reload if the table changed since the last load. Returns True if reloaded."""
+        self._stats["polls"] += 1
+        async with AsyncSessionLocal() as db:
+            row = (await db.execute(
+                select(func.max(Symbol.updated_at), func.count(Symbol.symbol))
+            )).one()
+        if (row[0], row[1]) == self._version:
+            return False
+        await self.reload()
+        return True
+
+    def observe(self, channel: str, message: Dict[str, Any]) -> None:
+        """ConnectionHub observer: reload on `symbols_updated` from any worker."""
+        if channel != SYMBOLS_TOPIC or message.get("type") != "symbols_updated":
+            return
+        data = message.get("data") or {}
+        if (data.get("version"), data.get("symbols")) == (self.version, len(self._ordered)):
+            return  # Already current (e.g. the worker that published it)
+        self._stats["notifications"] += 1
+        if self._reload_task is not None:
+            # One more pass after the running one, which may predate this change
+            self._reload_again = True
+            return
+        self._reload_task = asyncio.get_running_loop().create_task(
+            self._reload_quietly(), name="symbol_config_reload"
+        )
+
+    async def _reload_quietly(self) -> None:
+        try:
+            while True:
+                self._reload_again = False
+                try:
+                    await self.reload()
+                except Exception as e:
+                    logger.warning(f"Symbol config reload failed, next poll retries: {e}")
+                if not self._reload_again:
+                    break
+        finally:
+            self._reload_task = None
+
+    async def start(self) -> None:
+        """Start the change poll."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="symbol_config_poll")
+
+    async def stop(self) -> None:
+        for task in (self._task, self._reload_task):
+            if task is not None:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(settings.SYMBOL_CONFIG_POLL_INTERVAL)
+            try:
+                await self.poll()
+            except Exception as e:
+                logger.warning(f"Symbol config poll failed: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "symbols": len(self._ordered),
+            "enabled": sum(1 for s in self._ordered if s.enabled),
+            "version": self.version,
+            "age_seconds": round(time.monotonic() - self._loaded_at, 1) if self._loaded_at else None,
+            "running": self._task is not None,
+            **self._stats,
+        }
+
+
+# Singleton
+symbol_configs = SymbolConfigRegistry()
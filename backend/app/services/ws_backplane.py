@@ -0,0 +1,173 @@
+"""
+WebSocket Backplane - Cross-process fan-out for ConnectionHub events.
+
+The scheduler publishes each event once; every API worker receives it and
+fans it out to its own local sockets.
+- InMemoryBackplane: single process, delivers straight to the local hub
+- RedisBackplane: Redis pub/sub, one pattern subscription per worker
+
+Wire format on the broker: channel `<WS_BACKPLANE_CHANNEL>:<symbol>`
+(`*` for broadcast_all), payload = "1"/"0" droppable flag + JSON frame.
+"""
+
+from typing import Any, Awaitable, Callable, Dict, Optional
+import asyncio
+import logging
+
+from app.core.config import settings
+
+try:
+    import redis.asyncio as aioredis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Symbol used for events that go to every subscriber (broadcast_all)
+ALL_SYMBOLS = "*"
+
+# deliver(symbol, frame, droppable) -> local connections queued
+DeliverFn = Callable[[str, str, bool], Awaitable[int]]
+
+
+class Backplane:
+    """Interface: publish an encoded frame to every worker's hub."""
+
+    name = "base"
+
+    async def start(self, deliver: DeliverFn) -> None:
+        raise NotImplementedError
+
+    async def stop(self) -> None:
+        raise NotImplementedError
+
+    async def publish(self, symbol: str, frame: str, droppable: bool) -> int:
+        """Returns the number of receivers (local connections or subscribed workers)."""
+        raise NotImplementedError
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"backend": self.name}
+
+
+class InMemoryBackplane(Backplane):
+    """Single-process backplane: publish is a direct local delivery."""
+
+    name = "memory"
+
+    def __init__(self) -> None:
+        self._deliver: Optional[DeliverFn] = None
+
+    async def start(self, deliver: DeliverFn) -> None:
+        self._deliver = deliver
+
+    async def stop(self) -> None:
+        pass
+
+    async def publish(self, symbol: str, frame: str, droppable: bool) -> int:
+        if self._deliver is None:
+            return 0
+        return await self._deliver(symbol, frame, droppable)
+
+
+class RedisBackplane(Backplane):
+    """
+    Redis pub/sub backplane.
+
+    Each worker pattern-subscribes to `<channel>:*`, so every published
+    event reaches every worker exactly once. Events published while a
+    worker is reconnecting are lost for that worker (pub/sub keeps no
+    history); the listener re-subscribes with backoff.
+    """
+
+    name = "redis"
+
+    def __init__(self, url: str, channel: str) -> None:
+        self.url = url
+        self.channel = channel
+        self._redis: Optional[Any] = None
+        self._deliver: Optional[DeliverFn] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stats = {
+            "published": 0,
+            "publish_errors": 0,
+            "received": 0,
+            "reconnects": 0,
+        }
+
+    async def start(self, deliver: DeliverFn) -> None:
+        if not REDIS_AVAILABLE:
+            raise RuntimeError("WS_BACKPLANE=redis requires the `redis` package")
+        self._deliver = deliver
+        self._redis = aioredis.from_url(self.url, decode_responses=True)
+        ready = asyncio.Event()
+        self._task = asyncio.create_task(self._listen(ready), name="ws_backplane:redis")
+        # Subscribed before start() returns, so no early event is missed
+        await asyncio.wait_for(ready.wait(), timeout=10.0)
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._redis is not None:
+            await self._redis.aclose()
+            self._redis = None
+
+    async def publish(self, symbol: str, frame: str, droppable: bool) -> int:
+        try:
+            receivers = await self._redis.publish(
+                f"{self.channel}:{symbol}", ("1" if droppable else "0") + frame
+            )
+            self._stats["published"] += 1
+            return receivers
+        except Exception as e:
+            self._stats["publish_errors"] += 1
+            logger.error(f"Backplane publish to {symbol} failed: {e}")
+            return 0
+
+    async def _listen(self, ready: asyncio.Event) -> None:
+        """Pattern-subscribe and hand every message to the local hub; reconnect on errors."""
+        prefix_len = len(self.channel) + 1
+        backoff = 0.5
+        while True:
+            pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.psubscribe(f"{self.channel}:*")
+                ready.set()
+                backoff = 0.5
+                async for message in pubsub.listen():
+                    if message["type"] != "pmessage":
+                        continue
+                    self._stats["received"] += 1
+                    data = message["data"]
+                    await self._deliver(message["channel"][prefix_len:], data[1:], data[0] == "1")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._stats["reconnects"] += 1
+                logger.warning(f"Backplane subscription lost ({e}), retrying in {backoff:.1f}s")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 10.0)
+            finally:
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "backend": self.name,
+            "connected": self._task is not None and not self._task.done(),
+            **self._stats,
+        }
+
+
+def create_backplane() -> Backplane:
+    """Backplane selected by WS_BACKPLANE ("memory" or "redis")."""
+    if settings.WS_BACKPLANE == "redis":
+        return RedisBackplane(settings.WS_BACKPLANE_URL, settings.WS_BACKPLANE_CHANNEL)
+    return InMemoryBackplane()
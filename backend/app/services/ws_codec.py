@@ -0,0 +1,122 @@
+"""
+WebSocket Compact Encoding (`/ws/arena?encoding=compact`)
+
+Opt-in, smaller wire format for the arena stream; JSON stays the default
+and every other message is unchanged JSON text.
+- price_tick: one binary frame with a fixed little-endian layout (below),
+  timestamp and price as deltas against the round's start and open price
+- round_start: JSON text whose `price_history` is columnar and delta-encoded
+  the same way: {"t": [...], "p": [...]}
+
+Binary price_tick (`TICK_HEADER` then symbol, then `TICK_BODY`):
+    u8  frame type (1 = price_tick)
+    u8  symbol length, then the ASCII symbol
+    u32 epoch (the 8 hex digits of the JSON `epoch`)
+    u32 seq
+    u32 round_id
+    i32 t   ms since the round's start_time
+    i32 p   (price / open_price - 1) * PRICE_SCALE, rounded
+    u16 remaining_seconds
+31 bytes for BTCUSDT against ~170 for the JSON frame.
+
+Columnar price_history: t[0] is ms since start_time, t[i] ms since point
+i-1; p[i] as in the binary tick. A client rebuilds
+price = open_price * (1 + p / PRICE_SCALE), change_percent = p / PRICE_SCALE * 100.
+
+Frames are transcoded once per event (per encoding) on each worker, never
+per connection. A tick whose round this worker does not know yet (e.g.
+right after a restart) is sent as JSON; clients must accept both.
+"""
+
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional, Tuple, Union
+import struct
+
+from app.services.round_snapshot import round_snapshots
+from app.services.ws_hub import encode_message, decode_message, is_sequenced
+
+# Relative price unit: 1e-8 of the open price (int32 covers +-21x)
+PRICE_SCALE = 100_000_000
+
+FRAME_PRICE_TICK = 1
+TICK_HEADER = struct.Struct("<BB")
+TICK_BODY = struct.Struct("<IIIiiH")
+
+Frame = Union[str, bytes]
+
+
+def _epoch_ms(dt: datetime) -> int:
+    return int(dt.replace(tzinfo=timezone.utc).timestamp() * 1000)
+
+
+def _price_delta(price: float, open_price: float) -> int:
+    return round((price / open_price - 1) * PRICE_SCALE) if open_price else 0
+
+
+class CompactCodec:
+    """Transcodes arena JSON frames into the compact encoding"""
+
+    name = "compact"
+
+    def __init__(self) -> None:
+        # channel -> (source frame, transcoded), so snapshot and replay frames
+        # shared by many connections are transcoded once
+        self._last: Dict[str, Tuple[str, Optional[Frame]]] = {}
+        self._stats = {"transcoded": 0, "fallbacks": 0}
+
+    def transcode(self, channel: str, frame: str) -> Optional[Frame]:
+        """
+        Compact form of a frame published on `channel`, or None to send it as is.
+        """
+        if not is_sequenced(channel):
+            return None
+        cached = self._last.get(channel)
+        if cached is not None and cached[0] is frame:
+            return cached[1]
+
+        message = decode_message(frame)
+        kind = message.get("type")
+        if kind == "price_tick":
+            result = self._encode_tick(channel, message)
+        elif kind == "round_start":
+            result = self._encode_round_start(message)
+        else:
+            result = None
+        if result is not None:
+            self._stats["transcoded"] += 1
+        self._last[channel] = (frame, result)
+        return result
+
+    def _encode_tick(self, symbol: str, message: Dict[str, Any]) -> Optional[bytes]:
+        data = message["data"]
+        snap = round_snapshots.peek(symbol)
+        if snap is None or snap.round_id != data.get("round_id") or "seq" not in message:
+            self._stats["fallbacks"] += 1
+            return None
+        name = symbol.encode("ascii")
+        return TICK_HEADER.pack(FRAME_PRICE_TICK, len(name)) + name + TICK_BODY.pack(
+            int(message["epoch"], 16),
+            message["seq"],
+            snap.round_id,
+            data["timestamp"] - _epoch_ms(snap.start_time),
+            _price_delta(data["price"], snap.open_price),
+            min(data["remaining_seconds"], 0xFFFF),
+        )
+
+    def _encode_round_start(self, message: Dict[str, Any]) -> str:
+        data = message["data"]
+        open_price = data["open_price"]
+        prev = _epoch_ms(datetime.fromisoformat(data["start_time"].rstrip("Z")))
+        t, p = [], []
+        for point in data.get("price_history") or ():
+            t.append(point["timestamp"] - prev)
+            p.append(_price_delta(point["price"], open_price))
+            prev = point["timestamp"]
+        return encode_message({**message, "data": {**data, "price_history": {"t": t, "p": p}}})
+
+    def get_stats(self) -> Dict[str, Any]:
+        return dict(self._stats)
+
+
+# Singleton
+compact_codec = CompactCodec()
@@ -6,161 +6,834 @@ Design:
 - Server broadcasts events organized by round lifecycle (round_start, price_tick, round_end)
 - Supports switching symbols without reconnecting
 - Auto-cleans dead connections
+- Each event is JSON-encoded once and the same text frame is sent to every subscriber
+- Every connection has a bounded outbound queue drained by its own writer task,
+  so a broadcast only enqueues and never waits on a client's network
+- A full queue drops stale droppable frames (price_tick) first; lifecycle events
+  are never dropped, and a client that stays full is disconnected
+- Events are published through a backplane (see ws_backplane) so that with
+  several workers each one fans them out to its own sockets
+- Besides the arena (round lifecycle) a connection can subscribe to several
+  symbols and topics (bets, messages, danmaku, reactions, thoughts); each
+  (topic, symbol) pair is one channel, see `channel_name`
+- Arena events carry a per-symbol `seq` (stamped by the publisher, with its
+  `epoch`); every worker keeps the last WS_REPLAY_BUFFER_SIZE of them so a
+  reconnecting client can `resume` instead of reloading the full round
+- A connection may negotiate another encoding (see ws_codec); frames are
+  transcoded once per event and encoding, JSON connections are untouched
+- A connection may ask for ticks (droppable frames) every N seconds on an
+  arena channel; subscribers are grouped by cadence, so a tick costs one
+  check per distinct cadence plus the fan-out to the groups that are due
+- The broadcast path takes no lock: it reads immutable per-channel views of
+  the subscribers (see SubscriberRegistry); closed connections are swept
+  out of the registry in batches, off the broadcast path
 """
 
 from fastapi import WebSocket
-from typing import Dict, Set, Any
+from typing import Callable, Deque, Dict, Iterable, Optional, Set, Any, Tuple, Union
+from collections import deque
 import asyncio
+import json
 import logging
+import time
+import uuid
+
+from app.core.config import settings
+from app.services.ws_backplane import ALL_SYMBOLS, Backplane, InMemoryBackplane, create_backplane
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
 logger = logging.getLogger(__name__)
 
+# WebSocket close code for evicted slow consumers ("try again later")
+SLOW_CONSUMER_CLOSE_CODE = 1013
+
+# Subscribable topics; "arena" is the round lifecycle stream of a symbol
+TOPICS = ("arena", "bets", "messages", "danmaku", "reactions", "thoughts", "symbols")
+# Topics not scoped to a symbol
+GLOBAL_TOPICS = frozenset({"thoughts", "symbols"})
+
+# Wire frame: JSON text, or bytes for a binary encoding
+Frame = Union[str, bytes]
+
+
+def channel_name(topic: str, symbol: Optional[str] = None) -> str:
+    """
+    Hub channel of a (topic, symbol) pair.
+
+    The arena channel is the bare symbol (what `subscribe`/`broadcast` have
+    always used); other topics are "<topic>:<symbol>", global ones just "<topic>".
+    """
+    if topic == "arena":
+        return symbol
+    if topic in GLOBAL_TOPICS:
+        return topic
+    return f"{topic}:{symbol}"
+
+
+def is_sequenced(channel: str) -> bool:
+    """Whether a channel's events carry `seq` (the arena channels)."""
+    return ":" not in channel and channel != ALL_SYMBOLS and channel not in GLOBAL_TOPICS
+
+
+def encode_message(message: Dict[str, Any]) -> str:
+    """
+    Encode a message into a WebSocket text frame.
+
+    Uses orjson when installed; otherwise the stdlib encoder with the same
+    compact output Starlette's `send_json` produces.
+    """
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(message).decode()
+    return json.dumps(message, separators=(",", ":"), ensure_ascii=False)
+
+
+def decode_message(frame: str) -> Dict[str, Any]:
+    """Inverse of `encode_message`."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(frame)
+    return json.loads(frame)
+
+
+class ClientConnection:
+    """
+    One WebSocket plus its bounded outbound queue and writer task.
+
+    Queue entries are (frame, droppable). `offer` never awaits: it applies the
+    overflow policy and wakes the writer, which sends frames in order.
+    `encoding` is the negotiated wire format ("json" unless set by the hub).
+    """
+
+    def __init__(
+        self,
+        ws: WebSocket,
+        max_queue: int,
+        slow_timeout: float,
+        on_close: Callable[["ClientConnection", str], None]
+    ) -> None:
+        self.ws = ws
+        self.max_queue = max_queue
+        self.slow_timeout = slow_timeout
+        self.queue: Deque[Tuple[Frame, bool]] = deque()
+        self.encoding = "json"
+        # Arena symbol (the one `switch` moves) and every channel it is in
+        self.arena: Optional[str] = None
+        self.channels: Set[str] = set()
+        # arena channel -> tick interval in seconds (absent = every tick)
+        self.tick_intervals: Dict[str, int] = {}
+        self.dropped = 0
+        self.sent = 0
+        self.closed = False
+        self._full_since: Optional[float] = None
+        self._wakeup = asyncio.Event()
+        self._on_close = on_close
+        self._writer = asyncio.create_task(self._run())
+
+    def offer(self, frame: Frame, droppable: bool) -> bool:
+        """
+        Enqueue a frame. Returns False if it was dropped or the client evicted.
+
+        Overflow policy: replace the oldest droppable frame; if there is none,
+        drop the new frame when it is droppable, otherwise evict. A queue that
+        has been full for `slow_timeout` seconds is evicted as well.
+        """
+        if self.closed:
+            return False
+
+        if len(self.queue) >= self.max_queue:
+            now = time.monotonic()
+            if self._full_since is None:
+                self._full_since = now
+            elif now - self._full_since >= self.slow_timeout:
+                self.close("queue full for too long")
+                return False
+
+            for i, (_, queued_droppable) in enumerate(self.queue):
+                if queued_droppable:
+                    del self.queue[i]
+                    self.dropped += 1
+                    break
+            else:
+                if droppable:
+                    self.dropped += 1
+                    return False
+                self.close("queue full of undroppable frames")
+                return False
+
+        self.queue.append((frame, droppable))
+        self._wakeup.set()
+        return True
+
+    def close(self, reason: str) -> None:
+        """Stop the writer and close the socket in the background (idempotent)."""
+        if self.closed:
+            return
+        self.closed = True
+        self.queue.clear()
+        if self._writer is not asyncio.current_task():
+            self._writer.cancel()
+        self._on_close(self, reason)
+        if reason != "unsubscribed":
+            asyncio.create_task(self._close_socket())
+
+    async def _close_socket(self) -> None:
+        try:
+            await asyncio.wait_for(self.ws.close(code=SLOW_CONSUMER_CLOSE_CODE), timeout=5.0)
+        except Exception:
+            pass
+
+    async def _run(self) -> None:
+        """Writer task: send queued frames in order until closed or a send fails."""
+        try:
+            while True:
+                while not self.queue:
+                    self._wakeup.clear()
+                    await self._wakeup.wait()
+                frame, _ = self.queue.popleft()
+                self._full_since = None
+                if isinstance(frame, bytes):
+                    await self.ws.send_bytes(frame)
+                else:
+                    await self.ws.send_text(frame)
+                self.sent += 1
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.debug(f"WS send failed, dropping connection: {e}")
+            self.close("send failed")
+
+
+class ReplayBuffer:
+    """Last N sequenced frames of one channel, contiguous in seq"""
+
+    __slots__ = ("epoch", "frames")
+
+    def __init__(self, epoch: str, size: int) -> None:
+        self.epoch = epoch
+        # (seq, frame, droppable)
+        self.frames: Deque[Tuple[int, str, bool]] = deque(maxlen=size)
+
+    @property
+    def last_seq(self) -> int:
+        return self.frames[-1][0] if self.frames else 0
+
+    def record(self, seq: int, frame: str, droppable: bool) -> None:
+        # A gap (e.g. events lost while the backplane reconnected) can't be replayed across
+        if self.frames and seq != self.last_seq + 1:
+            self.frames.clear()
+        self.frames.append((seq, frame, droppable))
+
+    def since(self, seq: int) -> Optional[list]:
+        """Frames after `seq`, or None if `seq` is out of the buffered range."""
+        if not self.frames or seq > self.last_seq or seq < self.frames[0][0] - 1:
+            return None
+        skip = seq - self.frames[0][0] + 1
+        return [entry for i, entry in enumerate(self.frames) if i >= skip]
+
+
+class SubscriberRegistry:
+    """
+    key -> subscribed connections, copy-on-write for readers.
+
+    Writers mutate a private set and drop the key's published view; the
+    next reader builds an immutable tuple that every later reader shares
+    until the next change. A burst of subscribes therefore costs one
+    rebuild, and a reader iterating a view never sees it change.
+    """
+
+    __slots__ = ("_members", "_views", "rebuilds")
+
+    def __init__(self) -> None:
+        self._members: Dict[Any, Set[ClientConnection]] = {}
+        self._views: Dict[Any, Tuple[ClientConnection, ...]] = {}
+        self.rebuilds = 0
+
+    def add(self, key: Any, client: ClientConnection) -> None:
+        self._members.setdefault(key, set()).add(client)
+        self._views.pop(key, None)
+
+    def discard(self, key: Any, client: ClientConnection) -> bool:
+        """Remove a member; returns True if the key has no members left."""
+        members = self._members.get(key)
+        if members is None:
+            return True
+        members.discard(client)
+        self._views.pop(key, None)
+        if not members:
+            del self._members[key]
+            return True
+        return False
+
+    def view(self, key: Any) -> Tuple[ClientConnection, ...]:
+        view = self._views.get(key)
+        if view is None:
+            members = self._members.get(key)
+            if not members:
+                return ()
+            view = self._views[key] = tuple(members)
+            self.rebuilds += 1
+        return view
+
+    def count(self, key: Any) -> int:
+        return len(self._members.get(key, ()))
+
+    def counts(self) -> Dict[Any, int]:
+        return {key: len(members) for key, members in self._members.items()}
+
 
 class ConnectionHub:
     """
     Manages WebSocket connections with symbol-based pub/sub.
-    
-    Thread-safe via asyncio.Lock for subscription operations.
+
+    Subscription changes are serialized by an asyncio.Lock; broadcasts
+    never take it (they read SubscriberRegistry views).
     """
-    
-    def __init__(self) -> None:
-        # symbol -> set of WebSocket connections
-        self._subscriptions: Dict[str, Set[WebSocket]] = {}
-        # ws -> symbol (for fast lookup on disconnect)
-        self._ws_to_symbol: Dict[WebSocket, str] = {}
+
+    def __init__(self, backplane: Optional[Backplane] = None) -> None:
+        self._backplane = backplane or InMemoryBackplane()
+        # channel (symbol for the arena) -> connections
+        self._subscriptions = SubscriberRegistry()
+        # (arena channel, tick interval) -> connections at that cadence
+        self._tick_groups = SubscriberRegistry()
+        # arena channel -> tick intervals that have a group
+        self._cadences: Dict[str, Set[int]] = {}
+        # (channel, interval) -> wall-clock bucket the group last got a tick in
+        self._tick_buckets: Dict[Tuple[str, int], int] = {}
+        # ws -> outbound queue + writer (open connections only)
+        self._clients: Dict[WebSocket, ClientConnection] = {}
+        # Closed connections still in the registries, removed by `_sweep`
+        self._dead: Set[ClientConnection] = set()
+        self._sweep_handle: Optional[asyncio.TimerHandle] = None
+        self._droppable_types = frozenset(settings.WS_DROPPABLE_TYPES)
+        # Called with (channel, frame) for every event this worker delivers
+        self._observers: list[Callable[[str, Dict[str, Any]], None]] = []
+        # Identity of this process as a publisher; seq restarts under a new epoch
+        self.epoch = uuid.uuid4().hex[:8]
+        # channel -> last seq this process published
+        self._seq: Dict[str, int] = {}
+        # channel -> recent sequenced frames received (from any publisher)
+        self._replay: Dict[str, ReplayBuffer] = {}
+        # encoding name -> codec with transcode(channel, frame) -> Frame | None
+        self._codecs: Dict[str, Any] = {}
         self._lock = asyncio.Lock()
-        self._stats = {"total_connections": 0, "total_broadcasts": 0}
-    
+        self._stats = {
+            "total_connections": 0,
+            "total_broadcasts": 0,
+            "dropped_frames": 0,
+            "evicted_clients": 0,
+            "send_failures": 0,
+            "resumes": 0,
+            "resume_fallbacks": 0,
+            "replayed_frames": 0,
+            "coalesced_ticks": 0,
+            "swept_clients": 0,
+        }
+
+    async def start(self) -> None:
+        """Connect the backplane; events published before this are not delivered."""
+        await self._backplane.start(self._deliver)
+        logger.info(f"WS hub started ({self._backplane.name} backplane)")
+
+    async def stop(self) -> None:
+        """Disconnect the backplane and stop all writer tasks."""
+        await self._backplane.stop()
+        for client in list(self._clients.values()):
+            client.close("unsubscribed")
+        if self._sweep_handle is not None:
+            self._sweep_handle.cancel()
+        self._sweep()
+
+    def add_observer(self, observer: Callable[[str, Dict[str, Any]], None]) -> None:
+        """
+        Register a callback for every (channel, message) delivered to this
+        worker, e.g. to keep in-process caches current on every worker.
+        The frame is decoded once for all observers; they must not mutate it.
+        Runs inline on the delivery path, so it must be cheap and not raise.
+        """
+        self._observers.append(observer)
+
+    def register_codec(self, codec: Any) -> None:
+        """Make `codec.name` negotiable as a connection encoding (see ws_codec)."""
+        self._codecs[codec.name] = codec
+
+    @property
+    def encodings(self) -> Tuple[str, ...]:
+        return ("json", *self._codecs)
+
+    def register(self, ws: WebSocket) -> None:
+        """Track a just-accepted connection, so direct sends are queued from the start."""
+        self._ensure_client(ws)
+
+    def set_encoding(self, ws: WebSocket, encoding: str) -> None:
+        """Set a connection's wire encoding (one of `encodings`)."""
+        if encoding != "json" and encoding not in self._codecs:
+            raise ValueError(f"Unknown encoding: {encoding}")
+        self._ensure_client(ws)
+        self._clients[ws].encoding = encoding
+
+    def _transcode(self, encoding: str, channel: str, frame: str) -> Frame:
+        """A frame in the given encoding; the JSON frame if the codec passes on it."""
+        if encoding == "json":
+            return frame
+        try:
+            return self._codecs[encoding].transcode(channel, frame) or frame
+        except Exception as e:
+            logger.warning(f"WS {encoding} transcode failed on {channel}: {e}")
+            return frame
+
     async def subscribe(self, ws: WebSocket, symbol: str) -> None:
         """
-        Subscribe a WebSocket connection to a symbol.
-        
+        Subscribe a WebSocket connection to a symbol's arena, replacing its
+        previous arena symbol (other channels are kept).
+
         Args:
             ws: WebSocket connection
             symbol: Symbol to subscribe to (e.g., "BTCUSDT")
         """
         async with self._lock:
-            # Remove from old subscription if exists
-            old_symbol = self._ws_to_symbol.get(ws)
-            if old_symbol and old_symbol != symbol:
-                self._subscriptions.get(old_symbol, set()).discard(ws)
-                logger.debug(f"WS switched from {old_symbol} to {symbol}")
-            
-            # Add to new subscription
-            if symbol not in self._subscriptions:
-                self._subscriptions[symbol] = set()
-            self._subscriptions[symbol].add(ws)
-            self._ws_to_symbol[ws] = symbol
-            
-            if old_symbol != symbol:
-                self._stats["total_connections"] += 1
-                logger.info(f"WS subscribed to {symbol} (total: {len(self._subscriptions[symbol])})")
-    
+            self._subscribe_arena(ws, symbol)
+
+    async def resume(self, ws: WebSocket, symbol: str, epoch: str, seq: int) -> Optional[int]:
+        """
+        Subscribe a connection to a symbol's arena and queue the events it
+        missed after `seq`, atomically with live delivery (no gap, no repeat).
+
+        Returns:
+            Number of frames replayed, or None if (epoch, seq) is out of the
+            replay range; the caller then sends a full snapshot
+        """
+        async with self._lock:
+            client = self._subscribe_arena(ws, symbol)
+            # No await from here on: a broadcast cannot record or fan out in between
+            buf = self._replay.get(symbol)
+            missed = buf.since(seq) if buf is not None and buf.epoch == epoch else None
+            # Replaying more than the queue holds would drop ticks mid-history
+            if missed is None or len(missed) > client.max_queue - len(client.queue):
+                self._stats["resume_fallbacks"] += 1
+                return None
+            for _, frame, droppable in missed:
+                client.offer(self._transcode(client.encoding, symbol, frame), droppable)
+        self._stats["resumes"] += 1
+        self._stats["replayed_frames"] += len(missed)
+        return len(missed)
+
+    def get_position(self, channel: str) -> Tuple[Optional[str], int]:
+        """(epoch, last seq) of a channel as received here; (None, 0) if unknown."""
+        buf = self._replay.get(channel)
+        if buf is None:
+            return None, 0
+        return buf.epoch, buf.last_seq
+
+    def _subscribe_arena(self, ws: WebSocket, symbol: str) -> ClientConnection:
+        """`subscribe` body; caller holds the lock."""
+        client = self._ensure_client(ws)
+
+        # Remove from old subscription if exists (its tick cadence moves along)
+        old_symbol = client.arena
+        if old_symbol and old_symbol != symbol:
+            self._leave(client, old_symbol)
+            client.channels.discard(old_symbol)
+            interval = client.tick_intervals.pop(old_symbol, None)
+            if interval is not None:
+                client.tick_intervals[symbol] = interval
+            logger.debug(f"WS switched from {old_symbol} to {symbol}")
+
+        # Add to new subscription
+        self._join(client, symbol)
+        client.arena = symbol
+        client.channels.add(symbol)
+
+        if old_symbol != symbol:
+            self._stats["total_connections"] += 1
+            logger.info(f"WS subscribed to {symbol} (total: {self._subscriptions.count(symbol)})")
+        return client
+
+    async def add_channels(self, ws: WebSocket, channels: Iterable[str]) -> Set[str]:
+        """
+        Add channels (see `channel_name`) to a connection.
+
+        Returns:
+            Channels newly added (already-subscribed ones are skipped)
+        """
+        added = set()
+        async with self._lock:
+            client = self._ensure_client(ws)
+            for channel in channels:
+                if channel in client.channels:
+                    continue
+                if len(client.channels) >= settings.WS_MAX_CHANNELS_PER_CONNECTION:
+                    break
+                self._join(client, channel)
+                client.channels.add(channel)
+                added.add(channel)
+        return added
+
+    async def remove_channels(self, ws: WebSocket, channels: Iterable[str]) -> Set[str]:
+        """
+        Remove channels from a connection.
+
+        Returns:
+            Channels actually removed
+        """
+        removed = set()
+        async with self._lock:
+            client = self._clients.get(ws)
+            if client is None:
+                return removed
+            for channel in channels:
+                if channel in client.channels:
+                    client.channels.discard(channel)
+                    self._leave(client, channel)
+                    removed.add(channel)
+                    if client.arena == channel:
+                        client.arena = None
+        return removed
+
+    async def set_tick_interval(self, ws: WebSocket, channels: Iterable[str], interval: int) -> None:
+        """
+        Deliver at most one tick (droppable frame) per `interval` seconds on
+        these arena channels; 1 means every tick. Lifecycle events are not
+        affected. Also applies to channels the connection subscribes later.
+        """
+        async with self._lock:
+            client = self._ensure_client(ws)
+            for channel in channels:
+                if not is_sequenced(channel):
+                    continue
+                subscribed = channel in client.channels
+                if subscribed:
+                    self._leave(client, channel)
+                if interval > 1:
+                    client.tick_intervals[channel] = interval
+                else:
+                    client.tick_intervals.pop(channel, None)
+                if subscribed:
+                    self._join(client, channel)
+
+    def get_tick_interval(self, ws: WebSocket, channel: str) -> int:
+        client = self._clients.get(ws)
+        return client.tick_intervals.get(channel, 1) if client is not None else 1
+
+    def _join(self, client: ClientConnection, channel: str) -> None:
+        """Add a connection to a channel (and its cadence group); caller holds the lock."""
+        self._subscriptions.add(channel, client)
+        if is_sequenced(channel):
+            interval = client.tick_intervals.get(channel, 1)
+            self._tick_groups.add((channel, interval), client)
+            self._cadences.setdefault(channel, set()).add(interval)
+
+    def _leave(self, client: ClientConnection, channel: str) -> None:
+        """Inverse of `_join` (with the connection's current interval)."""
+        self._subscriptions.discard(channel, client)
+        if not is_sequenced(channel):
+            return
+        interval = client.tick_intervals.get(channel, 1)
+        if self._tick_groups.discard((channel, interval), client):
+            cadences = self._cadences.get(channel)
+            if cadences is not None:
+                cadences.discard(interval)
+                if not cadences:
+                    del self._cadences[channel]
+            self._tick_buckets.pop((channel, interval), None)
+
+    def _due_tick_groups(self, channel: str, cadences: Set[int]) -> list:
+        """
+        Groups to get this tick: the every-tick group, plus each slower group
+        whose wall-clock bucket (time // interval) has not had one yet.
+        Buckets are aligned across workers and robust to sampler jitter.
+        """
+        now = time.time()
+        due = []
+        for interval in cadences:
+            group = self._tick_groups.view((channel, interval))
+            if interval > 1:
+                bucket = int(now // interval)
+                key = (channel, interval)
+                if self._tick_buckets.get(key) == bucket:
+                    self._stats["coalesced_ticks"] += len(group)
+                    continue
+                self._tick_buckets[key] = bucket
+            due.append(group)
+        return due
+
+    def get_channels(self, ws: WebSocket) -> Set[str]:
+        """Channels a connection is subscribed to."""
+        client = self._clients.get(ws)
+        return set(client.channels) if client is not None else set()
+
+    def _ensure_client(self, ws: WebSocket) -> ClientConnection:
+        client = self._clients.get(ws)
+        if client is None:
+            client = self._clients[ws] = ClientConnection(
+                ws,
+                max_queue=settings.WS_SEND_QUEUE_SIZE,
+                slow_timeout=settings.WS_SLOW_CLIENT_TIMEOUT,
+                on_close=self._on_client_closed,
+            )
+        return client
+
     async def unsubscribe(self, ws: WebSocket) -> None:
         """
-        Remove a WebSocket from all subscriptions.
-        
+        Remove a WebSocket from all subscriptions and stop its writer.
+
+        It stops receiving at once; its registry entries go in the next sweep.
+
         Args:
             ws: WebSocket connection to remove
         """
-        async with self._lock:
-            symbol = self._ws_to_symbol.pop(ws, None)
-            if symbol and symbol in self._subscriptions:
-                self._subscriptions[symbol].discard(ws)
-                logger.debug(f"WS unsubscribed from {symbol} (remaining: {len(self._subscriptions[symbol])})")
-    
+        client = self._clients.get(ws)
+        if client:
+            client.close("unsubscribed")
+
+    async def send(self, ws: WebSocket, message: Dict[str, Any]) -> bool:
+        """
+        Queue a direct message (snapshot, pong, error) for one connection.
+
+        Goes through the connection's queue so it is ordered with broadcasts
+        and never interleaves with the writer task. Never dropped.
+        """
+        return await self.send_frame(ws, encode_message(message))
+
+    async def send_frame(self, ws: WebSocket, frame: str, channel: Optional[str] = None) -> bool:
+        """
+        `send` for an already-encoded frame (e.g. a cached snapshot). With
+        `channel`, the frame is transcoded as if published there.
+
+        Returns False if the hub does not track the connection (never
+        registered, or already closed, e.g. evicted as a slow consumer):
+        treat it as gone.
+        """
+        client = self._clients.get(ws)
+        if client is None:
+            return False
+        if channel is not None:
+            return client.offer(self._transcode(client.encoding, channel, frame), droppable=False)
+        return client.offer(frame, droppable=False)
+
     async def broadcast(self, symbol: str, message: Dict[str, Any]) -> int:
         """
-        Broadcast a message to all connections subscribed to a symbol.
-        
+        Publish a message to all connections subscribed to a symbol, in every worker.
+
         Args:
-            symbol: Target symbol
+            symbol: Target symbol (or any channel, see `channel_name`)
             message: JSON-serializable message dict
-        
+
         Returns:
-            Number of connections that received the message
+            Number of receivers: local connections queued (in-memory backplane)
+            or workers reached (broker backplane)
         """
-        # Get snapshot of connections (avoid holding lock during I/O)
-        async with self._lock:
-            connections = list(self._subscriptions.get(symbol, set()))
-        
-        if not connections:
+        if is_sequenced(symbol):
+            seq = self._seq.get(symbol, 0) + 1
+            self._seq[symbol] = seq
+            message = {**message, "seq": seq, "epoch": self.epoch}
+        return await self._backplane.publish(
+            symbol,
+            encode_message(message),
+            message.get("type") in self._droppable_types
+        )
+
+    async def broadcast_frame(
+        self,
+        symbol: str,
+        frame: str,
+        droppable: bool = False,
+        message: Optional[Dict[str, Any]] = None
+    ) -> int:
+        """
+        Queue an already-encoded text frame for this worker's subscribers of a symbol.
+
+        Only enqueues: each connection's writer task does the network I/O.
+
+        Args:
+            symbol: Target symbol
+            frame: JSON text (see `encode_message`)
+            droppable: Whether the frame may be dropped for a backed-up client
+            message: The frame already decoded, if the caller has it
+
+        Returns:
+            Number of connections the frame was queued for
+        """
+        # No lock and no await in here: recording for replay and reading the
+        # subscriber views happen in one step, so a `resume` (which runs with
+        # no await either) sees each frame either in the buffer or live
+        if is_sequenced(symbol):
+            self._record(symbol, frame, droppable, message)
+        cadences = self._cadences.get(symbol) if droppable else None
+        if cadences:
+            groups = self._due_tick_groups(symbol, cadences)
+        else:
+            groups = [self._subscriptions.view(symbol)]
+
+        if not any(groups):
             return 0
-        
+
         self._stats["total_broadcasts"] += 1
-        
-        # Send to all connections, collect dead ones
-        dead_connections: list[WebSocket] = []
-        sent_count = 0
-        
-        # Use gather for concurrent sending
-        async def send_to_ws(ws: WebSocket) -> bool:
-            try:
-                await ws.send_json(message)
-                return True
-            except Exception:
-                return False
-        
-        results = await asyncio.gather(
-            *[send_to_ws(ws) for ws in connections],
-            return_exceptions=True
-        )
-        
-        for ws, success in zip(connections, results):
-            if success is True:
-                sent_count += 1
-            else:
-                dead_connections.append(ws)
-        
-        # Clean up dead connections
-        if dead_connections:
-            async with self._lock:
-                for ws in dead_connections:
-                    self._subscriptions.get(symbol, set()).discard(ws)
-                    self._ws_to_symbol.pop(ws, None)
-            logger.debug(f"Cleaned {len(dead_connections)} dead connections for {symbol}")
-        
-        return sent_count
-    
+
+        queued = 0
+        # Other encodings: transcoded once, on first use
+        transcoded: Dict[str, Frame] = {}
+        for group in groups:
+            for client in group:
+                out = frame
+                if client.encoding != "json":
+                    out = transcoded.get(client.encoding)
+                    if out is None:
+                        out = transcoded[client.encoding] = self._transcode(client.encoding, symbol, frame)
+                # Closed connections awaiting the sweep refuse the frame
+                if client.offer(out, droppable):
+                    queued += 1
+        return queued
+
+    async def publish_event(
+        self,
+        topic: str,
+        symbol: Optional[str],
+        event_type: str,
+        data: Dict[str, Any]
+    ) -> int:
+        """
+        Publish a topic event from a write endpoint. Never raises: a failed
+        push must not fail the write that triggered it.
+
+        Message: {"type": event_type, "symbol": symbol, "data": data}
+        """
+        message: Dict[str, Any] = {"type": event_type}
+        if topic not in GLOBAL_TOPICS:
+            message["symbol"] = symbol
+        message["data"] = data
+        try:
+            return await self.broadcast(channel_name(topic, symbol), message)
+        except Exception as e:
+            logger.warning(f"Failed to publish {event_type} to {topic}: {e}")
+            return 0
+
     async def broadcast_all(self, message: Dict[str, Any]) -> int:
         """
-        Broadcast a message to ALL connected clients regardless of symbol.
-        
+        Publish a message to ALL connected clients regardless of symbol.
+        The message is encoded once and the frame reused for every symbol.
+
         Args:
             message: JSON-serializable message dict
-        
+
         Returns:
-            Total number of connections that received the message
+            Number of receivers (see `broadcast`)
         """
-        async with self._lock:
-            all_symbols = list(self._subscriptions.keys())
-        
-        total_sent = 0
-        for symbol in all_symbols:
-            total_sent += await self.broadcast(symbol, message)
-        
-        return total_sent
-    
+        return await self._backplane.publish(
+            ALL_SYMBOLS,
+            encode_message(message),
+            message.get("type") in self._droppable_types
+        )
+
+    async def _deliver(self, symbol: str, frame: str, droppable: bool) -> int:
+        """Backplane callback: fan a published frame out to this worker's sockets."""
+        # Decoded once, for the observers and the replay buffer alike
+        message = decode_message(frame) if self._observers or is_sequenced(symbol) else None
+        for observer in self._observers:
+            try:
+                observer(symbol, message)
+            except Exception as e:
+                logger.warning(f"WS observer failed on {symbol}: {e}")
+
+        if symbol != ALL_SYMBOLS:
+            return await self.broadcast_frame(symbol, frame, droppable, message)
+
+        # Every connection once, however many channels it is in
+        self._stats["total_broadcasts"] += 1
+        queued = 0
+        for client in list(self._clients.values()):
+            if client.offer(frame, droppable):
+                queued += 1
+        return queued
+
+    def _record(
+        self,
+        channel: str,
+        frame: str,
+        droppable: bool,
+        message: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """Keep a sequenced frame for `resume`."""
+        if message is None:
+            message = decode_message(frame)
+        seq, epoch = message.get("seq"), message.get("epoch")
+        if seq is None:
+            return
+        buf = self._replay.get(channel)
+        if buf is None or buf.epoch != epoch:
+            # New publisher (e.g. leader failover): older seqs mean nothing now
+            buf = self._replay[channel] = ReplayBuffer(epoch, settings.WS_REPLAY_BUFFER_SIZE)
+        buf.record(seq, frame, droppable)
+
+    def _on_client_closed(self, client: ClientConnection, reason: str) -> None:
+        """Called by a connection when it closes; schedules its removal without awaiting."""
+        self._stats["dropped_frames"] += client.dropped
+        if reason == "send failed":
+            self._stats["send_failures"] += 1
+        elif reason != "unsubscribed":
+            self._stats["evicted_clients"] += 1
+            logger.warning(f"WS slow consumer evicted: {reason}")
+        if self._clients.get(client.ws) is client:
+            del self._clients[client.ws]
+        # Registry views are rebuilt once per sweep, not once per disconnect
+        self._dead.add(client)
+        if self._sweep_handle is None:
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                self._sweep()
+                return
+            self._sweep_handle = loop.call_later(settings.WS_SWEEP_INTERVAL, self._sweep)
+
+    def _sweep(self) -> None:
+        """Remove closed connections from the registries in one batch."""
+        self._sweep_handle = None
+        dead, self._dead = self._dead, set()
+        for client in dead:
+            for channel in client.channels:
+                self._leave(client, channel)
+        self._stats["swept_clients"] += len(dead)
+        if dead:
+            logger.debug(f"WS swept {len(dead)} closed connections")
+
     def get_subscriber_count(self, symbol: str) -> int:
-        """Get number of subscribers for a symbol (sync, approximate)."""
-        return len(self._subscriptions.get(symbol, set()))
-    
+        """Get number of subscribers for a symbol (sync, approximate: includes unswept closes)."""
+        return self._subscriptions.count(symbol)
+
     def get_all_subscriber_counts(self) -> Dict[str, int]:
-        """Get subscriber counts for all symbols."""
-        return {
-            symbol: len(subs) 
-            for symbol, subs in self._subscriptions.items()
-            if subs  # Only include non-empty
-        }
-    
+        """Get subscriber counts for all channels (arena channels are bare symbols)."""
+        return self._subscriptions.counts()
+
     def get_stats(self) -> Dict[str, Any]:
         """Get hub statistics."""
+        depths = [len(c.queue) for c in self._clients.values()]
         return {
             **self._stats,
-            "active_symbols": len([s for s, c in self._subscriptions.items() if c]),
-            "subscribers_by_symbol": self.get_all_subscriber_counts()
+            # Include drops of still-connected clients
+            "dropped_frames": self._stats["dropped_frames"] + sum(
+                c.dropped for c in self._clients.values()),
+            "queued_frames": sum(depths),
+            "max_queue_depth": max(depths, default=0),
+            "full_queues": sum(1 for d in depths if d >= settings.WS_SEND_QUEUE_SIZE),
+            "connections": len(self._clients),
+            "active_symbols": len(self._subscriptions.counts()),
+            "subscribers_by_symbol": self.get_all_subscriber_counts(),
+            "epoch": self.epoch,
+            "replay_frames": sum(len(b.frames) for b in self._replay.values()),
+            "tick_groups": sum(len(c) for c in self._cadences.values()),
+            "pending_sweep": len(self._dead),
+            "view_rebuilds": self._subscriptions.rebuilds + self._tick_groups.rebuilds,
+            "connections_by_encoding": {
+                enc: n for enc in self.encodings
+                if (n := sum(1 for c in self._clients.values() if c.encoding == enc))
+            },
+            "codecs": {name: codec.get_stats() for name, codec in self._codecs.items()},
+            "backplane": self._backplane.get_stats()
         }
 
 
 # Global singleton instance
-ws_hub = ConnectionHub()
+ws_hub = ConnectionHub(create_backplane())
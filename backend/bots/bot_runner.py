@@ -13,6 +13,7 @@ from typing import Optional
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
 
+from . import http_pool
 from .config import config
 from .personalities import PERSONALITIES, BotPersonality
 from .clawbrawl_client import ClawBrawlClient, RoundInfo, RoundBets
@@ -75,6 +76,9 @@ class BotRunner:
             logger.error("❌ OPENAI_API_KEY not set")
             return False
 
+        # 打开共享 HTTP 连接池（所有客户端复用 keep-alive 连接）
+        await http_pool.open_pool()
+
         return True
 
     async def run_betting_round(self) -> None:
@@ -894,7 +898,10 @@ class BotRunner:
         """Run one betting round immediately"""
         if not await self.initialize():
             return
-        await self.run_betting_round()
+        try:
+            await self.run_betting_round()
+        finally:
+            await http_pool.close_pool()
 
     async def run_forever(self, enable_danmaku: bool = True) -> None:
         """Run continuously with scheduler
@@ -926,6 +933,8 @@ class BotRunner:
             if self.scheduler:
                 self.scheduler.shutdown()
             await self.stop_danmaku_service()
+            logger.info(f"HTTP pool stats: {http_pool.get_stats()}")
+            await http_pool.close_pool()
 
 
 # Global instance
@@ -7,6 +7,7 @@ import httpx
 from typing import Any, Optional
 from dataclasses import dataclass
 
+from . import http_pool
 from .config import config
 
 
@@ -88,7 +89,7 @@ class ClawBrawlClient:
 
     async def _get_client(self) -> httpx.AsyncClient:
         if self._client is None:
-            self._client = httpx.AsyncClient(timeout=30.0)
+            self._client = http_pool.get_client(30.0) or httpx.AsyncClient(timeout=30.0)
         return self._client
 
     def _headers(self) -> dict[str, str]:
@@ -99,7 +100,7 @@ class ClawBrawlClient:
 
     async def close(self) -> None:
         if self._client:
-            await self._client.aclose()
+            await http_pool.release(self._client)
             self._client = None
 
     # =========================================================================
@@ -33,6 +33,12 @@ class BotConfig:
     # Bitget API (public, no auth needed)
     BITGET_API_BASE: str = "https://api.bitget.com"
 
+    # Shared HTTP pool (keep-alive, reused by all bot clients)
+    HTTP2_ENABLED: bool = os.getenv("HTTP2_ENABLED", "true").lower() == "true"
+    HTTP_MAX_CONNECTIONS: int = int(os.getenv("HTTP_MAX_CONNECTIONS", "50"))
+    HTTP_MAX_KEEPALIVE: int = int(os.getenv("HTTP_MAX_KEEPALIVE", "20"))
+    HTTP_KEEPALIVE_EXPIRY: float = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "60"))
+
     # Bot Runner Settings
     SYMBOL: str = os.getenv("SYMBOL", "BTCUSDT")
     # ⚡ 减少延迟以获得早鸟奖励（早下注得分更高）
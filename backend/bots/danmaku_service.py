@@ -10,6 +10,7 @@ from typing import Optional
 
 import httpx
 
+from . import http_pool
 from .config import config
 from .danmaku_generator import DanmakuGenerator, get_danmaku_generator
 
@@ -77,7 +78,7 @@ class DanmakuService:
     async def _get_http_client(self) -> httpx.AsyncClient:
         """获取 HTTP 客户端"""
         if self._http_client is None:
-            self._http_client = httpx.AsyncClient(timeout=10.0)
+            self._http_client = http_pool.get_client(10.0) or httpx.AsyncClient(timeout=10.0)
         return self._http_client
     
     async def _get_round_bets(self) -> tuple[int, int]:
@@ -204,7 +205,7 @@ class DanmakuService:
             self._task = None
         
         if self._http_client:
-            await self._http_client.aclose()
+            await http_pool.release(self._http_client)
             self._http_client = None
         
         await self.generator.close()
@@ -0,0 +1,110 @@
+"""
+Shared HTTP Pool
+进程级共享连接池：所有 bot 客户端复用同一组 keep-alive 连接，
+避免每次调用都重新 TCP + TLS 握手。
+
+- BotRunner 启动时 open_pool()，退出时 close_pool()
+- 未打开连接池时，客户端回退为各自独立的 httpx.AsyncClient
+"""
+
+import time
+from typing import Any, Optional
+
+import httpx
+
+from .config import config
+
+try:
+    import h2  # noqa: F401 - only needed to enable HTTP/2
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+_transport: Optional[httpx.AsyncHTTPTransport] = None
+# timeout -> client sharing the pooled transport
+_clients: dict[float, httpx.AsyncClient] = {}
+_stats: dict[str, float] = {"requests": 0, "errors": 0, "total_latency_ms": 0.0}
+
+
+async def _on_request(request: httpx.Request) -> None:
+    request.extensions["pool_started_at"] = time.perf_counter()
+
+
+async def _on_response(response: httpx.Response) -> None:
+    started = response.request.extensions.get("pool_started_at")
+    _stats["requests"] += 1
+    if started is not None:
+        _stats["total_latency_ms"] += (time.perf_counter() - started) * 1000
+    if response.status_code >= 500:
+        _stats["errors"] += 1
+
+
+async def open_pool() -> None:
+    """打开共享连接池（幂等）"""
+    global _transport
+    if _transport is not None:
+        return
+    _transport = httpx.AsyncHTTPTransport(
+        http2=config.HTTP2_ENABLED and HTTP2_AVAILABLE,
+        limits=httpx.Limits(
+            max_connections=config.HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=config.HTTP_MAX_KEEPALIVE,
+            keepalive_expiry=config.HTTP_KEEPALIVE_EXPIRY,
+        ),
+    )
+
+
+async def close_pool() -> None:
+    """关闭共享连接池"""
+    global _transport
+    _clients.clear()
+    if _transport is not None:
+        await _transport.aclose()
+        _transport = None
+
+
+def get_client(timeout: float) -> Optional[httpx.AsyncClient]:
+    """
+    获取共享连接池上的客户端（同一 timeout 复用同一个实例）
+
+    Returns:
+        共享客户端；连接池未打开时返回 None
+    """
+    if _transport is None:
+        return None
+    client = _clients.get(timeout)
+    if client is None:
+        client = httpx.AsyncClient(
+            transport=_transport,
+            timeout=timeout,
+            event_hooks={"request": [_on_request], "response": [_on_response]},
+        )
+        _clients[timeout] = client
+    return client
+
+
+async def release(client: httpx.AsyncClient) -> None:
+    """释放客户端：共享客户端保持连接，独立客户端直接关闭"""
+    if client not in _clients.values():
+        await client.aclose()
+
+
+def get_stats() -> dict[str, Any]:
+    """连接池统计"""
+    requests = int(_stats["requests"])
+    stats: dict[str, Any] = {
+        "open": _transport is not None,
+        "requests": requests,
+        "errors": int(_stats["errors"]),
+        "avg_latency_ms": round(_stats["total_latency_ms"] / requests, 2) if requests else 0.0,
+        "connections": 0,
+        "idle_connections": 0,
+    }
+    try:
+        connections = list(_transport._pool.connections)  # type: ignore[union-attr]
+        stats["connections"] = len(connections)
+        stats["idle_connections"] = sum(1 for c in connections if c.is_idle())
+    except Exception:
+        pass
+    return stats
@@ -7,6 +7,7 @@ import httpx
 from typing import Optional
 from dataclasses import dataclass
 
+from . import http_pool
 from .config import config
 
 
@@ -42,12 +43,12 @@ class MarketClient:
 
     async def _get_client(self) -> httpx.AsyncClient:
         if self._client is None:
-            self._client = httpx.AsyncClient(timeout=10.0)
+            self._client = http_pool.get_client(10.0) or httpx.AsyncClient(timeout=10.0)
         return self._client
 
     async def close(self) -> None:
         if self._client:
-            await self._client.aclose()
+            await http_pool.release(self._client)
             self._client = None
 
     async def get_ticker(self, symbol: str = "BTCUSDT") -> Optional[TickerData]:
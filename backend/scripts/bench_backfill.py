@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Benchmark: backfill one full round of 1s price history from fills-history.
+
+Compares the old single call (one page of 1000 trades) with the sliced,
+paginated, rate-limited engine in `app.services.backfill`. Start the local
+stand-in first (busy market, Bitget's 10 req/s limit enforced with 429s):
+    python scripts/fake_bitget.py --latency 0.05 --trades-per-second 50 --rate-limit 10
+    python scripts/bench_backfill.py --base http://127.0.0.1:8900
+"""
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.config import settings
+from app.services.backfill import fills_backfill
+from app.services.http_client import http_transport
+from app.services.market import market_service
+
+
+async def single_call(symbol: str, start_ms: int, end_ms: int) -> int:
+    """Old behavior: one fills-history page, last price per second."""
+    trades = await market_service.get_historical_fills(
+        symbol=symbol, start_time=start_ms, end_time=end_ms, limit=1000
+    )
+    return len({t["timestamp"] // 1000 for t in trades})
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--base", default=settings.BITGET_API_BASE)
+    parser.add_argument("--symbol", default="BTCUSDT")
+    parser.add_argument("--seconds", type=int, default=settings.DEFAULT_ROUND_DURATION)
+    args = parser.parse_args()
+
+    market_service.base_url = args.base.rstrip("/")
+    end_ms = (int(time.time()) - 5) * 1000
+    start_ms = end_ms - args.seconds * 1000
+    expected = args.seconds + 1
+
+    await http_transport.start()
+    try:
+        started = time.perf_counter()
+        old_points = await single_call(args.symbol, start_ms, end_ms)
+        old_elapsed = time.perf_counter() - started
+
+        started = time.perf_counter()
+        points = await fills_backfill.fetch_prices(args.symbol, "USDT-FUTURES", start_ms, end_ms)
+        new_elapsed = time.perf_counter() - started
+    finally:
+        await http_transport.close()
+
+    stats = fills_backfill.get_stats()
+    print(f"window: {args.seconds}s ({expected} one-second buckets)")
+    print(f"single call : {old_points:4d}/{expected} buckets covered in {old_elapsed:6.2f}s (1 request)")
+    print(f"backfill    : {len(points):4d}/{expected} buckets covered in {new_elapsed:6.2f}s "
+          f"({stats['requests']} requests, {stats['retries']} retries, "
+          f"{stats['trades']} trades, {stats['failed_slices']} failed slices)")
+    print(f"effective rate: {stats['requests'] / new_elapsed:.1f} req/s "
+          f"(limit {settings.BITGET_FILLS_RATE_LIMIT:g})")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-call httpx client vs. the shared pooled transport.
+
+Measures latency of the mark-price request the sampler makes every second.
+Run against the real exchange to see the TLS handshake cost:
+    python scripts/bench_http_transport.py --base https://api.bitget.com -n 50
+Or against the local stand-in (scripts/fake_bitget.py):
+    python scripts/bench_http_transport.py --base http://127.0.0.1:8900
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import httpx
+
+from app.core.config import settings
+from app.services.http_client import http_transport
+
+
+def summarize(label: str, samples: list[float]) -> None:
+    samples = sorted(samples)
+    p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+    print(
+        f"{label:<10} n={len(samples):<4} mean={statistics.mean(samples):7.2f}ms "
+        f"p50={statistics.median(samples):7.2f}ms p95={p95:7.2f}ms"
+    )
+
+
+async def bench_fresh(url: str, params: dict, n: int) -> list[float]:
+    """Old behavior: a new AsyncClient (new TCP + TLS) per call."""
+    samples = []
+    for _ in range(n):
+        started = time.perf_counter()
+        async with httpx.AsyncClient() as client:
+            response = await client.get(url, params=params, timeout=10.0)
+            response.raise_for_status()
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+async def bench_pooled(url: str, params: dict, n: int) -> list[float]:
+    """New behavior: one keep-alive pool for the whole process."""
+    await http_transport.start()
+    samples = []
+    try:
+        for _ in range(n):
+            started = time.perf_counter()
+            response = await http_transport.get(url, params=params, timeout=10.0)
+            response.raise_for_status()
+            samples.append((time.perf_counter() - started) * 1000)
+        print(f"pool stats: {http_transport.get_stats()}")
+    finally:
+        await http_transport.close()
+    return samples
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--base", default=settings.BITGET_API_BASE)
+    parser.add_argument("--symbol", default="BTCUSDT")
+    parser.add_argument("-n", type=int, default=30)
+    args = parser.parse_args()
+
+    url = f"{args.base.rstrip('/')}/api/v2/mix/market/symbol-price"
+    params = {"symbol": args.symbol, "productType": "USDT-FUTURES"}
+
+    print(f"Benchmarking {url} ({args.n} sequential calls each)")
+    fresh = await bench_fresh(url, params, args.n)
+    pooled = await bench_pooled(url, params, args.n)
+    summarize("per-call", fresh)
+    summarize("pooled", pooled)
+    print(f"speedup (mean): {statistics.mean(fresh) / statistics.mean(pooled):.1f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-request leaderboard vs the settlement-time materializer.
+
+Database mode (default, read-only, uses whatever is in the configured MySQL
+database):
+- The old per-request path: one full build of `GET /leaderboard?limit=50`
+- The settlement-time cost: one `leaderboards.rebuild()` (global plus every
+  enabled symbol), per board and in total, with SQL statement counts
+- The new per-request path: serving a materialized board
+
+--cpu-only: no database; times the Python half of a 100-bot board
+(metrics, tags, model building, JSON encoding) on synthetic bets, plus the
+served-frame path.
+
+Run:
+    python scripts/bench_leaderboard.py [--requests 50]
+    python scripts/bench_leaderboard.py --cpu-only [--bots 100] [--bets 80]
+"""
+import argparse
+import asyncio
+import logging
+import random
+import statistics
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import event
+
+from app.db.database import AsyncSessionLocal, engine
+from app.schemas.common import APIResponse
+from app.schemas.leaderboard import LeaderboardResponse
+from app.services.agent_profile import build_agent_profile
+from app.services.leaderboard import (
+    Board, LeaderboardMaterializer, build_leaderboard, profile_to_leaderboard_entry,
+)
+
+statements = 0
+
+
+def _count_statement(*_args, **_kwargs):
+    global statements
+    statements += 1
+
+
+def ms_stats(samples: list[float]) -> str:
+    ms = sorted(s * 1000 for s in samples)
+    return f"p50 {statistics.median(ms):8.3f} ms  max {ms[-1]:8.3f} ms"
+
+
+def us_stats(samples: list[float]) -> str:
+    us = sorted(s * 1e6 for s in samples)
+    return f"p50 {statistics.median(us):8.1f} us  max {us[-1]:8.1f} us"
+
+
+def synthetic_board(bots: int, bets: int) -> LeaderboardResponse:
+    """The Python half of a rebuild: profiles, metrics and tags for `bots` bots."""
+    rng = random.Random(7)
+    items = []
+    for rank in range(1, bots + 1):
+        recent = [
+            (rng.choice((12, 9, 6, -5, -8, 0)), rng.choice(("win", "lose", "draw")))
+            for _ in range(bets)
+        ]
+        wins = sum(1 for _, r in recent if r == "win")
+        losses = sum(1 for _, r in recent if r == "lose")
+        profile = build_agent_profile(
+            bot_id=f"bot_{rank}", bot_name=f"Bot {rank}", avatar_url=None,
+            score=10_000 - rank * 37, rank=rank, wins=wins, losses=losses,
+            draws=bets - wins - losses, recent_bets=recent, favorite_symbol="BTCUSDT",
+            streak=rng.randint(-5, 5),
+        )
+        items.append(profile_to_leaderboard_entry(profile))
+    return LeaderboardResponse(type="global", items=items, updated_at=datetime.utcnow())
+
+
+def cpu_only(bots: int, bets: int, requests: int) -> None:
+    samples = []
+    for _ in range(20):
+        started = time.perf_counter()
+        data = synthetic_board(bots, bets)
+        APIResponse(success=True, data=data).model_dump_json()
+        samples.append(time.perf_counter() - started)
+    print(f"Python half of a {bots}-bot board ({bets} bets each), once per settlement:")
+    print(f"  build + encode    {ms_stats(samples)}")
+
+    board = Board(data=data, generation=0, built_at=time.monotonic(), build_ms=0.0)
+    board.frame(50)
+    served = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        board.frame(50)
+        served.append(time.perf_counter() - started)
+    print("Per request, limit=50:")
+    print(f"  materialized      {us_stats(served)}")
+
+
+async def with_database(requests: int) -> None:
+    global statements
+    event.listen(engine.sync_engine, "before_cursor_execute", _count_statement)
+    try:
+        # 1. What every GET used to cost
+        samples = []
+        statements = 0
+        for _ in range(min(requests, 10)):
+            started = time.perf_counter()
+            async with AsyncSessionLocal() as db:
+                data = await build_leaderboard(db, None, "all", 50)
+            APIResponse(success=True, data=data).model_dump_json()
+            samples.append(time.perf_counter() - started)
+        per_request_sql = statements / len(samples)
+        print(f"Per request before (global, limit=50, {len(data.items)} bots):")
+        print(f"  full build        {ms_stats(samples)}   {per_request_sql:.0f} SQL statements")
+
+        # 2. Settlement-time rebuild
+        materializer = LeaderboardMaterializer()
+        statements = 0
+        started = time.perf_counter()
+        timings = await materializer.rebuild()
+        elapsed = time.perf_counter() - started
+        print(f"Once per settlement (rebuild of {len(timings)} boards, {materializer.get_stats()['boards_built']} built):")
+        for (symbol, period), build_ms in timings.items():
+            print(f"  {symbol or 'global'}:{period:<4} {build_ms:9.1f} ms")
+        print(f"  total             {elapsed * 1000:9.1f} ms   {statements} SQL statements")
+
+        # 3. What every GET costs now
+        served = []
+        statements = 0
+        for _ in range(requests):
+            started = time.perf_counter()
+            await materializer.get_frame(None, "all", 50)
+            served.append(time.perf_counter() - started)
+        print("Per request after:")
+        print(f"  materialized      {us_stats(served)}   {statements} SQL statements in {requests} requests")
+    finally:
+        await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cpu-only", action="store_true", help="synthetic data, no database")
+    parser.add_argument("--bots", type=int, default=100)
+    parser.add_argument("--bets", type=int, default=80, help="recent bets per bot")
+    parser.add_argument("--requests", type=int, default=50)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    if args.cpu_only:
+        cpu_only(args.bots, args.bets, args.requests)
+    else:
+        asyncio.run(with_database(args.requests))
+
+
+if __name__ == "__main__":
+    main()
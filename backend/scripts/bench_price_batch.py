@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Benchmark: one sampler tick's price fetch, per-symbol vs. batched.
+
+Compares the old loop (one mark-price call per symbol, in sequence) with
+`MarketService.get_prices` (one all-tickers call per product type, groups
+in parallel). Start the local stand-in with an artificial round-trip first:
+    python scripts/fake_bitget.py --latency 0.05
+    python scripts/bench_price_batch.py --base http://127.0.0.1:8900
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.config import settings
+from app.services.http_client import http_transport
+from app.services.market import market_service
+
+SYMBOLS = ["BTCUSDT", "ETHUSDT", "SOLUSDT", "BNBUSDT", "XRPUSDT", "DOGEUSDT", "PEPEUSDT"]
+
+
+async def tick_sequential(configs) -> float:
+    started = time.perf_counter()
+    for cfg in configs:
+        await market_service.get_mark_price(cfg.symbol, cfg.product_type)
+    return (time.perf_counter() - started) * 1000
+
+
+async def tick_batched(configs) -> float:
+    # Empty the cache so every tick really goes upstream
+    market_service.price_cache._entries.clear()
+    started = time.perf_counter()
+    prices = await market_service.get_prices(configs)
+    assert len(prices) == len(configs), f"missing prices: {set(c.symbol for c in configs) - set(prices)}"
+    return (time.perf_counter() - started) * 1000
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--base", default=settings.BITGET_API_BASE)
+    parser.add_argument("-n", type=int, default=20, help="ticks per mode")
+    args = parser.parse_args()
+
+    market_service.base_url = args.base.rstrip("/")
+    configs = [
+        SimpleNamespace(symbol=s, api_source="futures", product_type="USDT-FUTURES")
+        for s in SYMBOLS
+    ]
+
+    await http_transport.start()
+    try:
+        sequential = [await tick_sequential(configs) for _ in range(args.n)]
+        batched = [await tick_batched(configs) for _ in range(args.n)]
+    finally:
+        await http_transport.close()
+
+    for label, samples in (("sequential", sequential), ("batched", batched)):
+        print(f"{label:<11} {len(configs)} symbols  mean={statistics.mean(samples):7.2f}ms "
+              f"max={max(samples):7.2f}ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Benchmark: settle rounds with 10, 1k and 10k bets.
+
+Seeds a disabled `BENCHUSDT` symbol, N throwaway bots (`bench_*`) and one
+active round per size into the configured MySQL database, settles it with
+`round_manager.settle_round`, and reports wall time and SQL statements.
+All seeded rows are deleted afterwards.
+
+Run (against a dev database, never production):
+    python scripts/bench_settlement.py
+    python scripts/bench_settlement.py --sizes 10 1000 10000
+"""
+import argparse
+import asyncio
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import delete, event, insert
+
+from app.db.database import AsyncSessionLocal, engine
+from app.models import Symbol, Round, Bet, BotScore, BotSymbolStats
+from app.services.market import market_service
+from app.services.round_manager import round_manager
+
+SYMBOL = "BENCHUSDT"
+OPEN_PRICE = 100.0
+CLOSE_PRICE = 101.0  # "up": every long wins, every short loses
+
+statements = 0
+
+
+def _count_statement(*_args, **_kwargs):
+    global statements
+    statements += 1
+
+
+async def seed(n: int) -> tuple[int, list[str]]:
+    """Create the symbol (once), N bots and a finished round with N bets."""
+    bot_ids = [f"bench_{n}_{i}" for i in range(n)]
+    async with AsyncSessionLocal() as db:
+        if await db.get(Symbol, SYMBOL) is None:
+            db.add(Symbol(
+                symbol=SYMBOL, display_name="Bench", category="crypto",
+                api_source="futures", product_type="USDT-FUTURES", enabled=False,
+            ))
+            await db.flush()
+
+        await db.execute(insert(BotScore), [
+            {"bot_id": b, "bot_name": b, "total_score": 100} for b in bot_ids
+        ])
+
+        now = datetime.utcnow()
+        round_obj = Round(
+            symbol=SYMBOL,
+            start_time=now - timedelta(minutes=10),
+            end_time=now,
+            open_price=OPEN_PRICE,
+            status="active",
+            bet_count=n,
+        )
+        db.add(round_obj)
+        await db.flush()
+
+        await db.execute(insert(Bet), [
+            {
+                "round_id": round_obj.id, "symbol": SYMBOL, "bot_id": b, "bot_name": b,
+                "direction": random.choice(("long", "short")), "result": "pending",
+                "time_progress": random.random(),
+            }
+            for b in bot_ids
+        ])
+        await db.commit()
+        return round_obj.id, bot_ids
+
+
+async def cleanup(round_id: int, bot_ids: list[str]) -> None:
+    async with AsyncSessionLocal() as db:
+        await db.execute(delete(Bet).where(Bet.round_id == round_id))
+        await db.execute(delete(Round).where(Round.id == round_id))
+        await db.execute(delete(BotSymbolStats).where(BotSymbolStats.bot_id.in_(bot_ids)))
+        await db.execute(delete(BotScore).where(BotScore.bot_id.in_(bot_ids)))
+        await db.commit()
+
+
+async def bench(n: int) -> None:
+    global statements
+    round_id, bot_ids = await seed(n)
+    try:
+        # Pin the close price: settle_round reads it from the price cache
+        market_service.price_cache.put((SYMBOL, "futures"), CLOSE_PRICE)
+
+        statements = 0
+        started = time.perf_counter()
+        async with AsyncSessionLocal() as db:
+            settled = await round_manager.settle_round(db, round_id)
+        elapsed = time.perf_counter() - started
+
+        assert settled is not None and settled.status == "settled"
+        print(f"{n:>6} bets  {elapsed * 1000:9.1f}ms  {statements:4d} SQL statements")
+    finally:
+        await cleanup(round_id, bot_ids)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 1000, 10000])
+    args = parser.parse_args()
+
+    event.listen(engine.sync_engine, "before_cursor_execute", _count_statement)
+    try:
+        for n in args.sizes:
+            await bench(n)
+    finally:
+        async with AsyncSessionLocal() as db:
+            await db.execute(delete(Symbol).where(Symbol.symbol == SYMBOL))
+            await db.commit()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
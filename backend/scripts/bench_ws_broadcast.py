@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: CPU per price_tick broadcast at 1k / 10k / 50k subscribers.
+
+Compares the old per-connection `send_json` (one JSON encode per
+subscriber) with the hub's encode-once path. Sockets are in-process
+stand-ins whose send is a no-op, so the numbers are the hub's own CPU
+cost (encoding + fan-out, including the per-connection writer tasks
+draining their queues), not network I/O.
+
+Run: python scripts/bench_ws_broadcast.py [--sizes 1000 10000 50000]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.services.ws_hub import ConnectionHub, ORJSON_AVAILABLE
+
+TICK = {
+    "type": "price_tick",
+    "data": {
+        "price": 97123.45,
+        "timestamp": 1760000000000,
+        "change_percent": 0.1234,
+        "remaining_seconds": 321,
+    },
+}
+
+
+class NullSocket:
+    """Stand-in for a Starlette WebSocket: sends go nowhere."""
+
+    __slots__ = ("bytes_sent",)
+
+    def __init__(self) -> None:
+        self.bytes_sent = 0
+
+    async def send_text(self, data: str) -> None:
+        self.bytes_sent += len(data)
+
+    async def send_json(self, data) -> None:
+        # What Starlette does: encode per call, then send text
+        await self.send_text(json.dumps(data, separators=(",", ":"), ensure_ascii=False))
+
+
+async def per_connection_send_json(hub: ConnectionHub, symbol: str, message: dict) -> None:
+    """The previous broadcast body: send_json per subscriber."""
+    connections = [client.ws for client in hub._subscriptions.view(symbol)]
+
+    async def send_to_ws(ws) -> bool:
+        try:
+            await ws.send_json(message)
+            return True
+        except Exception:
+            return False
+
+    await asyncio.gather(*[send_to_ws(ws) for ws in connections], return_exceptions=True)
+
+
+async def broadcast_and_drain(hub: ConnectionHub, symbol: str, message: dict) -> None:
+    """Hub broadcast, then let every writer task send its frame."""
+    await hub.broadcast(symbol, message)
+    while any(c.queue for c in hub._clients.values()):
+        await asyncio.sleep(0)
+
+
+async def measure(fn, ticks: int) -> float:
+    """CPU milliseconds per tick."""
+    started = time.process_time()
+    for _ in range(ticks):
+        await fn()
+    return (time.process_time() - started) * 1000 / ticks
+
+
+async def bench(n: int, ticks: int) -> None:
+    hub = ConnectionHub()
+    await hub.start()
+    for _ in range(n):
+        await hub.subscribe(NullSocket(), "BTCUSDT")
+
+    old = await measure(lambda: per_connection_send_json(hub, "BTCUSDT", TICK), ticks)
+    new = await measure(lambda: broadcast_and_drain(hub, "BTCUSDT", TICK), ticks)
+    print(f"{n:>6} subscribers  send_json/conn {old:8.2f} ms/tick   encode-once {new:8.2f} ms/tick   "
+          f"({old / new:.2f}x)")
+    for ws in list(hub._clients):
+        await hub.unsubscribe(ws)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--ticks", type=int, default=5)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)  # One "WS subscribed" line per fake socket otherwise
+    print(f"encoder: {'orjson' if ORJSON_AVAILABLE else 'json'}")
+    for n in args.sizes:
+        await bench(n, args.ticks)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
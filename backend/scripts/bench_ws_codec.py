@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Benchmark: JSON vs compact (`?encoding=compact`) arena frames.
+
+Size: bytes per price_tick and per round_start with a full price_history,
+raw and deflated (what permessage-deflate would roughly send), plus the
+egress of one subscriber following one symbol for an hour.
+CPU: the per-event transcode on the worker (done once per event, not per
+connection) and the hub fan-out at --subscribers connections per encoding.
+
+Run: python scripts/bench_ws_codec.py [--points 600] [--subscribers 10000]
+"""
+import argparse
+import asyncio
+import logging
+import random
+import sys
+import time
+import zlib
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.services.round_snapshot import round_snapshots
+from app.services.ws_codec import CompactCodec, TICK_HEADER, TICK_BODY
+from app.services.ws_hub import ConnectionHub, encode_message, ORJSON_AVAILABLE
+
+SYMBOL = "BTCUSDT"
+OPEN_PRICE = 97123.45
+
+
+class NullSocket:
+    """Stand-in for a Starlette WebSocket: counts bytes, sends nowhere."""
+
+    __slots__ = ("bytes_sent",)
+
+    def __init__(self) -> None:
+        self.bytes_sent = 0
+
+    async def send_text(self, data: str) -> None:
+        self.bytes_sent += len(data.encode())
+
+    async def send_bytes(self, data: bytes) -> None:
+        self.bytes_sent += len(data)
+
+
+def make_round(points: int) -> tuple[dict, list[dict]]:
+    """A round_start message with `points` seconds of history, and ticks continuing it."""
+    start = datetime(2026, 1, 1, 12, 0, 0)
+    start_ms = int((start - datetime(1970, 1, 1)).total_seconds() * 1000)
+    price = OPEN_PRICE
+    history, ticks = [], []
+    for i in range(points * 2):
+        price = round(price + random.choice((-1, 1)) * random.randint(0, 300) / 100, 2)
+        ts = start_ms + i * 1000 + random.randint(0, 30)
+        if i < points:
+            history.append({"timestamp": ts, "price": price})
+            continue
+        ticks.append({
+            "type": "price_tick",
+            "symbol": SYMBOL,
+            "seq": i,
+            "epoch": "9f3ab2c1",
+            "data": {
+                "round_id": 42,
+                "price": price,
+                "timestamp": ts,
+                "change_percent": round((price - OPEN_PRICE) / OPEN_PRICE * 100, 4),
+                "remaining_seconds": 600 - i % 600,
+            },
+        })
+    round_start = {
+        "type": "round_start",
+        "seq": points,
+        "epoch": "9f3ab2c1",
+        "data": {
+            "id": 42, "symbol": SYMBOL, "display_name": "BTC/USDT", "category": "crypto", "emoji": "₿",
+            "start_time": start.isoformat() + "Z",
+            "end_time": (start + timedelta(minutes=10)).isoformat() + "Z",
+            "open_price": OPEN_PRICE, "current_price": price, "price_change_percent": 0.0,
+            "status": "active", "remaining_seconds": 0, "betting_open": False, "bet_count": 17,
+            "price_history": history, "scoring": None,
+        },
+    }
+    return round_start, ticks
+
+
+def size_row(label: str, json_frames: list, compact_frames: list) -> None:
+    def raw(frames):
+        return sum(len(f if isinstance(f, bytes) else f.encode()) for f in frames) / len(frames)
+
+    def deflated(frames):
+        return sum(len(zlib.compress(f if isinstance(f, bytes) else f.encode())) for f in frames) / len(frames)
+
+    j, c = raw(json_frames), raw(compact_frames)
+    print(f"  {label:<12} json {j:9.0f} B   compact {c:9.0f} B   ({j / c:5.1f}x)   "
+          f"deflated: json {deflated(json_frames):8.0f} B   compact {deflated(compact_frames):8.0f} B")
+
+
+def cpu_us(fn, n: int) -> float:
+    started = time.process_time()
+    for _ in range(n):
+        fn()
+    return (time.process_time() - started) * 1e6 / n
+
+
+async def fanout_ms(hub: ConnectionHub, frames: list[str], subscribers: int, encoding: str) -> tuple[float, int]:
+    sockets = [NullSocket() for _ in range(subscribers)]
+    for ws in sockets:
+        hub.set_encoding(ws, encoding)
+        await hub.subscribe(ws, SYMBOL)
+    started = time.process_time()
+    for frame in frames:
+        await hub.broadcast_frame(SYMBOL, frame, droppable=True)
+        while any(c.queue for c in hub._clients.values()):
+            await asyncio.sleep(0)
+    elapsed = (time.process_time() - started) * 1000 / len(frames)
+    sent = sum(ws.bytes_sent for ws in sockets)
+    for ws in sockets:
+        await hub.unsubscribe(ws)
+    return elapsed, sent
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--points", type=int, default=600, help="price_history points in round_start")
+    parser.add_argument("--subscribers", type=int, default=10000)
+    parser.add_argument("--ticks", type=int, default=20)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    random.seed(7)
+    round_start, ticks = make_round(args.points)
+
+    # The codec reads round context from the snapshot cache, fed by hub events
+    start_frame = encode_message(round_start)
+    round_snapshots.observe(SYMBOL, round_start)
+
+    tick_frames = [encode_message(t) for t in ticks]
+    codec = CompactCodec()
+    compact_ticks = [codec.transcode(SYMBOL, f) for f in tick_frames]
+    compact_start = codec.transcode(SYMBOL, start_frame)
+    assert all(isinstance(f, bytes) for f in compact_ticks)
+    assert len(compact_ticks[0]) == TICK_HEADER.size + len(SYMBOL) + TICK_BODY.size
+
+    print(f"encoder: {'orjson' if ORJSON_AVAILABLE else 'json'}")
+    print("Size per frame:")
+    size_row("price_tick", tick_frames, compact_ticks)
+    size_row("round_start", [start_frame], [compact_start])
+
+    hour_json = sum(len(f.encode()) for f in tick_frames) / len(tick_frames) * 3600
+    hour_compact = sum(len(f) for f in compact_ticks) / len(compact_ticks) * 3600
+    print(f"  1 subscriber x 1 symbol x 1h of ticks: json {hour_json / 1e6:.2f} MB, "
+          f"compact {hour_compact / 1e6:.2f} MB")
+
+    print("CPU per event (once per worker, not per connection):")
+    print(f"  price_tick transcode  {cpu_us(lambda: CompactCodec().transcode(SYMBOL, tick_frames[0]), 20000):8.2f} us")
+    print(f"  round_start transcode {cpu_us(lambda: CompactCodec().transcode(SYMBOL, start_frame), 200):8.2f} us")
+
+    hub = ConnectionHub()
+    hub.register_codec(codec)
+    await hub.start()
+    frames = tick_frames[:args.ticks]
+    for encoding in ("json", "compact"):
+        ms, sent = await fanout_ms(hub, frames, args.subscribers, encoding)
+        print(f"  fan-out {args.subscribers} x {encoding:<7} {ms:8.2f} ms/tick   "
+              f"{sent / len(frames) / 1e6:6.2f} MB/tick")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
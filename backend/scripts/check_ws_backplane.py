@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Check: every client on every worker gets every tick exactly once.
+
+Starts the fake Redis broker (scripts/fake_redis.py) unless --redis-url is
+given, spawns N worker processes that each run a ConnectionHub on the Redis
+backplane with K recording sockets spread over the symbols, then publishes
+T numbered price_ticks per symbol from a separate publisher hub (the
+scheduler's role). Each worker reports what its sockets received; the check
+fails on any missing, duplicated or reordered tick.
+
+Run:
+    python scripts/check_ws_backplane.py
+    python scripts/check_ws_backplane.py --workers 4 --clients 200 --ticks 300
+    python scripts/check_ws_backplane.py --redis-url redis://localhost:6379/0
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+# Workers must not drop ticks for pacing reasons: this checks delivery, not backpressure
+os.environ.setdefault("WS_SEND_QUEUE_SIZE", "100000")
+
+from app.core.config import settings
+from app.services.ws_backplane import RedisBackplane
+from app.services.ws_hub import ConnectionHub
+
+SYMBOLS = ["BTCUSDT", "ETHUSDT", "SOLUSDT"]
+SCRIPTS = Path(__file__).parent
+
+
+class RecordingSocket:
+    """Stand-in for a Starlette WebSocket that keeps the tick numbers it receives."""
+
+    def __init__(self, symbol: str) -> None:
+        self.symbol = symbol
+        self.ticks: list[int] = []
+        self.done = asyncio.Event()
+
+    async def send_text(self, data: str) -> None:
+        message = json.loads(data)
+        if message["type"] == "price_tick":
+            self.ticks.append(message["data"]["seq"])
+        elif message["type"] == "done":
+            self.done.set()
+
+    async def close(self, code: int = 1000) -> None:
+        pass
+
+
+async def run_worker(url: str, clients: int, ticks: int) -> None:
+    hub = ConnectionHub(RedisBackplane(url, settings.WS_BACKPLANE_CHANNEL))
+    await hub.start()
+    sockets = [RecordingSocket(SYMBOLS[i % len(SYMBOLS)]) for i in range(clients)]
+    for ws in sockets:
+        await hub.subscribe(ws, ws.symbol)
+    print("READY", flush=True)
+
+    await asyncio.gather(*(ws.done.wait() for ws in sockets))
+    expected = list(range(ticks))
+    bad = [
+        {
+            "symbol": ws.symbol,
+            "received": len(ws.ticks),
+            "duplicates": len(ws.ticks) - len(set(ws.ticks)),
+            "missing": len(set(expected) - set(ws.ticks)),
+        }
+        for ws in sockets if ws.ticks != expected
+    ]
+    print(json.dumps({
+        "delivered": sum(len(ws.ticks) for ws in sockets),
+        "bad": bad,
+        "dropped": hub.get_stats()["dropped_frames"],
+    }), flush=True)
+    await hub.stop()
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def run_check(args) -> bool:
+    broker = None
+    url = args.redis_url
+    if not url:
+        port = free_port()
+        broker = subprocess.Popen(
+            [sys.executable, str(SCRIPTS / "fake_redis.py"), "--port", str(port)],
+            stdout=subprocess.DEVNULL,
+        )
+        url = f"redis://127.0.0.1:{port}/0"
+        time.sleep(0.5)
+
+    workers = []
+    try:
+        for _ in range(args.workers):
+            workers.append(await asyncio.create_subprocess_exec(
+                sys.executable, __file__, "--worker", "--redis-url", url,
+                "--clients", str(args.clients), "--ticks", str(args.ticks),
+                stdout=asyncio.subprocess.PIPE,
+            ))
+        for proc in workers:
+            line = await asyncio.wait_for(proc.stdout.readline(), timeout=30)
+            assert line.strip() == b"READY", f"worker failed to start: {line!r}"
+
+        # Publisher: the scheduler process, with no sockets of its own
+        publisher = ConnectionHub(RedisBackplane(url, settings.WS_BACKPLANE_CHANNEL))
+        await publisher.start()
+        started = time.perf_counter()
+        for seq in range(args.ticks):
+            for symbol in SYMBOLS:
+                receivers = await publisher.broadcast(
+                    symbol, {"type": "price_tick", "data": {"seq": seq}})
+                # The publisher's own hub is subscribed too, like any API worker
+                assert receivers == args.workers + 1, f"published to {receivers} hubs"
+            if args.interval:
+                await asyncio.sleep(args.interval)
+        await publisher.broadcast_all({"type": "done"})
+        elapsed = time.perf_counter() - started
+        await publisher.stop()
+
+        ok = True
+        delivered = 0
+        for i, proc in enumerate(workers):
+            report = json.loads(await asyncio.wait_for(proc.stdout.readline(), timeout=60))
+            await proc.wait()
+            delivered += report["delivered"]
+            for client in report["bad"]:
+                ok = False
+                print(f"worker {i} {client['symbol']}: {client['received']} ticks, "
+                      f"{client['duplicates']} duplicates, {client['missing']} missing "
+                      f"(or out of order)")
+            if report["dropped"]:
+                print(f"worker {i}: {report['dropped']} frames dropped by the send queue")
+
+        total = args.workers * args.clients * args.ticks
+        print(f"{args.workers} workers x {args.clients} clients, {args.ticks} ticks x "
+              f"{len(SYMBOLS)} symbols published in {elapsed:.2f}s")
+        print(f"{delivered}/{total} ticks delivered -> {'OK: exactly once, in order' if ok else 'FAILED'}")
+        return ok
+    finally:
+        for proc in workers:
+            if proc.returncode is None:
+                proc.kill()
+        if broker:
+            broker.terminate()
+            broker.wait()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=3)
+    parser.add_argument("--clients", type=int, default=100, help="Sockets per worker")
+    parser.add_argument("--ticks", type=int, default=200, help="Ticks per symbol")
+    parser.add_argument("--interval", type=float, default=0.002, help="Pause between tick rounds (s)")
+    parser.add_argument("--redis-url", default="", help="Use a real Redis instead of the fake broker")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        asyncio.run(run_worker(args.redis_url, args.clients, args.ticks))
+    else:
+        sys.exit(0 if asyncio.run(run_check(args)) else 1)
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for Bitget's public market data (REST + WebSocket).
+
+Serves random-walk prices so the API and the streaming price feed can run
+without touching the real exchange.
+
+Run:
+    python scripts/fake_bitget.py --port 8900
+
+Then start the API with:
+    BITGET_API_BASE=http://localhost:8900
+    BITGET_WS_URL=ws://localhost:8900/v2/ws/public
+
+Options:
+    --interval 0.5      Seconds between ticker pushes
+    --drop-after 30     Close every WS connection after N seconds (tests reconnect)
+    --silent-after 20   Stop pushing after N seconds but keep the socket open (tests gap detection)
+    --latency 0.05      Added delay per REST call in seconds (simulates exchange round-trip)
+    --trades-per-second 50   Trade density served by fills-history
+    --rate-limit 10     Reject fills-history calls above N req/s with 429 (0 = off)
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse
+
+app = FastAPI(title="Fake Bitget")
+
+# Runtime options (overridden from the command line)
+OPTIONS = {
+    "interval": 0.5,
+    "drop_after": 0.0,
+    "silent_after": 0.0,
+    "latency": 0.0,
+    "trades_per_second": 50,
+    "rate_limit": 10.0,
+}
+
+# fills-history request times in the current 1s window (for --rate-limit)
+_fills_calls: list[float] = []
+FILLS_STATS = {"requests": 0, "rejected": 0}
+
+BASE_PRICES = {
+    "BTCUSDT": 97000.0,
+    "ETHUSDT": 3200.0,
+    "SOLUSDT": 180.0,
+    "BNBUSDT": 650.0,
+    "XRPUSDT": 2.3,
+    "DOGEUSDT": 0.32,
+    "PEPEUSDT": 0.000018,
+}
+_prices: dict[str, float] = {}
+
+
+def current_price(symbol: str) -> float:
+    """Advance and return the random-walk price for a symbol."""
+    price = _prices.get(symbol) or BASE_PRICES.get(symbol, 100.0)
+    price *= 1 + random.gauss(0, 0.0002)
+    _prices[symbol] = price
+    return price
+
+
+def now_ms() -> int:
+    return int(time.time() * 1000)
+
+
+def ok(data) -> dict:
+    return {"code": "00000", "msg": "success", "requestTime": now_ms(), "data": data}
+
+
+# ============ REST ============
+
+async def simulate_latency() -> None:
+    if OPTIONS["latency"]:
+        await asyncio.sleep(OPTIONS["latency"])
+
+
+@app.get("/api/v2/mix/market/symbol-price")
+async def symbol_price(symbol: str, productType: str = "USDT-FUTURES"):
+    await simulate_latency()
+    price = current_price(symbol)
+    return ok([{
+        "symbol": symbol,
+        "price": f"{price:.8f}",
+        "indexPrice": f"{price:.8f}",
+        "markPrice": f"{price:.8f}",
+        "ts": str(now_ms()),
+    }])
+
+
+def _ticker(symbol: str) -> dict:
+    price = current_price(symbol)
+    return {
+        "symbol": symbol,
+        "lastPr": f"{price:.8f}",
+        "markPrice": f"{price:.8f}",
+        "indexPrice": f"{price:.8f}",
+        "high24h": f"{price * 1.02:.8f}",
+        "low24h": f"{price * 0.98:.8f}",
+        "change24h": "0.0012",
+        "fundingRate": "0.0001",
+        "baseVolume": "12345.6",
+        "ts": str(now_ms()),
+    }
+
+
+@app.get("/api/v2/mix/market/ticker")
+async def ticker(symbol: str, productType: str = "USDT-FUTURES"):
+    await simulate_latency()
+    return ok([_ticker(symbol)])
+
+
+@app.get("/api/v2/mix/market/tickers")
+async def tickers(productType: str = "USDT-FUTURES"):
+    await simulate_latency()
+    return ok([_ticker(symbol) for symbol in BASE_PRICES])
+
+
+def _trade_price(symbol: str, ts: int) -> float:
+    """Deterministic price path so repeated/overlapping pages agree."""
+    base = BASE_PRICES.get(symbol, 100.0)
+    return base * (1 + 0.002 * math.sin(ts / 60000) + 0.0005 * math.sin(ts / 1300))
+
+
+@app.get("/api/v2/mix/market/fills-history")
+async def fills_history(
+    symbol: str,
+    productType: str = "usdt-futures",
+    limit: int = 500,
+    startTime: int | None = None,
+    endTime: int | None = None,
+):
+    """Newest-first trades in [startTime, endTime], at most `limit` (max 1000) like Bitget."""
+    now = time.monotonic()
+    FILLS_STATS["requests"] += 1
+    _fills_calls[:] = [t for t in _fills_calls if now - t < 1.0]
+    if OPTIONS["rate_limit"] and len(_fills_calls) >= OPTIONS["rate_limit"]:
+        FILLS_STATS["rejected"] += 1
+        return JSONResponse(
+            status_code=429,
+            content={"code": "429", "msg": "Too Many Requests", "requestTime": now_ms(), "data": None},
+        )
+    _fills_calls.append(now)
+    await simulate_latency()
+
+    limit = min(limit, 1000)
+    end = endTime or now_ms()
+    start = startTime or end - 3_600_000
+    spacing = max(1, 1000 // int(OPTIONS["trades_per_second"]))
+    trades = []
+    ts = end - end % spacing
+    while ts >= start and len(trades) < limit:
+        trades.append({
+            "tradeId": str(ts),
+            "price": f"{_trade_price(symbol, ts):.8f}",
+            "size": "0.01",
+            "side": "buy" if (ts // spacing) % 2 else "sell",
+            "ts": str(ts),
+            "symbol": symbol,
+        })
+        ts -= spacing
+    return ok(trades)
+
+
+@app.get("/_stats")
+async def stats():
+    return FILLS_STATS
+
+
+# ============ WebSocket ============
+
+def _ticker_push(product_type: str, symbol: str) -> str:
+    item = _ticker(symbol)
+    item["instId"] = symbol
+    return json.dumps({
+        "action": "snapshot",
+        "arg": {"instType": product_type, "channel": "ticker", "instId": symbol},
+        "data": [item],
+        "ts": now_ms(),
+    })
+
+
+@app.websocket("/v2/ws/public")
+async def public_ws(websocket: WebSocket):
+    await websocket.accept()
+    subscriptions: set[tuple[str, str]] = set()
+    connected_at = time.monotonic()
+
+    async def pusher():
+        while True:
+            await asyncio.sleep(OPTIONS["interval"])
+            elapsed = time.monotonic() - connected_at
+            if OPTIONS["drop_after"] and elapsed > OPTIONS["drop_after"]:
+                await websocket.close()
+                return
+            if OPTIONS["silent_after"] and elapsed > OPTIONS["silent_after"]:
+                continue
+            for product_type, symbol in list(subscriptions):
+                await websocket.send_text(_ticker_push(product_type, symbol))
+
+    push_task = asyncio.create_task(pusher())
+    try:
+        while True:
+            raw = await websocket.receive_text()
+            if raw == "ping":
+                await websocket.send_text("pong")
+                continue
+            try:
+                message = json.loads(raw)
+            except json.JSONDecodeError:
+                await websocket.send_text(json.dumps({"event": "error", "code": 30001, "msg": "bad json"}))
+                continue
+
+            op = message.get("op")
+            for arg in message.get("args", []):
+                key = (arg.get("instType", "USDT-FUTURES"), arg.get("instId"))
+                if op == "subscribe":
+                    subscriptions.add(key)
+                elif op == "unsubscribe":
+                    subscriptions.discard(key)
+                await websocket.send_text(json.dumps({"event": op, "arg": arg}))
+    except (WebSocketDisconnect, RuntimeError):
+        pass
+    finally:
+        push_task.cancel()
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--interval", type=float, default=0.5)
+    parser.add_argument("--drop-after", type=float, default=0.0)
+    parser.add_argument("--silent-after", type=float, default=0.0)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--trades-per-second", type=int, default=50)
+    parser.add_argument("--rate-limit", type=float, default=10.0)
+    args = parser.parse_args()
+
+    OPTIONS.update(
+        interval=args.interval,
+        drop_after=args.drop_after,
+        silent_after=args.silent_after,
+        latency=args.latency,
+        trades_per_second=args.trades_per_second,
+        rate_limit=args.rate_limit,
+    )
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
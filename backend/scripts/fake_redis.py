@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for a Redis pub/sub broker.
+
+Speaks just enough RESP2 for the WebSocket backplane (PING, PUBLISH,
+SUBSCRIBE/PSUBSCRIBE and their UNSUBSCRIBE forms, plus the handshake
+commands redis-py sends), so multi-worker fan-out can be tested without
+a Redis server.
+
+Run:
+    python scripts/fake_redis.py --port 6390
+
+Then start the API workers with:
+    WS_BACKPLANE=redis
+    WS_BACKPLANE_URL=redis://localhost:6390/0
+"""
+import argparse
+import asyncio
+import fnmatch
+from typing import List, Optional, Set
+
+
+class Client:
+    def __init__(self, writer: asyncio.StreamWriter) -> None:
+        self.writer = writer
+        self.channels: Set[bytes] = set()
+        self.patterns: Set[bytes] = set()
+
+    @property
+    def subscriptions(self) -> int:
+        return len(self.channels) + len(self.patterns)
+
+
+clients: Set[Client] = set()
+STATS = {"published": 0, "delivered": 0}
+
+
+def encode(value) -> bytes:
+    """RESP2 encoding of bytes/str/int/None/list."""
+    if value is None:
+        return b"$-1\r\n"
+    if isinstance(value, int):
+        return b":%d\r\n" % value
+    if isinstance(value, str):
+        value = value.encode()
+    if isinstance(value, bytes):
+        return b"$%d\r\n%s\r\n" % (len(value), value)
+    return b"*%d\r\n" % len(value) + b"".join(encode(v) for v in value)
+
+
+async def read_command(reader: asyncio.StreamReader) -> Optional[List[bytes]]:
+    line = await reader.readline()
+    if not line:
+        return None
+    if not line.startswith(b"*"):
+        return line.strip().split()  # Inline command (e.g. from redis-cli/telnet)
+    args = []
+    for _ in range(int(line[1:])):
+        size = int((await reader.readline())[1:])
+        args.append((await reader.readexactly(size + 2))[:-2])
+    return args
+
+
+def publish(channel: bytes, message: bytes) -> int:
+    STATS["published"] += 1
+    receivers = 0
+    for client in list(clients):
+        if channel in client.channels:
+            client.writer.write(encode([b"message", channel, message]))
+            receivers += 1
+        for pattern in client.patterns:
+            if fnmatch.fnmatchcase(channel.decode(), pattern.decode()):
+                client.writer.write(encode([b"pmessage", pattern, channel, message]))
+                receivers += 1
+    STATS["delivered"] += receivers
+    return receivers
+
+
+async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    client = Client(writer)
+    clients.add(client)
+    try:
+        while True:
+            args = await read_command(reader)
+            if args is None:
+                break
+            if not args:
+                continue
+            cmd = args[0].upper()
+
+            if cmd == b"PING":
+                writer.write(encode([b"pong", b""]) if client.subscriptions else b"+PONG\r\n")
+            elif cmd == b"PUBLISH":
+                writer.write(encode(publish(args[1], args[2])))
+            elif cmd in (b"SUBSCRIBE", b"PSUBSCRIBE"):
+                target = client.channels if cmd == b"SUBSCRIBE" else client.patterns
+                for name in args[1:]:
+                    target.add(name)
+                    writer.write(encode([cmd.lower(), name, client.subscriptions]))
+            elif cmd in (b"UNSUBSCRIBE", b"PUNSUBSCRIBE"):
+                target = client.channels if cmd == b"UNSUBSCRIBE" else client.patterns
+                for name in (args[1:] or list(target)):
+                    target.discard(name)
+                    writer.write(encode([cmd.lower(), name, client.subscriptions]))
+                if len(args) == 1 and not target:
+                    writer.write(encode([cmd.lower(), None, client.subscriptions]))
+            elif cmd in (b"CLIENT", b"SELECT", b"AUTH"):
+                writer.write(b"+OK\r\n")
+            elif cmd == b"QUIT":
+                writer.write(b"+OK\r\n")
+                break
+            else:
+                writer.write(b"-ERR unknown command '%s'\r\n" % args[0])
+            await writer.drain()
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        clients.discard(client)
+        writer.close()
+
+
+async def serve(host: str, port: int) -> None:
+    server = await asyncio.start_server(handle, host, port)
+    print(f"Fake Redis listening on {host}:{port}", flush=True)
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6390)
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
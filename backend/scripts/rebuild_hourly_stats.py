@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Rebuild the hourly leaderboard rollups from bet history.
+
+Fills bot_hourly_stats (see sql/migrate_add_bot_hourly_stats.sql), which the
+24h/7d/30d leaderboards sum. Settlement keeps it up to date afterwards; run
+this once after the migration, or any time the buckets are suspected to be
+off. Buckets are replaced in one transaction; run it between settlements
+(or with the scheduler stopped) so a round settling meanwhile is not lost.
+
+Run: python scripts/rebuild_hourly_stats.py [--days 30] [--dry-run]
+"""
+import argparse
+import asyncio
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Optional
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import select, delete, insert
+
+from app.db.database import AsyncSessionLocal, engine
+from app.models import Bet, BotHourlyStats
+from app.services.round_manager import hour_bucket
+
+BATCH_SIZE = 1000
+
+
+async def rebuild(days: Optional[int], dry_run: bool) -> None:
+    async with AsyncSessionLocal() as db:
+        since = hour_bucket(datetime.utcnow() - timedelta(days=days)) if days else None
+
+        # Same bucketing as RoundManager._apply_settlement
+        buckets: dict[tuple[str, str, datetime], dict] = {}
+        conditions = [Bet.result != "pending"]
+        if since is not None:
+            conditions.append(Bet.created_at >= since)
+        stream = await db.stream(
+            select(Bet.bot_id, Bet.symbol, Bet.created_at, Bet.result, Bet.score_change)
+            .where(*conditions)
+            .execution_options(yield_per=5000)
+        )
+        bets = 0
+        async for bot_id, symbol, created_at, result, score_change in stream:
+            hour = hour_bucket(created_at)
+            bucket = buckets.setdefault((bot_id, symbol, hour), {
+                "bot_id": bot_id, "symbol": symbol, "hour": hour,
+                "wins": 0, "losses": 0, "draws": 0, "score_delta": 0, "bet_count": 0,
+            })
+            bucket["wins"] += result == "win"
+            bucket["losses"] += result == "lose"
+            bucket["draws"] += result == "draw"
+            bucket["score_delta"] += score_change or 0
+            bucket["bet_count"] += 1
+            bets += 1
+
+        scope = f"since {since}" if since else "full history"
+        print(f"{bets} settled bets -> {len(buckets)} (bot, symbol, hour) buckets ({scope})")
+        if dry_run:
+            for row in sorted(buckets.values(), key=lambda r: r["hour"], reverse=True)[:20]:
+                print(f"  {row['hour']} {row['bot_id']} {row['symbol']}: "
+                      f"{row['wins']}W/{row['losses']}L/{row['draws']}D "
+                      f"{row['score_delta']:+d} ({row['bet_count']} bets)")
+            return
+
+        stmt = delete(BotHourlyStats)
+        if since is not None:
+            stmt = stmt.where(BotHourlyStats.hour >= since)
+        await db.execute(stmt)
+        rows = list(buckets.values())
+        for i in range(0, len(rows), BATCH_SIZE):
+            await db.execute(insert(BotHourlyStats), rows[i:i + BATCH_SIZE])
+        await db.commit()
+        print("Hourly stats rebuilt")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--days", type=int, help="Only rebuild buckets of the last N days (default: all)")
+    parser.add_argument("--dry-run", action="store_true", help="Compute and print, don't write")
+    args = parser.parse_args()
+    try:
+        await rebuild(args.days, args.dry_run)
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
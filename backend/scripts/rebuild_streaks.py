@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Rebuild materialized streak state from bet history.
+
+Fills bot_scores.win_streak / current_streak and
+bot_symbol_stats.last_round_id (see sql/migrate_add_streak_state.sql).
+Settlement keeps them up to date afterwards; run this once after the
+migration, or any time the columns are suspected to be off.
+
+Run: python scripts/rebuild_streaks.py [--dry-run]
+"""
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import select, update, func
+
+from app.db.database import AsyncSessionLocal, engine
+from app.models import Bet, BotScore, BotSymbolStats
+from app.services.round_manager import advance_streaks
+
+
+async def rebuild(dry_run: bool) -> None:
+    async with AsyncSessionLocal() as db:
+        # Replay every settled bet, oldest first, per bot
+        state: dict[str, tuple[int, int]] = {}
+        stream = await db.stream(
+            select(Bet.bot_id, Bet.result)
+            .where(Bet.result != "pending")
+            .order_by(Bet.bot_id, Bet.created_at, Bet.id)
+            .execution_options(yield_per=5000)
+        )
+        async for bot_id, result in stream:
+            state[bot_id] = advance_streaks(*state.get(bot_id, (0, 0)), result)
+
+        last_rounds = (await db.execute(
+            select(Bet.bot_id, Bet.symbol, func.max(Bet.round_id))
+            .where(Bet.result != "pending")
+            .group_by(Bet.bot_id, Bet.symbol)
+        )).all()
+
+        print(f"{len(state)} bots with settled bets, {len(last_rounds)} (bot, symbol) pairs")
+        if dry_run:
+            for bot_id, (win_streak, current_streak) in list(state.items())[:20]:
+                print(f"  {bot_id}: win_streak={win_streak} current_streak={current_streak}")
+            return
+
+        # Bots without settled bets start from zero
+        await db.execute(update(BotScore).values(win_streak=0, current_streak=0))
+        if state:
+            await db.execute(update(BotScore), [
+                {"bot_id": bot_id, "win_streak": w, "current_streak": c}
+                for bot_id, (w, c) in state.items()
+            ])
+        if last_rounds:
+            await db.execute(update(BotSymbolStats), [
+                {"bot_id": bot_id, "symbol": symbol, "last_round_id": round_id}
+                for bot_id, symbol, round_id in last_rounds
+            ])
+        await db.commit()
+        print("Streak state rebuilt")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dry-run", action="store_true", help="Compute and print, don't write")
+    args = parser.parse_args()
+    try:
+        await rebuild(args.dry_run)
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
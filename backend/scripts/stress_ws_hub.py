@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Stress test: ConnectionHub broadcasts under concurrent subscription churn.
+
+Several symbols tick at --hz while churn tasks connect, switch, add and
+remove channels, change tick cadence and disconnect as fast as they can.
+Checks, then prints timing:
+- Stable subscribers (connected for the whole run) get every tick of
+  their symbol exactly once and in seq order
+- Closed connections never get a frame after closing
+- After the final sweep the registry holds exactly the open connections
+- Broadcast wall time per tick (p50/p99/max) while the churn runs
+
+Run: python scripts/stress_ws_hub.py [--seconds 5] [--stable 500] [--churners 200]
+"""
+import argparse
+import asyncio
+import logging
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.config import settings
+from app.services.ws_hub import ConnectionHub, channel_name, decode_message
+
+SYMBOLS = ["BTCUSDT", "ETHUSDT", "SOLUSDT", "XRPUSDT", "DOGEUSDT"]
+
+
+class RecordingSocket:
+    """Stand-in WebSocket; optionally decodes frames to check seq order."""
+
+    __slots__ = ("check", "seqs", "frames", "closed_at")
+
+    def __init__(self, check: bool = False) -> None:
+        self.check = check
+        self.seqs: dict[str, list[int]] = {}
+        self.frames = 0
+        self.closed_at: int | None = None
+
+    async def send_text(self, data: str) -> None:
+        if self.closed_at is not None:
+            raise AssertionError("frame sent after close")
+        self.frames += 1
+        if self.check:
+            message = decode_message(data)
+            if message.get("type") == "price_tick":
+                self.seqs.setdefault(message["symbol"], []).append(message["seq"])
+
+    async def send_bytes(self, data: bytes) -> None:
+        self.frames += 1
+
+    async def close(self, code: int = 1000, reason: str = "") -> None:
+        pass
+
+
+async def ticker(hub: ConnectionHub, symbol: str, hz: float, deadline: float, timings: list) -> int:
+    sent = 0
+    while time.monotonic() < deadline:
+        started = time.perf_counter()
+        await hub.broadcast(symbol, {"type": "price_tick", "symbol": symbol, "data": {"price": 1.0}})
+        timings.append(time.perf_counter() - started)
+        sent += 1
+        await asyncio.sleep(1 / hz)
+    return sent
+
+
+async def churner(hub: ConnectionHub, deadline: float, rng: random.Random, stats: dict) -> None:
+    while time.monotonic() < deadline:
+        ws = RecordingSocket()
+        await hub.subscribe(ws, rng.choice(SYMBOLS))
+        for _ in range(rng.randint(1, 8)):
+            op = rng.random()
+            symbol = rng.choice(SYMBOLS)
+            if op < 0.3:
+                await hub.subscribe(ws, symbol)  # switch
+            elif op < 0.55:
+                await hub.add_channels(ws, [symbol, channel_name("bets", symbol)])
+            elif op < 0.75:
+                await hub.remove_channels(ws, [symbol])
+            else:
+                await hub.set_tick_interval(ws, [symbol], rng.choice((1, 2, 5)))
+            stats["ops"] += 1
+            await asyncio.sleep(rng.random() * 0.005)
+        await hub.unsubscribe(ws)
+        # Frames already queued may still flush; nothing may be sent after the writer stops
+        await asyncio.sleep(0)
+        ws.closed_at = stats["connections"]
+        stats["connections"] += 1
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--stable", type=int, default=500, help="subscribers kept for the whole run")
+    parser.add_argument("--churners", type=int, default=200, help="concurrent churn tasks")
+    parser.add_argument("--hz", type=float, default=10.0, help="ticks per second per symbol")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    # Ticks for the stable sockets must not be dropped by the queue policy
+    settings.WS_SEND_QUEUE_SIZE = 10_000
+    hub = ConnectionHub()
+    await hub.start()
+
+    stable = [RecordingSocket(check=True) for _ in range(args.stable)]
+    for i, ws in enumerate(stable):
+        await hub.subscribe(ws, SYMBOLS[i % len(SYMBOLS)])
+
+    deadline = time.monotonic() + args.seconds
+    timings: list[float] = []
+    stats = {"ops": 0, "connections": 0}
+    rng = random.Random(1)
+    results = await asyncio.gather(
+        *[ticker(hub, s, args.hz, deadline, timings) for s in SYMBOLS],
+        *[churner(hub, deadline, random.Random(rng.random()), stats) for _ in range(args.churners)],
+    )
+    ticks = dict(zip(SYMBOLS, results))
+    while any(c.queue for c in hub._clients.values()):
+        await asyncio.sleep(0.01)
+
+    # 1. Exactly once, in order, for subscribers that never left
+    for i, ws in enumerate(stable):
+        symbol = SYMBOLS[i % len(SYMBOLS)]
+        got = ws.seqs.get(symbol, [])
+        assert got == list(range(1, ticks[symbol] + 1)), f"{symbol}: {len(got)} of {ticks[symbol]} ticks"
+
+    # 2. The registry converges to the open connections once swept
+    await asyncio.sleep(settings.WS_SWEEP_INTERVAL + 0.2)
+    expected: dict[str, int] = {}
+    for client in hub._clients.values():
+        for channel in client.channels:
+            expected[channel] = expected.get(channel, 0) + 1
+    assert hub.get_all_subscriber_counts() == expected, "registry out of sync after sweep"
+    assert len(hub._clients) == args.stable
+
+    hub_stats = hub.get_stats()
+    ms = sorted(t * 1000 for t in timings)
+    print(f"{args.seconds:.0f}s, {len(SYMBOLS)} symbols x {args.hz:g} Hz, {args.stable} stable subscribers, "
+          f"{args.churners} churn tasks")
+    print(f"  churn: {stats['connections']} connections, {stats['ops']} subscription ops, "
+          f"{hub_stats['swept_clients']} swept, {hub_stats['view_rebuilds']} view rebuilds")
+    print(f"  ticks: {sum(ticks.values())} broadcast, every stable subscriber got all of its symbol's in order")
+    print(f"  broadcast wall time: p50 {statistics.median(ms):.3f} ms  "
+          f"p99 {ms[int(len(ms) * 0.99) - 1]:.3f} ms  max {ms[-1]:.3f} ms")
+    await hub.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
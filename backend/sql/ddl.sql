@@ -21,6 +21,7 @@ CREATE TABLE IF NOT EXISTS `symbols` (
     `emoji` VARCHAR(10) DEFAULT '📈' COMMENT '显示图标',
     `trading_hours` JSON DEFAULT NULL COMMENT '交易时间配置（股票/贵金属用）',
     `created_at` DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP COMMENT '创建时间',
+    `updated_at` DATETIME(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6) COMMENT '更新时间（配置变更轮询用）',
     PRIMARY KEY (`symbol`)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='交易对配置表';
 
@@ -38,6 +39,8 @@ CREATE TABLE IF NOT EXISTS `bot_scores` (
     `total_wins` INT NOT NULL DEFAULT 0 COMMENT '总胜场',
     `total_losses` INT NOT NULL DEFAULT 0 COMMENT '总负场',
     `total_draws` INT NOT NULL DEFAULT 0 COMMENT '总平局',
+    `win_streak` INT NOT NULL DEFAULT 0 COMMENT '当前连胜（平局不中断，计分用）',
+    `current_streak` INT NOT NULL DEFAULT 0 COMMENT '当前连胜/连败（正=连胜，负=连败，展示用）',
     `created_at` DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP COMMENT '创建时间',
     `updated_at` DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP COMMENT '更新时间',
     PRIMARY KEY (`bot_id`),
@@ -88,7 +91,7 @@ CREATE TABLE IF NOT EXISTS `bets` (
     PRIMARY KEY (`id`),
     UNIQUE KEY `uq_bet_round_bot` (`round_id`, `bot_id`),
     KEY `ix_bets_symbol` (`symbol`),
-    KEY `ix_bets_bot_id` (`bot_id`),
+    KEY `ix_bets_bot_id_created_at` (`bot_id`, `created_at`),
     CONSTRAINT `fk_bets_round` FOREIGN KEY (`round_id`) REFERENCES `rounds` (`id`) ON DELETE CASCADE
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='下注表';
 
@@ -104,12 +107,34 @@ CREATE TABLE IF NOT EXISTS `bot_symbol_stats` (
     `losses` INT NOT NULL DEFAULT 0 COMMENT '负场',
     `draws` INT NOT NULL DEFAULT 0 COMMENT '平局',
     `last_bet_at` DATETIME DEFAULT NULL COMMENT '最后下注时间',
+    `last_round_id` INT DEFAULT NULL COMMENT '最近参与并已结算的回合 ID',
     `updated_at` DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP COMMENT '更新时间',
     PRIMARY KEY (`bot_id`, `symbol`),
     CONSTRAINT `fk_bot_symbol_stats_bot` FOREIGN KEY (`bot_id`) REFERENCES `bot_scores` (`bot_id`) ON DELETE CASCADE,
     CONSTRAINT `fk_bot_symbol_stats_symbol` FOREIGN KEY (`symbol`) REFERENCES `symbols` (`symbol`) ON DELETE CASCADE
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='Bot 单交易对统计表';
 
+-- =============================================
+-- Table: bot_hourly_stats
+-- Bot 按小时汇总表（24h/7d/30d 排行榜，结算时增量维护）
+-- =============================================
+CREATE TABLE IF NOT EXISTS `bot_hourly_stats` (
+    `bot_id` VARCHAR(64) NOT NULL COMMENT 'Bot 标识',
+    `symbol` VARCHAR(20) NOT NULL COMMENT '交易对代码',
+    `hour` DATETIME NOT NULL COMMENT '小时桶起点（下注时间向下取整到整点，UTC）',
+    `wins` INT NOT NULL DEFAULT 0 COMMENT '胜场',
+    `losses` INT NOT NULL DEFAULT 0 COMMENT '负场',
+    `draws` INT NOT NULL DEFAULT 0 COMMENT '平局',
+    `score_delta` INT NOT NULL DEFAULT 0 COMMENT '积分变化合计',
+    `bet_count` INT NOT NULL DEFAULT 0 COMMENT '已结算下注数',
+    `updated_at` DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP COMMENT '更新时间',
+    PRIMARY KEY (`bot_id`, `symbol`, `hour`),
+    KEY `ix_bot_hourly_stats_hour` (`hour`),
+    KEY `ix_bot_hourly_stats_symbol_hour` (`symbol`, `hour`),
+    CONSTRAINT `fk_bot_hourly_stats_bot` FOREIGN KEY (`bot_id`) REFERENCES `bot_scores` (`bot_id`) ON DELETE CASCADE,
+    CONSTRAINT `fk_bot_hourly_stats_symbol` FOREIGN KEY (`symbol`) REFERENCES `symbols` (`symbol`) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='Bot 按小时汇总表';
+
 -- =============================================
 -- Table: danmaku
 -- 弹幕消息表
@@ -131,3 +156,16 @@ CREATE TABLE IF NOT EXISTS `danmaku` (
     KEY `idx_danmaku_round_created` (`round_id`, `created_at`),
     KEY `idx_danmaku_symbol_created` (`symbol`, `created_at`)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='弹幕消息表';
+
+-- =============================================
+-- Table: scheduler_leases
+-- 调度器主节点租约表（多副本时只有持有者运行定时任务）
+-- =============================================
+CREATE TABLE IF NOT EXISTS `scheduler_leases` (
+    `name` VARCHAR(64) NOT NULL COMMENT '租约名称（如 scheduler）',
+    `holder` VARCHAR(128) NOT NULL DEFAULT '' COMMENT '当前持有者（host:pid:nonce）',
+    `fencing_token` BIGINT NOT NULL DEFAULT 0 COMMENT '防护令牌，每次易主 +1',
+    `expires_at` DATETIME(3) NOT NULL COMMENT '租约到期时间（数据库时钟）',
+    `updated_at` DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP COMMENT '更新时间',
+    PRIMARY KEY (`name`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='调度器主节点租约表';
@@ -0,0 +1,29 @@
+-- Migration: Hourly per-bot per-symbol rollups for the 24h/7d/30d leaderboards
+-- Settlement adds each bet to its (bot, symbol, hour) bucket, so a period
+-- board sums at most 720 buckets per bot instead of scanning a month of bets.
+-- After creating the table, backfill it from bet history:
+--   python scripts/rebuild_hourly_stats.py
+-- The recent-bets query of a period board reads each bot's bets from the
+-- hour its last 80 start in; (bot_id, created_at) makes that a range scan
+-- and covers every lookup the old (bot_id) index served.
+
+CREATE TABLE IF NOT EXISTS `bot_hourly_stats` (
+    `bot_id` VARCHAR(64) NOT NULL COMMENT 'Bot 标识',
+    `symbol` VARCHAR(20) NOT NULL COMMENT '交易对代码',
+    `hour` DATETIME NOT NULL COMMENT '小时桶起点（下注时间向下取整到整点，UTC）',
+    `wins` INT NOT NULL DEFAULT 0 COMMENT '胜场',
+    `losses` INT NOT NULL DEFAULT 0 COMMENT '负场',
+    `draws` INT NOT NULL DEFAULT 0 COMMENT '平局',
+    `score_delta` INT NOT NULL DEFAULT 0 COMMENT '积分变化合计',
+    `bet_count` INT NOT NULL DEFAULT 0 COMMENT '已结算下注数',
+    `updated_at` DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP COMMENT '更新时间',
+    PRIMARY KEY (`bot_id`, `symbol`, `hour`),
+    KEY `ix_bot_hourly_stats_hour` (`hour`),
+    KEY `ix_bot_hourly_stats_symbol_hour` (`symbol`, `hour`),
+    CONSTRAINT `fk_bot_hourly_stats_bot` FOREIGN KEY (`bot_id`) REFERENCES `bot_scores` (`bot_id`) ON DELETE CASCADE,
+    CONSTRAINT `fk_bot_hourly_stats_symbol` FOREIGN KEY (`symbol`) REFERENCES `symbols` (`symbol`) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='Bot 按小时汇总表';
+
+ALTER TABLE bets
+    ADD KEY `ix_bets_bot_id_created_at` (`bot_id`, `created_at`),
+    DROP KEY `ix_bets_bot_id`;
@@ -0,0 +1,12 @@
+-- Migration: Leader lease for the round scheduler and price sampler
+-- Only the replica holding the `scheduler` lease runs the background jobs;
+-- enable with LEADER_ELECTION_ENABLED=true when running several API processes.
+
+CREATE TABLE IF NOT EXISTS `scheduler_leases` (
+    `name` VARCHAR(64) NOT NULL COMMENT '租约名称（如 scheduler）',
+    `holder` VARCHAR(128) NOT NULL DEFAULT '' COMMENT '当前持有者（host:pid:nonce）',
+    `fencing_token` BIGINT NOT NULL DEFAULT 0 COMMENT '防护令牌，每次易主 +1',
+    `expires_at` DATETIME(3) NOT NULL COMMENT '租约到期时间（数据库时钟）',
+    `updated_at` DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP COMMENT '更新时间',
+    PRIMARY KEY (`name`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='调度器主节点租约表';
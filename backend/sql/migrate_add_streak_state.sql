@@ -0,0 +1,12 @@
+-- Migration: Materialized streak state, maintained at settlement time
+-- win_streak / current_streak replace the per-request ROW_NUMBER() streak queries;
+-- last_round_id replaces the recent-rounds scan of the skip penalty.
+-- After migrating, fill the columns from history:
+--   python scripts/rebuild_streaks.py
+
+ALTER TABLE bot_scores
+    ADD COLUMN win_streak INT NOT NULL DEFAULT 0 COMMENT '当前连胜（平局不中断，计分用）' AFTER total_draws,
+    ADD COLUMN current_streak INT NOT NULL DEFAULT 0 COMMENT '当前连胜/连败（正=连胜，负=连败，展示用）' AFTER win_streak;
+
+ALTER TABLE bot_symbol_stats
+    ADD COLUMN last_round_id INT DEFAULT NULL COMMENT '最近参与并已结算的回合 ID' AFTER last_bet_at;
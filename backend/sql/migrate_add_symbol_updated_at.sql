@@ -0,0 +1,9 @@
+-- Migration: symbols.updated_at, the version column of the symbol config registry
+-- Every worker polls MAX(updated_at) / COUNT(*) and reloads its in-memory copy
+-- of the table when either changes (microseconds, so two edits in the same
+-- second are still told apart). Edits take effect without a restart;
+-- POST /api/v1/symbols/reload applies them immediately.
+
+ALTER TABLE symbols
+    ADD COLUMN updated_at DATETIME(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6)
+        COMMENT '更新时间（配置变更轮询用）' AFTER created_at;
@@ -0,0 +1,87 @@
+"""
+Streak state: the backfill (scripts/rebuild_streaks.py) and incremental
+settlement (the bot_scores upsert in RoundManager._apply_settlement) must
+agree, including the ±STREAK_DISPLAY_CAP clamp on long runs.
+
+Settlement's SQL is run against in-memory SQLite as a plain UPDATE with the
+same CASE expressions the MySQL upsert uses.
+"""
+import importlib.util
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pytest
+from sqlalchemy import (
+    Column, Integer, MetaData, String, Table,
+    create_engine, false, insert, select, true, update,
+)
+
+from app.core.config import settings
+from app.services.round_manager import streak_updates
+
+# The streak columns of bot_scores
+scores = Table(
+    "bot_scores", MetaData(),
+    Column("bot_id", String(64), primary_key=True),
+    Column("win_streak", Integer, nullable=False),
+    Column("current_streak", Integer, nullable=False),
+)
+
+SCRIPT = Path(__file__).parent.parent / "scripts" / "rebuild_streaks.py"
+
+RESULTS = [
+    ["win"] * 15,
+    ["lose"] * 12,
+    ["win"] * 14 + ["lose"] + ["lose"] * 11 + ["draw"] + ["win"] * 3,
+    ["win", "draw", "win", "win"] * 5 + ["lose"] * 2,
+]
+
+
+def load_rebuild_script():
+    spec = importlib.util.spec_from_file_location("rebuild_streaks", SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def backfill(results: list[str]) -> tuple[int, int]:
+    """What rebuild_streaks.py computes for one bot's settled bets, oldest first."""
+    advance = load_rebuild_script().advance_streaks
+    state = (0, 0)
+    for result in results:
+        state = advance(*state, result)
+    return state
+
+
+def settle(results: list[str]) -> tuple[int, int]:
+    """What settlement stores, one round at a time."""
+    engine = create_engine("sqlite://")
+    scores.create(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(scores).values(bot_id="bot", win_streak=0, current_streak=0))
+        for result in results:
+            conn.execute(
+                update(scores)
+                .where(scores.c.bot_id == "bot")
+                .values(**streak_updates(
+                    scores.c.win_streak, scores.c.current_streak,
+                    won=true() if result == "win" else false(),
+                    lost=true() if result == "lose" else false(),
+                ))
+            )
+        return tuple(conn.execute(
+            select(scores.c.win_streak, scores.c.current_streak)
+        ).one())
+
+
+@pytest.mark.parametrize("results", RESULTS)
+def test_backfill_matches_settlement(results):
+    assert backfill(results) == settle(results)
+
+
+def test_display_streak_is_capped():
+    cap = settings.STREAK_DISPLAY_CAP
+    assert settle(["win"] * (cap + 5)) == (cap + 5, cap)
+    assert settle(["lose"] * (cap + 5)) == (0, -cap)